@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""功能：对比各种api访问次数限制方式的单次请求开销及memcached访问次数
+
+需要可访问的memcached，用法:
+python benchmarks/bench_access_limit.py [memcached地址] [次数] [线程数]
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import memcache  # noqa: E402
+from mc.mc_model import MCModel  # noqa: E402
+
+import context  # noqa: E402
+from common.misc import g_local_cache  # noqa: E402
+from constants import (  # noqa: E402
+    API_TYPE_VMWARE_MANAGER,
+    API_DURATION,
+    MC_KEY_MAP,
+    MC_KEY_PREFIX_ACCOUNT_QUOTA,
+)
+from resource_control.iaas.access_limit import (  # noqa: E402
+    ACCESS_LIMITERS,
+    get_access_count,
+)
+
+USER_ID = "usr-bench"
+QUOTA = 10 ** 9
+DURATION = 3600
+
+
+class CountingClient(object):
+    """记录对memcached的访问次数"""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = 0
+
+    def __getattr__(self, name):
+        func = getattr(self.client, name)
+
+        def call(*args, **kwargs):
+            self.calls += 1
+            return func(*args, **kwargs)
+        return call
+
+
+def run(limiter, number, threads):
+    per_thread = number // threads
+
+    def worker():
+        for _ in range(per_thread):
+            assert limiter.check(USER_ID, API_TYPE_VMWARE_MANAGER)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.time()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return time.time() - start, per_thread * threads
+
+
+def main():
+    server = sys.argv[1] if len(sys.argv) > 1 else "127.0.0.1:11211"
+    number = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    threads = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+
+    ctx = context.instance()
+    client = CountingClient(memcache.Client([server]))
+    ctx.mcclient = client
+    ctx.mcm = MCModel(client)
+
+    # 配额直接放入本地缓存，不访问IaaS
+    g_local_cache.set((MC_KEY_PREFIX_ACCOUNT_QUOTA, USER_ID), {
+        API_TYPE_VMWARE_MANAGER: QUOTA,
+        API_DURATION[API_TYPE_VMWARE_MANAGER]: DURATION,
+    }, ttl=DURATION)
+
+    ctx.mcm.delete(MC_KEY_MAP[API_TYPE_VMWARE_MANAGER], USER_ID)
+    for name in sorted(ACCESS_LIMITERS):
+        limiter = ACCESS_LIMITERS[name]()
+        client.calls = 0
+        seconds, count = run(limiter, number, threads)
+        # 归还未用完的租用次数，QUOTA - left应等于请求数
+        if hasattr(limiter, "reconcile"):
+            limiter.reconcile(time.time() + limiter.lease_time)
+        left = get_access_count(USER_ID, API_TYPE_VMWARE_MANAGER)
+        print("{name:<10} {cost:>10.2f} us/request {calls:>8} memcached calls"
+              " used {used}".format(name=name, cost=seconds / count * 1e6,
+                                     calls=client.calls,
+                                     used=QUOTA - left if left is not None
+                                     else None))
+        # 下一种方式从配额开始计数
+        ctx.mcm.delete(MC_KEY_MAP[API_TYPE_VMWARE_MANAGER], USER_ID)
+
+
+if __name__ == "__main__":
+    main()
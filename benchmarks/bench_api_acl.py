@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+"""功能：对比API访问控制每次复制ACL映射与查预先展开的表两种方式的开销
+
+用法: python benchmarks/bench_api_acl.py [次数]
+"""
+
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from api.constants import CHANNEL_API, ROLE_NORMAL_USER  # noqa: E402
+from constants import ACTION_VMWARE_MANAGER_VM_DETAIL_VM  # noqa: E402
+from handlers.api_acl.common import (  # noqa: E402
+    get_api_acl_map,
+    build_api_acl_table
+)
+
+ACTION = ACTION_VMWARE_MANAGER_VM_DETAIL_VM
+
+
+def check_with_map():
+    """旧的方式：每个请求复制ACL映射，再逐层查找并在角色列表中查找"""
+    api_acl = dict()
+    api_acl.update(get_api_acl_map())
+    assert ACTION in api_acl
+    assert CHANNEL_API in api_acl[ACTION]
+    assert ROLE_NORMAL_USER in api_acl[ACTION][CHANNEL_API]
+
+
+def make_check_with_table():
+    """新的方式：启动时展开为(action, channel) -> frozenset(roles)的表"""
+    acl_table, _ = build_api_acl_table()
+
+    def check_with_table():
+        roles = acl_table.get((ACTION, CHANNEL_API))
+        assert roles is not None and ROLE_NORMAL_USER in roles
+
+    return check_with_table
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    cases = [
+        ("map", check_with_map),
+        ("table", make_check_with_table()),
+    ]
+    results = dict()
+    for name, func in cases:
+        seconds = min(timeit.repeat(func, number=number, repeat=3))
+        results[name] = seconds / number * 1e9
+        print("{name:<8} {cost:>10.1f} ns/check".format(
+            name=name, cost=results[name]))
+    print("speedup  {speedup:>10.1f}x".format(
+        speedup=results["map"] / results["table"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+"""功能：测量connexion在一次请求上相对直接使用flask路由增加的开销
+
+请求经过路由、参数解析、校验、参数提取和响应序列化，处理函数本身不做任何事，
+用法: python benchmarks/bench_request_overhead.py [次数]
+"""
+
+import os
+import sys
+import timeit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+# 处理函数由operationId按模块名导入
+sys.path.insert(0, BENCH_DIR)
+
+import flask  # noqa: E402
+from werkzeug.test import EnvironBuilder  # noqa: E402
+
+import connexion  # noqa: E402
+
+URL = "/vms/i-0123abcd?platform_id=plf-0123456789&fields=name,status&reverse=true"
+
+# 与DescribeVm类似的接口，带路径参数、默认值和数组参数
+SPEC = {
+    "swagger": "2.0",
+    "info": {"title": "bench", "version": "1.0"},
+    "paths": {
+        "/vms/{vm_id}": {
+            "get": {
+                "operationId": "bench_request_overhead.describe_vm",
+                "produces": ["application/json"],
+                "parameters": [
+                    {"name": "vm_id", "in": "path", "type": "string", "required": True},
+                    {"name": "platform_id", "in": "query", "type": "string", "required": True},
+                    {"name": "offset", "in": "query", "type": "integer", "minimum": 0,
+                     "default": 0},
+                    {"name": "limit", "in": "query", "type": "integer", "minimum": 1,
+                     "maximum": 1000, "default": 20},
+                    {"name": "fields", "in": "query", "type": "array",
+                     "items": {"type": "string"}, "collectionFormat": "csv"},
+                    {"name": "reverse", "in": "query", "type": "boolean"},
+                ],
+                "responses": {"200": {"description": "vm"}},
+            }
+        }
+    },
+}
+
+RESULT = {"ret_code": 0, "vm_id": "i-0123abcd"}
+
+
+def describe_vm(vm_id, platform_id, offset, limit, fields=None, reverse=None):
+    return RESULT
+
+
+def make_connexion_app():
+    app = connexion.App(__name__)
+    app.add_api(SPEC)
+    return app.app
+
+
+def make_flask_app():
+    app = flask.Flask(__name__)
+
+    @app.route("/vms/<vm_id>")
+    def describe(vm_id):
+        return flask.jsonify(RESULT)
+
+    return app
+
+
+def make_request(wsgi_app):
+    """每次请求都使用同一个预先构建的environ的副本"""
+    environ = EnvironBuilder(path=URL).get_environ()
+    statuses = []
+
+    def start_response(status, headers, exc_info=None):
+        statuses.append(status)
+
+    def request():
+        del statuses[:]
+        body = b"".join(wsgi_app(dict(environ), start_response))
+        assert statuses[0].startswith("200"), (statuses, body)
+
+    return request
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    cases = [
+        ("flask", make_flask_app()),
+        ("connexion", make_connexion_app()),
+    ]
+    results = dict()
+    for name, app in cases:
+        request = make_request(app.wsgi_app)
+        # 第一次请求会导入并构建处理函数，不计入
+        request()
+        seconds = min(timeit.repeat(request, number=number, repeat=3))
+        results[name] = seconds / number * 1e6
+        print("{name:<12} {cost:>10.2f} us/request".format(
+            name=name, cost=results[name]))
+    print("overhead     {cost:>10.2f} us/request".format(
+        cost=results["connexion"] - results["flask"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+"""功能：对比参数校验器按请求构建与预先编译两种方式的单次请求开销
+
+用法: python benchmarks/bench_validation.py [次数]
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connexion.decorators.validation import ParameterValidator  # noqa: E402
+
+# 与DetailVm、DescribeVm类似的查询参数
+PARAMETERS = [
+    {"name": "platform_id", "in": "query", "type": "string", "required": True},
+    {"name": "vm_id", "in": "query", "type": "string"},
+    {"name": "offset", "in": "query", "type": "integer", "minimum": 0},
+    {"name": "limit", "in": "query", "type": "integer", "minimum": 1, "maximum": 1000},
+    {"name": "reverse", "in": "query", "type": "boolean"},
+    {"name": "sort_key", "in": "query", "type": "string",
+     "enum": ["name", "status", "create_time"]},
+]
+
+QUERY = {
+    "platform_id": "plf-0123456789",
+    "vm_id": "42008e7e-3b2b-9c1e-1cb4-5a6ec3c9d0a1",
+    "offset": "0",
+    "limit": "20",
+    "reverse": "true",
+    "sort_key": "name",
+}
+
+
+def validate_uncompiled():
+    """旧的方式：每个请求为每个参数重新构建校验器"""
+    for param in PARAMETERS:
+        error = ParameterValidator.validate_parameter(
+            "query", QUERY.get(param["name"]), param)
+        assert error is None, error
+
+
+def make_validate_compiled():
+    """新的方式：校验器在加载API时编译，请求时直接查找"""
+    validator = ParameterValidator(PARAMETERS, api=None)
+
+    def validate_compiled():
+        for param in validator.parameters["query"]:
+            error = validator.validate_parameter(
+                "query", QUERY.get(param["name"]), param,
+                validator=validator._validators[id(param)])
+            assert error is None, error
+
+    return validate_compiled
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    cases = [
+        ("uncompiled", validate_uncompiled),
+        ("compiled", make_validate_compiled()),
+    ]
+    results = dict()
+    for name, func in cases:
+        seconds = min(timeit.repeat(func, number=number, repeat=3))
+        results[name] = seconds / number * 1e6
+        print("{name:<12} {cost:>10.2f} us/request".format(
+            name=name, cost=results[name]))
+    print("speedup      {speedup:>10.2f}x".format(
+        speedup=results["uncompiled"] / results["compiled"]))
+
+
+if __name__ == "__main__":
+    main()
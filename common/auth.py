@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import sys
+import time
 import base64
 import hmac
 from urllib import quote, unquote, quote_plus
@@ -13,10 +14,13 @@ from utils.json import json_dump, json_load
 from random import choice
 
 import context
+from uutils.lru import LRUCache
 # from common.misc import get_iam_signature_servers
 from constants import (
     TIMEOUT_IAM_SIGNATURE_SERVER_LONG,
     IAM_SIGNATURE_SERVER_PROXY_PORT,
+    SIGNATURE_CACHE_TTL,
+    SIGNATURE_CACHE_SIZE,
 )
 
 
@@ -168,21 +172,67 @@ class SignatureAuthHandler(HmacKeys):
         return "%s\n%s\n%s\n%s" % (req.method.upper(), canonical_uri,
                                    canonical_query_string, hex_encode)
 
-    def _calc_signature(self, req):
+    def _calc_signature(self, req, string_to_sign=None):
         """ calc signature for request """
 
         self._hmac_256 = hmac.new(self.secret_access_key,
                                   digestmod=sha256)
-        string_to_sign = SignatureAuthHandler.process_canonical_request(req)
+        if string_to_sign is None:
+            string_to_sign = SignatureAuthHandler.process_canonical_request(
+                req)
         signature = self.sign_string(string_to_sign)
         logger.debug('signature [%s]' % signature)
         return signature
 
-    def check_auth(self, req, ori_signature, **kwargs):
-        """ check authorize information for request """
-        signature = self._calc_signature(req)
+    def check_auth(self, req, ori_signature, string_to_sign=None, **kwargs):
+        """ check authorize information for request
+        :param string_to_sign: canonical request if already built
+        """
+        signature = self._calc_signature(req, string_to_sign)
         if ori_signature != signature.decode("utf-8"):
             logger.error('signature not match [%s] [%s]'
                          % (ori_signature, signature))
             return False
         return True
+
+
+class VerifiedSignatureCache(object):
+    """ Short-lived cache of verified signatures.
+
+    Entries are keyed by access key, signature, expires and a digest of
+    the canonical request, so a cached signature only matches the very
+    request it was verified for, and an entry never outlives the expires
+    of that request, so the cache does not widen the replay window.
+    """
+
+    def __init__(self, max_size=SIGNATURE_CACHE_SIZE, ttl=SIGNATURE_CACHE_TTL):
+        self.ttl = ttl
+        self._cache = LRUCache(max_size, ttl)
+
+    @staticmethod
+    def make_key(access_key_id, signature, expires_at, string_to_sign):
+        if isinstance(string_to_sign, unicode):
+            string_to_sign = string_to_sign.encode("utf-8")
+        return (access_key_id, signature, expires_at,
+                sha256(string_to_sign).hexdigest())
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value):
+        expires_at = key[2]
+        if not expires_at:
+            return
+        ttl = min(self.ttl, expires_at - time.time())
+        if ttl <= 0:
+            return
+        self._cache.set(key, value, ttl=ttl)
+
+
+g_signature_cache = VerifiedSignatureCache()
+
+
+def get_signature_cache():
+    """ get process wide verified signature cache """
+    global g_signature_cache
+    return g_signature_cache
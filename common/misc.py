@@ -1,21 +1,132 @@
 # -*- coding: utf-8 -*-
 
+from copy import deepcopy
+
 import context
+from uutils.lru import LRUCache
+from uutils.singleflight import SingleFlight
+from constants import (
+    MC_DEFAULT_CACHE_TIME,
+    LOCAL_CACHE_TIME,
+    LOCAL_CACHE_NEGATIVE_TIME,
+    LOCAL_CACHE_SIZE
+)
+
+# 进程内缓存，位于memcached之前
+g_local_cache = LRUCache(LOCAL_CACHE_SIZE, LOCAL_CACHE_TIME)
+g_single_flight = SingleFlight()
+
+# 本地缓存中表示"查询不到"的标记
+_NEGATIVE = object()
+
+
+def mc_key(prefix, key):
+    """与MCModel相同的memcached键格式
+
+    只用于跨前缀的批量读取，单个读写仍通过MCModel，两者读到的是同一个键
+    """
+    return "%s.%s" % (prefix, key)
+
+
+def _local_get(prefix, key):
+    """读取本地缓存，返回副本，调用方修改结果不会影响缓存及其他请求"""
+    value = g_local_cache.get((prefix, key))
+    if value is None or value is _NEGATIVE:
+        return value
+    return deepcopy(value)
+
+
+def _local_set(prefix, key, value):
+    g_local_cache.set((prefix, key), deepcopy(value))
 
 
 def get_cache(prefix, key):
-    ctx = context.instance()
+    value = _local_get(prefix, key)
+    if value is not None and value is not _NEGATIVE:
+        return value
 
-    return ctx.mcm.get(prefix, key)
+    ctx = context.instance()
+    value = ctx.mcm.get(prefix, key)
+    if value is not None:
+        _local_set(prefix, key, value)
+    return value
 
 
 def set_cache(prefix, key, val, time=3600*24):
     ctx = context.instance()
 
+    _local_set(prefix, key, val)
     return ctx.mcm.set(prefix, key, val, time=time)
 
 
 def unset_cache(prefix, key):
     ctx = context.instance()
 
-    return ctx.mcm.delete(prefix, key)
\ No newline at end of file
+    g_local_cache.delete((prefix, key))
+    return ctx.mcm.delete(prefix, key)
+
+
+def load_cache(prefix, key, loader, refresh=False,
+               time=MC_DEFAULT_CACHE_TIME):
+    """依次从本地缓存、memcached获取，都没有时调用loader加载并写回两级缓存
+
+    loader返回None时在本地短暂缓存该结果，避免反复请求后端；
+    对同一个键的并发加载只会执行一次loader，每个调用方得到各自的副本。
+    """
+    if not refresh:
+        value = _local_get(prefix, key)
+        if value is _NEGATIVE:
+            return None
+        if value:
+            return value
+
+        ctx = context.instance()
+        value = ctx.mcm.get(prefix, key)
+        if value:
+            _local_set(prefix, key, value)
+            return value
+
+    def load():
+        value = loader()
+        if value is None:
+            g_local_cache.set((prefix, key), _NEGATIVE,
+                              ttl=LOCAL_CACHE_NEGATIVE_TIME)
+        elif value:
+            set_cache(prefix, key, value, time=time)
+        return value
+
+    # 并发的调用方共享同一个加载结果
+    return deepcopy(g_single_flight.do((prefix, key), load))
+
+
+def load_cache_multi(entries, time=MC_DEFAULT_CACHE_TIME):
+    """批量版本的load_cache，entries为(prefix, key, loader)列表
+
+    本地缓存未命中的键不论前缀都按MCModel的格式拼接，合并为一次get_multi，
+    memcached中也没有的才逐个调用loader；返回值与entries按顺序一一对应。
+    """
+    values = [None] * len(entries)
+    missed = dict()     # memcached键 -> entries中的位置
+    for i, (prefix, key, _) in enumerate(entries):
+        value = _local_get(prefix, key)
+        if value is _NEGATIVE:
+            continue
+        if value:
+            values[i] = value
+        else:
+            missed[mc_key(prefix, key)] = i
+
+    if not missed:
+        return values
+
+    ctx = context.instance()
+    found = ctx.mcclient.get_multi(missed.keys()) or dict()
+    for key_, i in missed.items():
+        prefix, key, loader = entries[i]
+        value = found.get(key_)
+        if value:
+            _local_set(prefix, key, value)
+        else:
+            value = load_cache(prefix, key, loader, refresh=True, time=time)
+        values[i] = value
+    return values
@@ -4,20 +4,59 @@ from api.error import Error
 import api.error_code as ErrorCodes
 import api.error_msg as ErrorMsg
 from log.logger import logger
+from utils.time_stamp import (
+    parse_ts,
+    get_expired_ts,
+)
 
 from resource_control.iaas.interface import (
-    get_user,
+    load_auth_context,
 )
 import context as context
 from resource_control.iaas.interface import get_access_key
-from constants import ACCESS_KEY_STATUS_ACTIVE
+from constants import (
+    ACCESS_KEY_STATUS_ACTIVE,
+    API_TYPE_VMWARE_MANAGER,
+    CONTROLLER_PITRIX,
+    REQ_EXPIRED_INTERVAL,
+)
 from common.auth import (
     SignatureAuthHandler,
     check_signature_via_iam,
+    get_signature_cache,
 )
 from pprint import pformat
 
 
+def _load_user(user_id, access_key, request):
+    """
+    load user info, together with the user lock and quota checked later
+    in validate_user_request, through one batched cache read
+    """
+    ctx = context.instance()
+    api_action = None
+    # user lock is not checked for pitrix requests
+    if access_key.get("controller") != CONTROLLER_PITRIX:
+        api_action = request.query.get("action")
+    auth_context = load_auth_context(user_id, API_TYPE_VMWARE_MANAGER,
+                                     api_action,
+                                     with_quota=ctx.check_access_limit)
+    if not auth_context or not auth_context["user"]:
+        return None
+    # the cached user info is shared, and updated per request later
+    return dict(auth_context["user"])
+
+
+def _get_expires_at(query):
+    """ get the time in seconds after which the request is expired """
+    expires = query.get("expires")
+    if not expires and query.get("timestamp"):
+        expires = get_expired_ts(query["timestamp"], REQ_EXPIRED_INTERVAL)
+    if not expires:
+        return 0
+    return parse_ts(expires)
+
+
 def check_signature(apikey, required_scopes=None, request=None):
     """
     check signature
@@ -44,7 +83,7 @@ def check_signature(apikey, required_scopes=None, request=None):
             return None
         # check authorize information for request
         user_id = str(access_key["owner"])
-        user_info = get_user(user_id)
+        user_info = _load_user(user_id, access_key, request)
         if not user_info:
             logger.error("get user for [%s] failed" % user_id)
             err = Error(ErrorCodes.PERMISSION_DENIED,
@@ -54,24 +93,37 @@ def check_signature(apikey, required_scopes=None, request=None):
                      % (apikey, pformat(request.__dict__)))
         return {'sub': user_info, 'uid': user_id, 'access_key': access_key}
 
-    if ctx.verify_signature_via_iam:
-        user_info = check_signature_via_iam(access_key_id, signature, request)
-        if user_info and user_info.get("zone_info"):
-            user_id = user_info.get('user_id')
-            access_key = {"controller": "self"}
+    string_to_sign = SignatureAuthHandler.process_canonical_request(request)
+    signature_cache = get_signature_cache()
+    cache_key = signature_cache.make_key(access_key_id, signature,
+                                         _get_expires_at(request.query),
+                                         string_to_sign)
+    verified = signature_cache.get(cache_key)
+    if verified:
+        user_id, access_key, user_info = verified
+        if user_info is None:
+            # verified with the secret of the access key record, only the
+            # HMAC is skipped, the key may have been revoked since
+            access_key = get_access_key(access_key_id)
+            if access_key is None:
+                logger.error("get access key info for [%s] failed"
+                             % access_key_id)
+                return None
+            elif access_key['status'] != ACCESS_KEY_STATUS_ACTIVE:
+                logger.error("access_key[%s] is not active [%s]"
+                             % (apikey, access_key['status']))
+                return None
+            user_id = str(access_key["owner"])
+            user_info = _load_user(user_id, access_key, request)
         else:
-            logger.error("check signature via iam failed, ak[%s],"
-                         " signature[%s] request[%s]"
-                         % (access_key_id, signature, request))
-            err = Error(ErrorCodes.AUTH_FAILURE,
-                        ErrorMsg.ERR_MSG_SIGNATURE_NOT_MACTCHED)
-            return None, err
-    else:
-        access_key = get_access_key(access_key_id)
-        if access_key is None:
-            logger.error("get access_key for [%s] failed" % access_key_id)
-            return None
-        elif access_key['status'] != ACCESS_KEY_STATUS_ACTIVE:
+            user_info = dict(user_info)
+        if user_info:
+            return {'sub': user_info, 'uid': user_id, 'access_key': access_key}
+
+    access_key = get_access_key(access_key_id)
+    if access_key is not None and access_key.get('secret_access_key'):
+        # verify locally with the secret of the access key record
+        if access_key['status'] != ACCESS_KEY_STATUS_ACTIVE:
             logger.error("access_key[%s] is not active [%s]"
                          % (apikey, access_key['status']))
             return None
@@ -79,18 +131,37 @@ def check_signature(apikey, required_scopes=None, request=None):
         secret_access_key = access_key['secret_access_key']
         # check authorize information for request
         auth_handler = SignatureAuthHandler("", access_key_id, secret_access_key)
-        if not auth_handler.check_auth(request, signature):
+        if not auth_handler.check_auth(request, signature,
+                                       string_to_sign=string_to_sign):
             logger.error("check auth for [%s] failed" % request)
             return None
 
         user_id = str(access_key["owner"])
-        user_info = get_user(user_id)
+        user_info = _load_user(user_id, access_key, request)
         if not user_info:
             logger.error("get user for [%s] failed" % user_id)
             err = Error(ErrorCodes.PERMISSION_DENIED,
                         ErrorMsg.ERR_MSG_USER_NOT_FOUND)
             return None, err
+        signature_cache.set(cache_key, (user_id, access_key, None))
         logger.debug("check signature end, api key: %s, request: %s"
                      % (apikey, pformat(request.__dict__)))
+    elif ctx.verify_signature_via_iam:
+        user_info = check_signature_via_iam(access_key_id, signature, request)
+        if user_info and user_info.get("zone_info"):
+            user_id = user_info.get('user_id')
+            access_key = {"controller": "self"}
+        else:
+            logger.error("check signature via iam failed, ak[%s],"
+                         " signature[%s] request[%s]"
+                         % (access_key_id, signature, request))
+            err = Error(ErrorCodes.AUTH_FAILURE,
+                        ErrorMsg.ERR_MSG_SIGNATURE_NOT_MACTCHED)
+            return None, err
+        # user info is updated per request in validate_user_request
+        signature_cache.set(cache_key, (user_id, access_key, dict(user_info)))
+    else:
+        logger.error("get access_key for [%s] failed" % access_key_id)
+        return None
 
     return {'sub': user_info, 'uid': user_id, 'access_key': access_key}
@@ -80,7 +80,8 @@ class AbstractAPI(object):
                             'auth_all_paths': auth_all_paths})
 
         # Avoid validator having ability to modify specification
-        self.specification = Specification.load(specification, arguments=arguments)
+        self.specification = Specification.load(specification, arguments=arguments,
+                                                cache_dir=(options or {}).get('spec_cache_dir'))
 
         logger.debug('Read specification', extra={'spec': self.specification})
 
@@ -95,7 +96,7 @@ class AbstractAPI(object):
 
         logger.debug('Security Definitions: %s', self.specification.security_definitions)
 
-        self.resolver = resolver or Resolver()
+        self.resolver = resolver or Resolver(lazy=self.options.lazy_operations)
 
         logger.debug('Validate Responses: %s', str(validate_responses))
         self.validate_responses = validate_responses
@@ -271,24 +272,28 @@ class AbstractAPI(object):
         """
         if extra_context is None:
             extra_context = {}
-        logger.debug('Getting data and status code',
-                     extra={
-                         'data': response,
-                         'data_type': type(response),
-                         'extra_context': extra_context
-                     })
+        # the extra dicts are only built when they are logged
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug('Getting data and status code',
+                         extra={
+                             'data': response,
+                             'data_type': type(response),
+                             'extra_context': extra_context
+                         })
 
         if isinstance(response, ConnexionResponse):
             framework_response = cls._connexion_to_framework_response(response, mimetype, extra_context)
         else:
             framework_response = cls._response_from_handler(response, mimetype, extra_context)
 
-        logger.debug('Got framework response',
-                     extra={
-                         'response': framework_response,
-                         'response_type': type(framework_response),
-                         'extra_context': extra_context
-                     })
+        if debug:
+            logger.debug('Got framework response',
+                         extra={
+                             'response': framework_response,
+                             'response_type': type(framework_response),
+                             'extra_context': extra_context
+                         })
         return framework_response
 
     @classmethod
@@ -110,7 +110,10 @@ class FlaskApi(AbstractAPI):
         flask_path = flask_utils.flaskify_path(path, operation.get_path_parameter_types())
         endpoint_name = flask_utils.flaskify_endpoint(operation.operation_id,
                                                       operation.randomize_endpoint)
-        function = operation.function
+        if self.options.lazy_operations:
+            function = flask_utils.lazy_function(lambda: operation.function)
+        else:
+            function = operation.function
         self.blueprint.add_url_rule(flask_path, endpoint_name, function, methods=[method])
 
     @property
@@ -133,7 +136,28 @@ class FlaskApi(AbstractAPI):
         :type response: flask.Response | (flask.Response,) | (flask.Response, int) | (flask.Response, dict) | (flask.Response, int, dict)
         :rtype: ConnexionResponse
         """
-        return cls._get_response(response, mimetype=mimetype, extra_context={"url": flask.request.url})
+        framework_response = cls._get_response(response, mimetype=mimetype, extra_context={"url": flask.request.url})
+        return cls._make_conditional(framework_response)
+
+    @classmethod
+    def _make_conditional(cls, response):
+        """Answers a matching If-None-Match with 304 Not Modified for successful
+        GET/HEAD responses that carry an ETag.
+
+        Only operation handlers that set an ETag take part, responses without
+        one are left alone.
+
+        :type response: flask.Response
+        :rtype: flask.Response
+        """
+        if flask.request.method not in ('GET', 'HEAD'):
+            return response
+        if response.status_code != 200 or response.is_streamed or response.direct_passthrough:
+            return response
+
+        if 'ETag' not in response.headers:
+            return response
+        return response.make_conditional(flask.request.environ)
 
     @classmethod
     def _is_framework_response(cls, response):
@@ -232,20 +256,22 @@ class FlaskApi(AbstractAPI):
             path_params=params,
             context=context_dict
         )
-        logger.debug('Getting data and status code',
-                     extra={
-                         'data': request.body,
-                         'data_type': type(request.body),
-                         'url': request.url
-                     })
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Getting data and status code',
+                         extra={
+                             'data': request.body,
+                             'data_type': type(request.body),
+                             'url': request.url
+                         })
         return request
 
     @classmethod
     def _set_jsonifier(cls):
         """
-        Use Flask specific JSON loader
+        Use the selected JSON backend, responses are written without
+        indentation so that the C encoders can be used
         """
-        cls.jsonifier = Jsonifier(flask.json, indent=2)
+        cls.jsonifier = Jsonifier()
 
 
 def _get_context():
@@ -2,6 +2,7 @@ import functools
 import random
 import re
 import string
+import threading
 
 import flask
 import werkzeug.wrappers
@@ -79,3 +80,23 @@ def is_flask_response(obj):
     True
     """
     return isinstance(obj, flask.Response) or isinstance(obj, werkzeug.wrappers.Response)
+
+
+def lazy_function(factory):
+    """
+    Returns a view function that calls factory to build the real function
+    on its first call and then delegates to it.
+
+    :type factory: () -> types.FunctionType
+    """
+    lock = threading.Lock()
+    built = []
+
+    def function(*args, **kwargs):
+        if not built:
+            with lock:
+                if not built:
+                    built.append(factory())
+        return built[0](*args, **kwargs)
+
+    return function
@@ -10,6 +10,7 @@ from flask import json
 
 from ..apis.flask_api import FlaskApi
 from ..exceptions import ProblemException
+from ..jsonifier import get_json_backend
 from ..problem import problem
 from .abstract import AbstractApp
 
@@ -119,6 +120,12 @@ class FlaskApp(AbstractApp):
 
 
 class FlaskJSONEncoder(json.JSONEncoder):
+    def encode(self, o):
+        """ Encodes through the selected JSON backend, so the output is the
+        same whichever backend is used """
+        return get_json_backend().dumps(o, indent=self.indent, sort_keys=self.sort_keys,
+                                        default=self.default)
+
     def default(self, o):
         if isinstance(o, datetime.datetime):
             if o.tzinfo:
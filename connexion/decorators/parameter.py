@@ -18,6 +18,9 @@ except ImportError:  # pragma: no cover
 
 logger = logging.getLogger(__name__)
 
+# upper bound of sanitized parameter names remembered per operation
+SANITIZED_NAMES_MAX = 1024
+
 # Python 2/3 compatibility:
 try:
     py_string = unicode
@@ -103,7 +106,19 @@ def parameter_to_arg(operation, function, pythonic_params=False,
         name = name and snake_and_shadow(name)
         return sanitized(name)
 
-    sanitize = pythonic if pythonic_params else sanitized
+    sanitize_name = pythonic if pythonic_params else sanitized
+    sanitized_names = {}
+
+    def sanitize(name):
+        # the same few parameter names come with every request
+        try:
+            return sanitized_names[name]
+        except KeyError:
+            value = sanitize_name(name)
+            if len(sanitized_names) < SANITIZED_NAMES_MAX:
+                sanitized_names[name] = value
+            return value
+
     logger.debug('Function is : %s', function)
     import types
     logger.debug('Function isinstance(object, types.FunctionType) : %s'
@@ -125,10 +140,12 @@ def parameter_to_arg(operation, function, pythonic_params=False,
         else:
             request_body = request.body
 
-        try:
-            query = request.query.to_dict(flat=False)
-        except AttributeError:
-            query = dict(request.query.items())
+        query = request.query
+        if type(query) is not dict:
+            try:
+                query = query.to_dict(flat=False)
+            except AttributeError:
+                query = dict(query.items())
 
         kwargs.update(
             operation.get_arguments(request.path_params, query, request_body,
@@ -2,6 +2,7 @@
 import abc
 import functools
 import logging
+import operator
 import re
 
 import six
@@ -20,6 +21,15 @@ QUERY_STRING_DELIMITERS = {
 }
 
 
+def coerce_dict(md):
+    """ MultiDict -> dict of lists
+    """
+    try:
+        return md.to_dict(flat=False)
+    except AttributeError:
+        return dict(md.items())
+
+
 @six.add_metaclass(abc.ABCMeta)
 class AbstractURIParser(BaseDecorator):
     parsable_parameters = ["query", "path"]
@@ -40,6 +50,8 @@ class AbstractURIParser(BaseDecorator):
                              if p["in"] in self.parsable_parameters}
         self._body_schema = body_defn.get("schema", {})
         self._body_encoding = body_defn.get("encoding", {})
+        # parameter name -> value extractor, built once per location
+        self._extractors = {}
 
     @abc.abstractproperty
     def param_defns(self):
@@ -91,18 +103,43 @@ class AbstractURIParser(BaseDecorator):
         the parameter definition.
         """
 
+    def _make_extractor(self, param_defn, param_schema, _in):
+        """
+        returns a function taking the list of values given for a parameter
+        and returning its resolved value
+        """
+        if param_schema is not None and param_schema.get('type') == 'array':
+            def extract(values):
+                # resolve variable re-assignment, handle explode
+                values = self._resolve_param_duplicates(values, param_defn, _in)
+                # handle array styles
+                return self._split(values, param_defn, _in)
+            return extract
+        return operator.itemgetter(-1)
+
+    def _get_extractors(self, _in):
+        extractors = self._extractors.get(_in)
+        if extractors is None:
+            param_schemas = self.param_schemas
+            extractors = {}
+            for k, param_defn in self.param_defns.items():
+                param_schema = param_schemas.get(k)
+                if param_defn or param_schema:
+                    extractors[k] = self._make_extractor(param_defn, param_schema, _in)
+            self._extractors[_in] = extractors
+        return extractors
+
     def resolve_params(self, params, _in):
         """
         takes a dict of parameters, and resolves the values into
         the correct array type handling duplicate values, and splitting
         based on the collectionFormat defined in the spec.
         """
+        extractors = self._get_extractors(_in)
         resolved_param = {}
         for k, values in params.items():
-            param_defn = self.param_defns.get(k)
-            param_schema = self.param_schemas.get(k)
-
-            if not (param_defn or param_schema):
+            extract = extractors.get(k)
+            if extract is None:
                 # rely on validation
                 resolved_param[k] = values
                 continue
@@ -111,13 +148,7 @@ class AbstractURIParser(BaseDecorator):
                 # multiple values in a path is impossible
                 values = [values]
 
-            if (param_schema is not None and param_schema['type'] == 'array'):
-                # resolve variable re-assignment, handle explode
-                values = self._resolve_param_duplicates(values, param_defn, _in)
-                # handle array styles
-                resolved_param[k] = self._split(values, param_defn, _in)
-            else:
-                resolved_param[k] = values[-1]
+            resolved_param[k] = extract(values)
 
         return resolved_param
 
@@ -129,21 +160,11 @@ class AbstractURIParser(BaseDecorator):
 
         @functools.wraps(function)
         def wrapper(request):
-            def coerce_dict(md):
-                """ MultiDict -> dict of lists
-                """
-                try:
-                    return md.to_dict(flat=False)
-                except AttributeError:
-                    return dict(md.items())
-
-            query = coerce_dict(request.query)
-            path_params = coerce_dict(request.path_params)
-            form = coerce_dict(request.form)
-
-            request.query = self.resolve_query(query)
-            request.path_params = self.resolve_path(path_params)
-            request.form = self.resolve_form(form)
+            # resolve_path only reads the path parameters, and an empty
+            # form resolves to an empty dict, so neither is copied here
+            request.query = self.resolve_query(coerce_dict(request.query))
+            request.path_params = self.resolve_path(request.path_params)
+            request.form = self.resolve_form(coerce_dict(request.form)) if request.form else {}
             response = function(request)
             return response
 
@@ -155,17 +176,22 @@ class OpenAPIURIParser(AbstractURIParser):
                       "query": "form", "cookie": "form",
                       "form": "form"}
 
+    def __init__(self, param_defns, body_defn):
+        super(OpenAPIURIParser, self).__init__(param_defns, body_defn)
+        self._form_defns = dict(self._body_schema.get('properties', {}))
+        self._param_schemas = {k: v.get('schema', {}) for k, v in self._param_defns.items()}
+
     @property
     def param_defns(self):
         return self._param_defns
 
     @property
     def form_defns(self):
-        return {k: v for k, v in self._body_schema.get('properties', {}).items()}
+        return self._form_defns
 
     @property
     def param_schemas(self):
-        return {k: v.get('schema', {}) for k, v in self.param_defns.items()}
+        return self._param_schemas
 
     def resolve_form(self, form_data):
         if self._body_schema is None or self._body_schema.get('type') != 'object':
@@ -203,6 +229,8 @@ class OpenAPIURIParser(AbstractURIParser):
         """ deep objects provide a way of rendering nested objects using query
             parameters.
         """
+        if not any('[' in k for k in query_data):
+            return query_data
         deep = [self._make_deep_object(k, v) for k, v in query_data.items()]
         root_keys = [k for k, v, is_deep_object in deep]
         ret = dict.fromkeys(root_keys, [{}])
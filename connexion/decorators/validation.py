@@ -244,11 +244,48 @@ class ParameterValidator(object):
         for p in parameters:
             self.parameters[p['in']].append(p)
 
+        # validators are compiled once here and looked up per request
+        self._validators = {}
+        for p in parameters:
+            parameter_type = 'formdata' if p['in'] == 'formData' else p['in']
+            self._validators[id(p)] = self.compile_parameter_validator(parameter_type, p)
+
         self.api = api
         self.strict_validation = strict_validation
 
     @staticmethod
-    def validate_parameter(parameter_type, value, param, param_name=None):
+    def compile_parameter_validator(parameter_type, param):
+        """
+        Builds the jsonschema validator of a single parameter. The result only
+        depends on the parameter definition, so it is built once per operation
+        instead of on every request.
+
+        :type parameter_type: str
+        :type param: dict
+        :rtype: jsonschema.IValidator
+        """
+        param = copy.deepcopy(param)
+        param = param.get('schema', param)
+        if 'required' in param:
+            del param['required']
+
+        if parameter_type == 'formdata' and param.get('type') == 'file':
+            if _jsonschema_3_or_newer:
+                return extend(
+                    Draft4Validator,
+                    type_checker=Draft4Validator.TYPE_CHECKER.redefine(
+                        "file",
+                        lambda checker, instance: isinstance(instance, FileStorage)
+                    )
+                )(param, format_checker=draft4_format_checker)
+            return Draft4Validator(
+                param,
+                format_checker=draft4_format_checker,
+                types={'file': FileStorage})
+        return Draft4Validator(param, format_checker=draft4_format_checker)
+
+    @staticmethod
+    def validate_parameter(parameter_type, value, param, param_name=None, validator=None):
         if value is not None:
             if is_nullable(param) and is_null(value):
                 return
@@ -258,36 +295,18 @@ class ParameterValidator(object):
             except TypeValidationError as e:
                 return str(e)
 
-            param = copy.deepcopy(param)
-            param = param.get('schema', param)
-            if 'required' in param:
-                del param['required']
+            if validator is None:
+                validator = ParameterValidator.compile_parameter_validator(parameter_type, param)
             try:
-                if parameter_type == 'formdata' and param.get('type') == 'file':
-                    if _jsonschema_3_or_newer:
-                        extend(
-                            Draft4Validator,
-                            type_checker=Draft4Validator.TYPE_CHECKER.redefine(
-                                "file",
-                                lambda checker, instance: isinstance(instance, FileStorage)
-                            )
-                        )(param, format_checker=draft4_format_checker).validate(converted_value)
-                    else:
-                        Draft4Validator(
-                            param,
-                            format_checker=draft4_format_checker,
-                            types={'file': FileStorage}).validate(converted_value)
-                else:
-                    Draft4Validator(
-                        param, format_checker=draft4_format_checker).validate(converted_value)
+                validator.validate(converted_value)
             except ValidationError as exception:
                 debug_msg = 'Error while converting value {converted_value} from param ' \
                             '{type_converted_value} of type real type {param_type} to the declared type {param}'
                 fmt_params = dict(
                     converted_value=str(converted_value),
                     type_converted_value=type(converted_value),
-                    param_type=param.get('type'),
-                    param=param
+                    param_type=validator.schema.get('type'),
+                    param=validator.schema
                 )
                 logger.info(debug_msg.format(**fmt_params))
                 return str(exception)
@@ -317,19 +336,23 @@ class ParameterValidator(object):
         :rtype: str
         """
         val = request.query.get(param['name'])
-        return self.validate_parameter('query', val, param)
+        return self.validate_parameter('query', val, param,
+                                       validator=self._validators.get(id(param)))
 
     def validate_path_parameter(self, param, request):
         val = request.path_params.get(param['name'].replace('-', '_'))
-        return self.validate_parameter('path', val, param)
+        return self.validate_parameter('path', val, param,
+                                       validator=self._validators.get(id(param)))
 
     def validate_header_parameter(self, param, request):
         val = request.headers.get(param['name'])
-        return self.validate_parameter('header', val, param)
+        return self.validate_parameter('header', val, param,
+                                       validator=self._validators.get(id(param)))
 
     def validate_cookie_parameter(self, param, request):
         val = request.cookies.get(param['name'])
-        return self.validate_parameter('cookie', val, param)
+        return self.validate_parameter('cookie', val, param,
+                                       validator=self._validators.get(id(param)))
 
     def validate_formdata_parameter(self, param_name, param, request):
         if param.get('type') == 'file' or param.get('format') == 'binary':
@@ -337,7 +360,8 @@ class ParameterValidator(object):
         else:
             val = request.form.get(param_name)
 
-        return self.validate_parameter('formdata', val, param)
+        return self.validate_parameter('formdata', val, param,
+                                       validator=self._validators.get(id(param)))
 
     def __call__(self, function):
         """
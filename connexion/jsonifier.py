@@ -1,40 +1,193 @@
 import datetime
 import json
+import logging
+import re
 import uuid
+from decimal import Decimal
+
+logger = logging.getLogger('connexion.jsonifier')
+
+# Every backend writes the same format: compact separators (a space after
+# ':' only when indenting) and non-ASCII characters escaped as \uXXXX,
+# which is what the standard library writes by default.
+SEPARATORS = (',', ':')
+INDENT_SEPARATORS = (',', ': ')
+
+NON_ASCII = re.compile(u'[^\x00-\x7f]')
+
+
+def escape_non_ascii(text):
+    """ Escapes non-ASCII characters the way json.dumps(ensure_ascii=True)
+    does, characters outside the BMP become surrogate pairs.
+    """
+    def replace(match):
+        n = ord(match.group(0))
+        if n < 0x10000:
+            return '\\u{0:04x}'.format(n)
+        n -= 0x10000
+        return '\\u{0:04x}\\u{1:04x}'.format(0xd800 | ((n >> 10) & 0x3ff),
+                                             0xdc00 | (n & 0x3ff))
+    return NON_ASCII.sub(replace, text)
+
+
+def json_default(o):
+    """ Serializes the types the json libraries do not handle natively.
+    Shared by every backend so that their output stays the same.
+    """
+    if isinstance(o, datetime.datetime):
+        if o.tzinfo:
+            # eg: '2015-09-25T23:14:42.588601+00:00'
+            return o.isoformat('T')
+        else:
+            # No timezone present - assume UTC.
+            # eg: '2015-09-25T23:14:42.588601Z'
+            return o.isoformat('T') + 'Z'
+
+    if isinstance(o, datetime.date):
+        return o.isoformat()
+
+    if isinstance(o, uuid.UUID):
+        return str(o)
+
+    if isinstance(o, Decimal):
+        return float(o)
+
+    raise TypeError('Object of type {} is not JSON serializable'.format(type(o).__name__))
 
 
 class JSONEncoder(json.JSONEncoder):
     def default(self, o):
-        if isinstance(o, datetime.datetime):
-            if o.tzinfo:
-                # eg: '2015-09-25T23:14:42.588601+00:00'
-                return o.isoformat('T')
-            else:
-                # No timezone present - assume UTC.
-                # eg: '2015-09-25T23:14:42.588601Z'
-                return o.isoformat('T') + 'Z'
+        try:
+            return json_default(o)
+        except TypeError:
+            return json.JSONEncoder.default(self, o)
+
+
+class StdlibJSONBackend(object):
+    """
+    Serialization through the standard library json module
+    """
+    name = 'json'
+
+    def dumps(self, data, indent=None, **kwargs):
+        if 'default' not in kwargs:
+            kwargs.setdefault('cls', JSONEncoder)
+        kwargs.setdefault('separators', INDENT_SEPARATORS if indent else SEPARATORS)
+        return json.dumps(data, indent=indent, **kwargs)
 
-        if isinstance(o, datetime.date):
-            return o.isoformat()
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonBackend(object):
+    """
+    Serialization through orjson, datetimes, dates and UUIDs are handled
+    natively and naive datetimes are written as UTC with a 'Z' suffix.
+    orjson always writes UTF-8, non-ASCII characters are escaped afterwards.
+    """
+    name = 'orjson'
 
-        if isinstance(o, uuid.UUID):
-            return str(o)
+    def __init__(self):
+        import orjson
+        self.orjson = orjson
+        self.option = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
 
-        return json.JSONEncoder.default(self, o)
+    def dumps(self, data, indent=None, sort_keys=False, default=None, **kwargs):
+        option = self.option
+        if indent:
+            option |= self.orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= self.orjson.OPT_SORT_KEYS
+        text = self.orjson.dumps(data, default=default or json_default, option=option).decode('utf-8')
+        if not text.isascii():
+            text = escape_non_ascii(text)
+        return text
+
+    def loads(self, data):
+        return self.orjson.loads(data)
+
+
+class UjsonBackend(object):
+    """
+    Serialization through ujson, only versions accepting a default
+    function are used.
+    """
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+        # ujson < 4 silently ignores or rejects default
+        ujson.dumps(datetime.date(2000, 1, 1), default=json_default)
+        self.ujson = ujson
+
+    def dumps(self, data, indent=None, sort_keys=False, default=None, **kwargs):
+        return self.ujson.dumps(data,
+                                indent=indent or 0,
+                                sort_keys=sort_keys,
+                                ensure_ascii=True,
+                                escape_forward_slashes=False,
+                                default=default or json_default)
+
+    def loads(self, data):
+        return self.ujson.loads(data)
+
+
+JSON_BACKENDS = (OrjsonBackend, UjsonBackend, StdlibJSONBackend)
+
+_json_backend = None
+
+
+def _load_json_backend(name):
+    candidates = [b for b in JSON_BACKENDS if name in (None, 'auto', b.name)]
+    if not candidates:
+        logger.warning('Unknown JSON backend %s, falling back to json', name)
+    for backend_class in candidates:
+        try:
+            return backend_class()
+        except Exception:
+            logger.debug('JSON backend %s is not available', backend_class.name)
+    if name not in (None, 'auto', StdlibJSONBackend.name):
+        logger.warning('JSON backend %s is not available, falling back to json', name)
+    return StdlibJSONBackend()
+
+
+def set_json_backend(name=None):
+    """
+    Selects the JSON backend used by Connexion.
+
+    :param name: 'orjson', 'ujson' or 'json', None or 'auto' picks the
+                 fastest available one
+    """
+    global _json_backend
+    _json_backend = _load_json_backend(name)
+    logger.info('Using JSON backend %s', _json_backend.name)
+    return _json_backend
+
+
+def get_json_backend():
+    """ Returns the selected JSON backend, choosing one on first use """
+    if _json_backend is None:
+        return set_json_backend()
+    return _json_backend
 
 
 class Jsonifier(object):
     """
     Used to serialized and deserialize to/from JSon
     """
-    def __init__(self, json_=json, **kwargs):
+    def __init__(self, json_=None, **kwargs):
         """
-        :param json_: json library to use. Must have loads() and dumps() method
+        :param json_: json library to use. Must have loads() and dumps() method,
+                      the selected JSON backend is used when omitted
         :param kwargs: default arguments to pass to json.dumps()
         """
-        self.json = json_
+        self._json = json_
         self.dumps_args = kwargs
 
+    @property
+    def json(self):
+        return self._json or get_json_backend()
+
     def dumps(self, data, **kwargs):
         """ Central point where JSON serialization happens inside
         Connexion.
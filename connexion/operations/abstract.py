@@ -1,5 +1,6 @@
 import abc
 import logging
+from copy import deepcopy
 
 import six
 from connexion.operations.secure import SecureOperation
@@ -24,6 +25,19 @@ IGNORE_PARAM_KEYS = ['time_stamp', 'version', 'owner', 'signature_method',
                      'access_key_id', 'zone', 'signature_version', 'service',
                      'user_id']
 
+# default values of these types can be shared between requests
+IMMUTABLE_DEFAULT_TYPES = six.string_types + six.integer_types + (float, bool, type(None))
+
+
+def defaults_copier(defaults):
+    """
+    Returns the cheapest function copying defaults without sharing
+    mutable values between requests
+    """
+    if all(isinstance(v, IMMUTABLE_DEFAULT_TYPES) for v in defaults.values()):
+        return dict
+    return deepcopy
+
 
 @six.add_metaclass(abc.ABCMeta)
 class AbstractOperation(SecureOperation):
@@ -106,6 +120,9 @@ class AbstractOperation(SecureOperation):
         self._validator_map = dict(VALIDATOR_MAP)
         self._validator_map.update(validator_map or {})
 
+        # parameter definitions by location, computed on first request
+        self._arguments_cache = {}
+
     @property
     def method(self):
         """
@@ -219,12 +236,25 @@ class AbstractOperation(SecureOperation):
         extract handler function arguments from the request body
         """
 
+    def _memoize(self, key, factory):
+        """
+        Returns factory() computed once per key for this operation, used for
+        what is derived from the spec only and would otherwise be rebuilt on
+        every request
+        """
+        try:
+            return self._arguments_cache[key]
+        except KeyError:
+            value = self._arguments_cache[key] = factory()
+            return value
+
     def _get_path_arguments(self, path_params, sanitize):
         """
         extract handler function arguments from path parameters
         """
         kwargs = {}
-        path_defns = {p["name"]: p for p in self.parameters if p["in"] == "path"}
+        path_defns = self._memoize('path', lambda: {p["name"]: p for p in self.parameters
+                                                    if p["in"] == "path"})
         for key, value in path_params.items():
             sanitized_key = sanitize(key)
             if key in path_defns:
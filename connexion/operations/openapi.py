@@ -1,7 +1,7 @@
 import logging
 from copy import copy, deepcopy
 
-from connexion.operations.abstract import AbstractOperation
+from connexion.operations.abstract import AbstractOperation, defaults_copier
 
 from ..decorators.uri_parsing import OpenAPIURIParser
 from ..utils import deep_get, deep_merge, is_null, is_nullable, make_type
@@ -358,12 +358,16 @@ class OpenAPIOperation(AbstractOperation):
         return defaults
 
     def _get_query_arguments(self, query, arguments, has_kwargs, sanitize):
-        query_defns = {sanitize(p["name"]): p
-                       for p in self.parameters
-                       if p["in"] == "query"}
-        default_query_params = self._get_query_defaults(query_defns)
 
-        query_arguments = deepcopy(default_query_params)
+        def build():
+            query_defns = {sanitize(p["name"]): p
+                           for p in self.parameters
+                           if p["in"] == "query"}
+            default_query_params = self._get_query_defaults(query_defns)
+            return query_defns, default_query_params, defaults_copier(default_query_params)
+
+        query_defns, default_query_params, copy_defaults = self._memoize(('query', sanitize), build)
+        query_arguments = copy_defaults(default_query_params)
         query_arguments = deep_merge(query_arguments, query)
         return self._query_args_helper(query_defns, query_arguments,
                                        arguments, has_kwargs, sanitize)
@@ -1,7 +1,7 @@
 import logging
 from copy import deepcopy
 
-from connexion.operations.abstract import AbstractOperation
+from connexion.operations.abstract import AbstractOperation, defaults_copier
 
 from ..decorators.uri_parsing import Swagger2URIParser
 from ..exceptions import InvalidSpecification
@@ -248,31 +248,39 @@ class Swagger2Operation(AbstractOperation):
 
     def _get_query_arguments(self, query, arguments, has_kwargs, sanitize):
 
-        query_defns = {sanitize(p["name"]): p
-                       for p in self.parameters
-                       if p["in"] == "query"}
-        default_query_params = {k: v['default']
-                                for k, v in query_defns.items()
-                                if 'default' in v}
-        query_arguments = deepcopy(default_query_params)
+        def build():
+            query_defns = {sanitize(p["name"]): p
+                           for p in self.parameters
+                           if p["in"] == "query"}
+            default_query_params = {k: v['default']
+                                    for k, v in query_defns.items()
+                                    if 'default' in v}
+            return query_defns, default_query_params, defaults_copier(default_query_params)
+
+        query_defns, default_query_params, copy_defaults = self._memoize(('query', sanitize), build)
+        query_arguments = copy_defaults(default_query_params)
         query_arguments.update(query)
         return self._query_args_helper(query_defns, query_arguments,
                                        arguments, has_kwargs, sanitize)
 
     def _get_body_argument(self, body, arguments, has_kwargs, sanitize):
         kwargs = {}
-        body_parameters = [p for p in self.parameters if p['in'] == 'body'] or [{}]
-        if body is None:
-            body = deepcopy(body_parameters[0].get('schema', {}).get('default'))
-        body_name = sanitize(body_parameters[0].get('name'))
-
-        form_defns = {sanitize(p['name']): p
-                      for p in self.parameters
-                      if p['in'] == 'formData'}
 
-        default_form_params = {k: v['default']
-                               for k, v in form_defns.items()
-                               if 'default' in v}
+        def build():
+            body_parameters = [p for p in self.parameters if p['in'] == 'body'] or [{}]
+            form_defns = {sanitize(p['name']): p
+                          for p in self.parameters
+                          if p['in'] == 'formData'}
+            default_form_params = {k: v['default']
+                                   for k, v in form_defns.items()
+                                   if 'default' in v}
+            return (body_parameters[0], sanitize(body_parameters[0].get('name')),
+                    form_defns, default_form_params, defaults_copier(default_form_params))
+
+        body_parameter, body_name, form_defns, default_form_params, copy_defaults = \
+            self._memoize(('body', sanitize), build)
+        if body is None:
+            body = deepcopy(body_parameter.get('schema', {}).get('default'))
 
         # Add body parameters
         if body_name:
@@ -283,7 +291,7 @@ class Swagger2Operation(AbstractOperation):
                 kwargs[body_name] = body
 
         # Add formData parameters
-        form_arguments = deepcopy(default_form_params)
+        form_arguments = copy_defaults(default_form_params)
         if form_defns and body:
             form_arguments.update(body)
         for key, value in form_arguments.items():
@@ -134,6 +134,27 @@ class ConnexionOptions(object):
         """
         return self._options.get('uri_parser_class', None)
 
+    @property
+    def spec_cache_dir(self):
+        # type: () -> str
+        """
+        Directory where the resolved specification is cached, keyed by a
+        hash of the rendered specification. Caching is disabled when unset.
+        Default: None
+        """
+        return self._options.get('spec_cache_dir', None)
+
+    @property
+    def lazy_operations(self):
+        # type: () -> bool
+        """
+        Whether the handler of an operation is imported and its wrapper
+        built on the first request instead of when the API is added.
+        Errors in doing so are then only raised on that request.
+        Default: False
+        """
+        return self._options.get('lazy_operations', False)
+
 
 def filter_values(dictionary):
     # type: (dict) -> dict
@@ -20,15 +20,36 @@ class Resolution(object):
         self.operation_id = operation_id
 
 
+class LazyResolution(Resolution):
+    def __init__(self, resolver, operation_id):
+        """
+        Resolution whose function is only resolved when first accessed
+
+        :type resolver: Resolver
+        """
+        self._resolver = resolver
+        self._function = None
+        self.operation_id = operation_id
+
+    @property
+    def function(self):
+        if self._function is None:
+            self._function = self._resolver.resolve_function_from_operation_id(self.operation_id)
+        return self._function
+
+
 class Resolver(object):
-    def __init__(self, function_resolver=utils.get_function_from_name):
+    def __init__(self, function_resolver=utils.get_function_from_name, lazy=False):
         """
         Standard resolver
 
         :param function_resolver: Function that resolves functions using an operationId
         :type function_resolver: types.FunctionType
+        :param lazy: Defer resolving the function until it is first used
+        :type lazy: bool
         """
         self.function_resolver = function_resolver
+        self.lazy = lazy
 
     def resolve(self, operation):
         """
@@ -37,6 +58,8 @@ class Resolver(object):
         :type operation: connexion.operations.AbstractOperation
         """
         operation_id = self.resolve_operation_id(operation)
+        if self.lazy:
+            return LazyResolution(self, operation_id)
         return Resolution(self.resolve_function_from_operation_id(operation_id), operation_id)
 
     def resolve_operation_id(self, operation):
@@ -1,6 +1,12 @@
 import abc
 import copy
+import hashlib
+import json
+import logging
+import os
 import pathlib
+import sys
+import tempfile
 
 import jinja2
 import six
@@ -19,6 +25,11 @@ except ImportError:
     import collections as collections_abc
 
 
+logger = logging.getLogger('connexion.spec')
+
+# bump when the layout of cached specifications changes
+SPEC_CACHE_FORMAT = 2
+
 NO_SPEC_VERSION_ERR_MSG = """Unable to get the spec version.
 You are missing either '"swagger": "2.0"' or '"openapi": "3.0.0"'
 from the top level of your spec."""
@@ -79,9 +90,9 @@ class Specification(collections_abc.Mapping):
         return self._spec.__len__()
 
     @staticmethod
-    def _load_spec_from_file(arguments, specification):
+    def _render_spec_file(arguments, specification):
         """
-        Loads a YAML specification file, optionally rendering it with Jinja2.
+        Reads a YAML specification file, optionally rendering it with Jinja2.
         Takes:
           arguments - passed to Jinja2 renderer
           specification - path to specification
@@ -95,17 +106,126 @@ class Specification(collections_abc.Mapping):
             except UnicodeDecodeError:
                 openapi_template = contents.decode('utf-8', 'replace')
 
-            openapi_string = jinja2.Template(openapi_template).render(**arguments)
-            return yaml.safe_load(openapi_string)
+            return jinja2.Template(openapi_template).render(**arguments)
+
+    @staticmethod
+    def _load_spec_from_file(arguments, specification):
+        """
+        Loads a YAML specification file, optionally rendering it with Jinja2.
+        Takes:
+          arguments - passed to Jinja2 renderer
+          specification - path to specification
+        """
+        openapi_string = Specification._render_spec_file(arguments, specification)
+        return yaml.safe_load(openapi_string)
+
+    @staticmethod
+    def _cache_path(cache_dir, openapi_string):
+        digest = hashlib.sha256()
+        digest.update(openapi_string.encode('utf-8'))
+        digest.update('{}:{}'.format(SPEC_CACHE_FORMAT, sys.version_info[:2]).encode('utf-8'))
+        return os.path.join(cache_dir, 'spec-{}.json'.format(digest.hexdigest()))
+
+    @staticmethod
+    def _private_cache_dir(cache_dir):
+        """
+        Creates the cache directory with mode 0700 and returns whether it is
+        owned by the current user and not accessible to anyone else
+        """
+        try:
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir, 0o700)
+            stat = os.lstat(cache_dir)
+        except OSError:
+            logger.warning('Specification cache directory %s is unavailable', cache_dir, exc_info=True)
+            return False
+        if stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+            logger.warning('Not using specification cache directory %s, it must be owned '
+                           'by the current user with mode 0700', cache_dir)
+            return False
+        return True
+
+    @classmethod
+    def _load_cached(cls, cache_path):
+        """
+        Rebuilds a specification from its cached raw and resolved documents
+        without validating or resolving it again
+        """
+        try:
+            with open(cache_path, 'r') as cache_file:
+                cached = json.load(cache_file)
+        except (IOError, OSError):
+            return None
+        except ValueError:
+            logger.warning('Ignoring unreadable cached specification %s', cache_path, exc_info=True)
+            return None
+        try:
+            raw_spec, resolved_spec = cached['raw'], cached['spec']
+            version = cls._get_spec_version(resolved_spec)
+        except (KeyError, TypeError, InvalidSpecification):
+            logger.warning('Ignoring malformed cached specification %s', cache_path)
+            return None
+        spec_cls = Swagger2Specification if version < (3, 0, 0) else OpenAPISpecification
+        spec = spec_cls.__new__(spec_cls)
+        spec._raw_spec = raw_spec
+        spec._spec = resolved_spec
+        return spec
+
+    @staticmethod
+    def _store_cached(cache_path, spec):
+        """
+        Writes through a temporary file so that concurrently starting
+        workers never read a partial cache file
+        """
+        cache_dir = os.path.dirname(cache_path)
+        try:
+            contents = json.dumps({'raw': spec._raw_spec, 'spec': spec._spec})
+        except (TypeError, ValueError):
+            # e.g. recursive schemas resolve to circular structures
+            logger.warning('Specification cannot be cached as JSON', exc_info=True)
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        except Exception:
+            logger.warning('Failed to cache specification to %s', cache_path, exc_info=True)
+            return
+        try:
+            with os.fdopen(fd, 'w') as cache_file:
+                cache_file.write(contents)
+            os.rename(tmp_path, cache_path)
+        except Exception:
+            logger.warning('Failed to cache specification to %s', cache_path, exc_info=True)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
 
     @classmethod
-    def from_file(cls, spec, arguments=None):
+    def from_file(cls, spec, arguments=None, cache_dir=None):
         """
         Takes in a path to a YAML file, and returns a Specification
+
+        With cache_dir the resolved specification is cached there, keyed by
+        a hash of the rendered file, so later loads skip parsing, validation
+        and reference resolution. External references are not part of the
+        hash, clear the cache when only they change. The directory must be
+        private to the current user, otherwise caching is skipped.
         """
         specification_path = pathlib.Path(spec)
-        spec = cls._load_spec_from_file(arguments, specification_path)
-        return cls.from_dict(spec)
+        openapi_string = cls._render_spec_file(arguments, specification_path)
+
+        cache_path = None
+        if cache_dir and cls._private_cache_dir(cache_dir):
+            cache_path = cls._cache_path(cache_dir, openapi_string)
+            cached = cls._load_cached(cache_path)
+            if cached is not None:
+                logger.debug('Loaded cached specification %s', cache_path)
+                return cached
+
+        spec = cls.from_dict(yaml.safe_load(openapi_string))
+        if cache_path:
+            cls._store_cached(cache_path, spec)
+        return spec
 
     @staticmethod
     def _get_spec_version(spec):
@@ -149,9 +269,9 @@ class Specification(collections_abc.Mapping):
         return type(self)(copy.deepcopy(self._raw_spec))
 
     @classmethod
-    def load(cls, spec, arguments=None):
+    def load(cls, spec, arguments=None, cache_dir=None):
         if not isinstance(spec, dict):
-            return cls.from_file(spec, arguments=arguments)
+            return cls.from_file(spec, arguments=arguments, cache_dir=cache_dir)
         return cls.from_dict(spec)
 
     def with_base_path(self, base_path):
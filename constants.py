@@ -40,6 +40,10 @@ TIMEOUT_ACCOUNT_SERVER = 5
 TIMEOUT_ACCOUNT_SERVER_LONG = 10
 TIMEOUT_IAM_SIGNATURE_SERVER_LONG = 10
 
+# 已验证签名的缓存时间及容量，缓存时间不超过请求本身的有效期
+SIGNATURE_CACHE_TTL = 60
+SIGNATURE_CACHE_SIZE = 10000
+
 # long handle time
 LONG_HANDLE_TIME = 20
 
@@ -98,6 +102,16 @@ MC_KEY_PREFIX_CERTIFICATES = "%s.Certificates" % MC_KEY_PREFIX_ROOT
 MC_KEY_PREFIX_ACCOUNT_USER_ZONE = "%s.UserZone" % MC_KEY_PREFIX_ACCOUNT
 MC_DEFAULT_CACHE_TIME = 3600*24
 
+# 进程内缓存，位于memcached之前，单位秒
+LOCAL_CACHE_TIME = 30
+LOCAL_CACHE_NEGATIVE_TIME = 5   # 查询不到的结果的缓存时间
+LOCAL_CACHE_SIZE = 10000
+
+# IaaS客户端每个主机的最大并发连接数、失败重试次数及退避时间(单位秒)
+IAAS_CLIENT_MAX_CONNECTIONS = 16
+IAAS_CLIENT_RETRIES = 2
+IAAS_CLIENT_RETRY_BACKOFF = 0.2
+
 # ---------------------------------------------
 #       languages
 # ---------------------------------------------
@@ -205,6 +219,20 @@ MC_KEY_MAP = {
     API_TYPE_VMWARE_MANAGER: MC_KEY_PREFIX_VMWARE_MANAGER_API_ACCESS_COUNT,
 }
 
+# api访问次数限制的实现方式: memcached、leased、local
+ACCESS_LIMITER_MEMCACHED = "memcached"
+ACCESS_LIMITER_LEASED = "leased"
+ACCESS_LIMITER_LOCAL = "local"
+ACCESS_LIMITER_DEFAULT = ACCESS_LIMITER_LEASED
+
+# 每次从memcached租用的访问次数上限，及不超过配额的几分之一
+ACCESS_LIMIT_LEASE_SIZE = 20
+ACCESS_LIMIT_LEASE_DIVISOR = 10
+# 租用次数的有效期，到期未用完的次数归还memcached，单位秒
+ACCESS_LIMIT_LEASE_TIME = 5
+# 进程内计数时清理过期窗口的间隔，单位秒
+ACCESS_LIMIT_PRUNE_INTERVAL = 60
+
 SERVER_TYPE_FRONT_GATE = "vmware_manager_fg"
 FRONT_GATE_PORT = 9666
 FRONT_GATE_PROXY_PORT = 9665
@@ -255,10 +283,52 @@ PLATFORM_VM_STATUS_ENUM_MAPPER = {
     PlatformVmStatus.SUSPENDED.value: 0
 }
 
+# 虚拟机列表可选返回的字段和需要获取的VMware vSphere属性的映射
+VM_FIELD_PROPERTY_MAPPING = {
+    "uuid": ["summary.config.uuid"],
+    "is_template": ["summary.config.template"],
+    "name": ["summary.config.name"],
+    "status": ["summary.runtime.powerState"],
+    "vmware_tools_status": ["guest.toolsStatus"],
+    "note": ["config.annotation"],
+    "create_time": ["config.createDate"],
+    "folder": ["parent"],
+    "os_type": ["summary.config.guestId"],
+    "os_name": ["summary.config.guestFullName"],
+    "cpu": ["config.hardware.numCPU"],
+    "memory": ["config.hardware.memoryMB"],
+    "nic": ["guest.ipAddress"],
+    "disk": ["config.hardware.device"],
+    "host": ["summary.runtime.host"]
+}
+
+# 指定返回字段时始终返回的字段
+VM_REQUIRED_FIELDS = ["uuid", "name"]
+
+# 流式返回虚拟机列表时的响应类型及每页从平台获取的虚拟机数量
+NDJSON_MIMETYPE = "application/x-ndjson"
+VM_STREAM_PAGE_SIZE = 500
+
 
 # timeout for connetct to  VMware vSphere platform
 TIMEOUT_CONNECT_TO_PLATFORM = 200
 
+# 后台刷新VMware vSphere平台状态的相关参数
+PLATFORM_REFRESH_INTERVAL = 300     # 单个平台的刷新间隔，单位秒
+PLATFORM_REFRESH_JITTER = 0.2       # 刷新间隔的随机抖动比例
+PLATFORM_REFRESH_CONCURRENCY = 4    # 同时刷新的平台数量上限
+PLATFORM_REFRESH_TICK = 10          # 调度线程的轮询周期，单位秒
+# 同一台主机上只有持有该文件锁的进程刷新平台
+PLATFORM_REFRESH_LOCK_FILE = "/pitrix/run/vmware_manager/platform_refresher.lock"
+
+ZONE_REFRESH_INTERVAL = 300         # zone/region拓扑的刷新间隔，单位秒
+ZONE_REFRESH_JITTER = 0.2           # 刷新间隔的随机抖动比例
+ZONE_REFRESH_RETRY_INTERVAL = 10    # 刷新失败后的重试间隔，单位秒
+
+# 响应压缩的最小大小(单位字节)及压缩级别
+COMPRESS_MIN_SIZE = 1024
+COMPRESS_LEVEL = 6
+
 
 # qingcloud metric 与 VMware metric 映射关系
 METRIC_COUNTER_MAPPING = {
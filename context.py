@@ -1,17 +1,94 @@
 # -*- coding: utf-8 -*-
 
 import os
+import threading
+import time
 from log.logger import logger
 from utils.yaml_tool import yaml_load
-from constants import API_SECURE_PORTS
+from uutils.common import to_bool
+from constants import (
+    API_SECURE_PORTS,
+    PLATFORM_REFRESH_INTERVAL,
+    PLATFORM_REFRESH_CONCURRENCY,
+    PLATFORM_REFRESH_LOCK_FILE,
+    COMPRESS_MIN_SIZE,
+    COMPRESS_LEVEL,
+    ACCESS_LIMITER_DEFAULT
+)
+
+
+def _to_ports(value):
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return frozenset(int(port) for port in value)
+    return frozenset([int(value)])
+
+
+# ws_server中的配置项: (名称, 类型转换, 默认值)，类型转换为None时保留原值
+CONF_OPTIONS = (
+    ("iaas_client_conf", None, None),
+    ("secure_ports", _to_ports, API_SECURE_PORTS),
+    ("zone_id", None, None),
+    ("enable_find_fg_with_zk", to_bool, False),
+    ("check_access_limit", to_bool, False),
+    ("access_limiter", str, ACCESS_LIMITER_DEFAULT),
+    ("verify_signature_via_iam", to_bool, True),
+    ("broker_port", int, None),
+    ("enable_platform_refresher", to_bool, True),
+    ("platform_refresh_interval", float, PLATFORM_REFRESH_INTERVAL),
+    ("platform_refresh_concurrency", int, PLATFORM_REFRESH_CONCURRENCY),
+    ("platform_refresh_lock_file", str, PLATFORM_REFRESH_LOCK_FILE),
+    ("json_backend", str, 'auto'),
+    ("enable_compression", to_bool, True),
+    ("compress_min_size", int, COMPRESS_MIN_SIZE),
+    ("compress_level", int, COMPRESS_LEVEL),
+    # 检查配置文件是否变化的间隔，单位秒，0表示不重新加载
+    ("conf_reload_interval", float, 0),
+    # 记录启动各阶段的耗时，指定文件时同时写入函数级统计
+    ("profile_startup", to_bool, False),
+    ("profile_startup_file", str, None),
+    # 解析后的API描述文件的缓存目录，须为当前用户私有(0700)，不设置时不缓存
+    ("spec_cache_dir", str, None),
+    # 接口的处理函数在第一次请求时才导入并构建，导入及构建错误不再阻止
+    # 服务启动，而是在第一次请求时返回500，默认关闭
+    ("lazy_api_loading", to_bool, False),
+    # 已执行的sql/upgrade中平台表升级脚本的版本号
+    ("platform_schema_version", int, 0),
+)
+
+
+class ServerConf(object):
+    """ ws_server的配置，加载时一次性完成类型转换
+
+    无法转换的配置项记录错误日志并使用默认值
+    """
+    __slots__ = tuple(name for name, _, _ in CONF_OPTIONS)
+
+    def __init__(self, conf):
+        for name, parser, default in CONF_OPTIONS:
+            value = conf.get(name, default)
+            if value is not None and parser is not None:
+                try:
+                    value = parser(value)
+                except (TypeError, ValueError):
+                    logger.error("invalid config [%s: %s], use default [%s]"
+                                 % (name, value, default))
+                    value = parser(default) if default is not None else None
+            setattr(self, name, value)
+
+    def items(self):
+        return [(name, getattr(self, name)) for name in self.__slots__]
 
 
 class VMwareManagerContext(object):
     """ thread context for VMware Manager
+
+    options of the config file are set as attributes when the config is
+    loaded, so reading them is a plain attribute access
     """
     def __init__(self):
         self.conf_file = None
         self.conf = None
+        self.server_conf = None
         self.pg = None
         self.pgm = None
         self.locator = None
@@ -19,42 +96,94 @@ class VMwareManagerContext(object):
         self.client = None
         self.mcclient = None
         self.domain_name = None
+        self.platform_refresher = None
+        self._conf_mtime = None
+        self._conf_lock = threading.Lock()
+        self._conf_reloader = None
+
+    def _read_conf_file(self):
+        """ return (ws_server config, mtime of config file) """
+        if not self.conf_file:
+            return None, None
+        if not os.path.isfile(self.conf_file):
+            logger.error("config file [%s] not exist" % self.conf_file)
+            return None, None
+
+        mtime = os.path.getmtime(self.conf_file)
+        with open(self.conf_file, "r") as fd:
+            conf = yaml_load(fd).get('ws_server', None)
+        return conf, mtime
+
+    def load_server_conf(self):
+        """ load config file and set its options as attributes
+        :return: True if config is loaded
+        """
+        with self._conf_lock:
+            try:
+                conf, mtime = self._read_conf_file()
+            except Exception as e:
+                logger.exception("load config file [%s] failed: %s"
+                                 % (self.conf_file, e))
+                return False
+            if not conf:
+                return False
+
+            server_conf = ServerConf(conf)
+            self.__dict__.update(server_conf.items())
+            self.server_conf = server_conf
+            self.conf = conf
+            self._conf_mtime = mtime
+            return True
 
     def get_server_conf(self):
         if not self.conf:
-            # get config
-            if self.conf_file != "":
-                if not os.path.isfile(self.conf_file):
-                    logger.error("config file [%s] not exist" % self.conf_file)
-                    return
+            self.load_server_conf()
+
+    def reload_server_conf_if_changed(self):
+        """ reload config if config file is modified
+        :return: True if config is reloaded
+        """
+        try:
+            mtime = os.path.getmtime(self.conf_file)
+        except (OSError, TypeError):
+            return False
+        if mtime == self._conf_mtime:
+            return False
 
-                with open(self.conf_file, "r") as fd:
-                    self.conf = yaml_load(fd).get('ws_server', None)
+        logger.info("config file [%s] changed, reload it" % self.conf_file)
+        return self.load_server_conf()
+
+    def start_conf_reloader(self):
+        """ poll config file in background if conf_reload_interval is set
+
+        only options read per request take effect after reloading,
+        the ones used at startup need a restart
+        """
+        interval = self.conf_reload_interval
+        if not interval or self._conf_reloader:
+            return
+
+        def reload_loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.reload_server_conf_if_changed()
+                except Exception as e:
+                    logger.exception("reload config failed: %s" % e)
+
+        self._conf_reloader = threading.Thread(target=reload_loop,
+                                               name="conf-reloader")
+        self._conf_reloader.daemon = True
+        self._conf_reloader.start()
 
     def __getattr__(self, attr):
-        # get conf short cut
-        try:
+        # only reached for attributes not set yet: load config on first
+        # use, options not in config read as None
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        if self.__dict__.get("conf") is None and "_conf_lock" in self.__dict__:
             self.get_server_conf()
-            if self.conf:
-                if attr == "iaas_client_conf":
-                    return self.conf['iaas_client_conf']
-                if attr == "secure_ports":
-                    return self.conf.get('secure_ports', API_SECURE_PORTS)
-                if attr == "zone_id":
-                    return self.conf.get('zone_id', None)
-                if attr == "enable_find_fg_with_zk":
-                    return self.conf.get('enable_find_fg_with_zk', False)
-                if attr == "check_access_limit":
-                    return self.conf.get('check_access_limit', False)
-                if attr == "verify_signature_via_iam":
-                    return self.conf.get('verify_signature_via_iam', True)
-                if attr == "broker_port":
-                    return self.conf.get('broker_port')
-
-        except Exception as _:
-            pass
-
-        return None
+        return self.__dict__.get(attr)
 
 
 g_ws_ctx = VMwareManagerContext()
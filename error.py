@@ -97,6 +97,7 @@ class ErrorCode(Enum):
     ERROR_VMWARE_VSPHERE_VM_MOINTOR_TIME_RANGE_ERROR = 6008
     ERROR_VMWARE_VSPHERE_VM_GET_VM_TICKET_ERROR = 6009
     ERROR_VMWARE_VSPHERE_VM_INVALID_VM_POWERSTATUS= 6010
+    ERROR_VMWARE_VSPHERE_VM_INVALID_FIELDS = 6011
 
 
 class ErrorMsg(Enum):
@@ -200,3 +201,7 @@ class ErrorMsg(Enum):
         EN: u"invalid vm powerstatus",
         ZH_CN: u"虚拟机运行状态非法，请检查后重试"
     }
+    ERROR_VMWARE_VSPHERE_VM_INVALID_FIELDS = {
+        EN: u"invalid vm fields",
+        ZH_CN: u"虚拟机返回字段非法，请检查后重试"
+    }
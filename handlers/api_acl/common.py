@@ -17,3 +17,26 @@ def get_api_acl_map():
     API_ACL_VMWARE_MANAGER.update(API_ACL_VMWARE_MANAGER_VM)
     
     return API_ACL_VMWARE_MANAGER
+
+
+g_api_acl_table = None
+
+
+def build_api_acl_table():
+    """将ACL映射展开为(action, channel) -> frozenset(roles)的查找表，
+    同时返回所有action的集合
+    """
+    acl_table = dict()
+    for action, channels in get_api_acl_map().items():
+        for channel, roles in channels.items():
+            acl_table[(action, channel)] = frozenset(roles)
+    actions = frozenset(action for action, _ in acl_table)
+    return acl_table, actions
+
+
+def get_api_acl_table():
+    """ get process wide api acl table, built on first use """
+    global g_api_acl_table
+    if g_api_acl_table is None:
+        g_api_acl_table = build_api_acl_table()
+    return g_api_acl_table
@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 
+import flask
+from werkzeug.http import quote_etag
+
 from utils.misc import (
     format_params,
 )
@@ -16,6 +19,8 @@ import api.error_code as ErrorCodes
 import api.error_msg as ErrorMsg
 # from local
 import context as context
+import connexion as connexion
+from connexion.apis.flask_api import FlaskApi
 from constants import (
     REQ_EXPIRED_INTERVAL,
     CONTROLLER_PITRIX,
@@ -180,3 +185,29 @@ def build_params(user, params, request):
     new_params["expires"] = get_expired_ts(get_ts(), REQ_EXPIRED_INTERVAL)
     logger.info("build request [%s] finished." % format_params(new_params))
     return new_params
+
+
+def not_modified_response(etag):
+    """请求的If-None-Match与etag匹配时返回304响应，否则返回None
+    用于在生成结果之前即可得到etag的读接口
+    """
+    if connexion.request.method not in ('GET', 'HEAD'):
+        return None
+    if not connexion.request.if_none_match.contains_weak(etag):
+        return None
+    return flask.Response(status=304, headers={"ETag": quote_etag(etag)})
+
+
+def conditional_response(result, etag=None):
+    """为读接口成功的结果加上ETag，If-None-Match匹配时由FlaskApi返回304
+    未指定etag时由序列化后的内容计算，只省去传输，不省去结果的生成
+    """
+    if not isinstance(result, dict) or result.get("ret_code") != 0:
+        return result
+    if etag is not None:
+        return result, 200, {"ETag": quote_etag(etag)}
+
+    response = flask.Response(FlaskApi.jsonifier.dumps(result),
+                              mimetype="application/json")
+    response.add_etag()
+    return response
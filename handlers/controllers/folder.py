@@ -14,7 +14,8 @@ from constants import (
 from handlers.controllers.common import (
     process_query_list_param,
     validate_user_request,
-    build_params
+    build_params,
+    conditional_response
 )
 from handlers.impl.folder_impl import (
     handle_detail_folder_local,
@@ -47,7 +48,7 @@ def detail_folder(**kwargs):
     # build_params
     kwargs = build_params(valid_user, kwargs, connexion.request)
 
-    return handle_detail_folder_local(kwargs)
+    return conditional_response(handle_detail_folder_local(kwargs))
 
 
 def detail_root_folder(**kwargs):
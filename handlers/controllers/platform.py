@@ -17,12 +17,15 @@ from constants import (
 from handlers.controllers.common import (
     process_query_list_param,
     validate_user_request,
-    build_params
+    build_params,
+    not_modified_response,
+    conditional_response
 )
 from handlers.impl.platform_impl import (
     handle_add_platform_local,
     handle_check_platform_connectivity_local,
     handle_delete_platform_local,
+    build_describe_platform_etag,
     handle_describe_platform_local,
     handle_update_platform_local,
 )
@@ -137,7 +140,12 @@ def describe_platform(**kwargs):
     # build_params
     kwargs = build_params(valid_user, kwargs, connexion.request)
 
-    return handle_describe_platform_local(kwargs)
+    # 平台记录未变化时直接返回304，不再读取及序列化平台列表
+    etag = build_describe_platform_etag(kwargs)
+    response = not_modified_response(etag)
+    if response is not None:
+        return response
+    return conditional_response(handle_describe_platform_local(kwargs), etag)
 
 
 def update_platform(**kwargs):
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import six
+import flask
 
 from utils.misc import format_params
 from api.return_tools import return_error
@@ -13,15 +14,19 @@ from constants import (
     ACTION_VMWARE_MANAGER_VM_MONITOR_VM,
     ACTION_VMWARE_MANAGER_VM_OPERATE_VM,
     ACTION_VMWARE_MANAGER_VM_UPDATE_VM,
-    ACTION_VMWARE_MANAGER_VM_DETAIL_VM_TICKET
+    ACTION_VMWARE_MANAGER_VM_DETAIL_VM_TICKET,
+    NDJSON_MIMETYPE
 )
+from uutils.common import to_bool
 from handlers.controllers.common import (
     process_query_list_param,
     validate_user_request,
-    build_params
+    build_params,
+    conditional_response
 )
 from handlers.impl.vm_impl import (
     handle_describe_vm_local,
+    handle_describe_vm_stream_local,
     handle_detail_vm_local,
     handle_monitor_vm_local,
     handle_operate_vm_local,
@@ -55,7 +60,15 @@ def describe_vm(**kwargs):
     # build_params
     kwargs = build_params(valid_user, kwargs, connexion.request)
 
-    return handle_describe_vm_local(kwargs)
+    # 请求流式返回时逐行输出虚拟机，避免整个列表驻留内存
+    accept = connexion.request.headers.get("Accept") or ""
+    if to_bool(kwargs.get("stream")) or NDJSON_MIMETYPE in accept:
+        result = handle_describe_vm_stream_local(kwargs)
+        if isinstance(result, dict):
+            return result
+        return flask.Response(result, mimetype=NDJSON_MIMETYPE)
+
+    return conditional_response(handle_describe_vm_local(kwargs))
 
 
 def detail_vm(**kwargs):
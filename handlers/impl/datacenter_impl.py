@@ -36,7 +36,8 @@ def handle_describe_datacenter_local(kwargs):
         host=platform["platform_host"],
         port=platform["platform_port"],
         username=platform["platform_user"],
-        encrypt_password=platform["platform_password"]
+        encrypt_password=platform["platform_password"],
+        platform_capability=platform.get("platform_capability")
     )
 
     vs = VMwareVSphere(account)
@@ -84,7 +85,8 @@ def handle_detail_datacenter_local(kwargs):
         host=platform["platform_host"],
         port=platform["platform_port"],
         username=platform["platform_user"],
-        encrypt_password=platform["platform_password"]
+        encrypt_password=platform["platform_password"],
+        platform_capability=platform.get("platform_capability")
     )
 
     vs = VMwareVSphere(account)
@@ -22,6 +22,8 @@ def handle_detail_folder_local(kwargs):
     platform_id = kwargs.get("platform_id")
     datacenter_moid = kwargs.get("datacenter_moid")
     folder_moid = kwargs.get("folder_moid")
+    offset = kwargs.get("offset") or 0
+    limit = kwargs.get("limit")
 
     pi = VMwareManagerPGInterface()
 
@@ -39,12 +41,15 @@ def handle_detail_folder_local(kwargs):
         host=platform["platform_host"],
         port=platform["platform_port"],
         username=platform["platform_user"],
-        encrypt_password=platform["platform_password"]
+        encrypt_password=platform["platform_password"],
+        platform_capability=platform.get("platform_capability")
     )
 
     vs = VMwareVSphere(account)
     try:
-        data_list = vs.detail_folder(folder_moid, datacenter_moid=datacenter_moid)
+        data_list, count = vs.detail_folder(folder_moid,
+                                            datacenter_moid=datacenter_moid,
+                                            offset=offset, limit=limit)
     except (Exception, SystemExit) as e:
         if not vs.is_connected():
             return return_error(kwargs,
@@ -66,7 +71,8 @@ def handle_detail_folder_local(kwargs):
                                 ErrorMsg.ERROR_VMWARE_VSPHERE_FOLDER_DETAIL_FOLDER_ERROR.value),
                             dump=False)
 
-    return return_success(kwargs, dict(data=data_list), dump=False)
+    return return_success(kwargs, dict(data=data_list, count=count),
+                          dump=False)
 
 
 def handle_detail_root_folder_local(kwargs):
@@ -91,12 +97,13 @@ def handle_detail_root_folder_local(kwargs):
         host=platform["platform_host"],
         port=platform["platform_port"],
         username=platform["platform_user"],
-        encrypt_password=platform["platform_password"]
+        encrypt_password=platform["platform_password"],
+        platform_capability=platform.get("platform_capability")
     )
 
     vs = VMwareVSphere(account)
     try:
-        data_list = vs.detail_root_folder()
+        data_list, _ = vs.detail_root_folder()
     except (Exception, SystemExit) as e:
         if not vs.is_connected():
             return return_error(kwargs,
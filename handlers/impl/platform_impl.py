@@ -1,11 +1,13 @@
 # -*- coding: utf-8 -*-
 
+import hashlib
+
 from log.logger import logger
 from utils.misc import get_current_time
 
 from resource_control.vmware_vsphere import VMwareVSphere
 from uutils.pg import VMwareManagerPGInterface
-from uutils.common import generate_platform_id
+from uutils.common import generate_platform_id, to_bool
 from error import (
     Error,
     ErrorMsg,
@@ -98,7 +100,7 @@ def handle_add_platform_local(kwargs):
 
     # 从VMware vSphere平台获取信息
     platform_resource = vs.list_datacenter()
-    platform_version = vs.vi.version
+    platform_capability = vs.vi.probe_capability()
 
     # 添加VMware vSphere平台
     platform_id = generate_platform_id()
@@ -113,7 +115,8 @@ def handle_add_platform_local(kwargs):
         "platform_password": account["encrypt_password"],
         "platform_resource": platform_resource,
         "platform_status": PlatformStatus.CONNECTED.value,
-        "platform_version": platform_version,
+        "platform_version": platform_capability["version"],
+        "platform_capability": platform_capability,
         "manage_time": get_current_time(),
         "is_deleted": False
     }
@@ -122,6 +125,24 @@ def handle_add_platform_local(kwargs):
     return return_success(kwargs, data, dump=False)
 
 
+def build_describe_platform_etag(kwargs):
+    """由平台记录的数量及最后更新时间生成平台列表的ETag
+    只执行两个轻量查询，不读取平台列表，也不序列化结果
+    """
+    user_id = kwargs.get("user_id")
+    search_word = kwargs.get("search_word")
+
+    pi = VMwareManagerPGInterface()
+    count = pi.get_platform_count(user_id=user_id, search_word=search_word)
+    update_time = pi.get_platform_update_time(user_id=user_id,
+                                              search_word=search_word)
+    params = [kwargs.get(k) for k in ("offset", "limit", "sort_key",
+                                      "reverse", "with_resource")]
+    digest = hashlib.sha1(repr((user_id, search_word, params, count,
+                                str(update_time))))
+    return digest.hexdigest()
+
+
 def handle_describe_platform_local(kwargs):
     """列举VMware vSphere平台列表"""
     logger.debug('handle describe platform local start, {}'.format(kwargs))
@@ -132,12 +153,14 @@ def handle_describe_platform_local(kwargs):
     search_word = kwargs.get("search_word")
     sort_key = kwargs.get("sort_key") or "platform_name"
     reverse = bool(kwargs.get("reverse"))
+    with_resource = to_bool(kwargs.get("with_resource"))
 
     pi = VMwareManagerPGInterface()
     count = pi.get_platform_count(user_id=user_id, search_word=search_word) or 0
     platforms = pi.list_platform(user_id=user_id, search_word=search_word,
                                  limit=limit, offset=offset,
-                                 sort_key=sort_key, reverse=reverse) or []
+                                 sort_key=sort_key, reverse=reverse,
+                                 with_resource=with_resource) or []
 
     data = dict(datas=platforms, count=count)
     return return_success(kwargs, data, dump=False)
@@ -189,7 +212,7 @@ def handle_update_platform_local(kwargs):
 
     # 从VMware vSphere平台获取信息
     platform_resource = vs.list_datacenter()
-    platform_version = vs.vi.version
+    platform_capability = vs.vi.probe_capability()
 
     # 更新VMware vSphere信息
     platform_info = {
@@ -200,7 +223,8 @@ def handle_update_platform_local(kwargs):
         "platform_name": platform_name,
         "platform_desc": platform_desc,
         "platform_resource": platform_resource,
-        "platform_version": platform_version,
+        "platform_version": platform_capability["version"],
+        "platform_capability": platform_capability,
         "platform_status": PlatformStatus.CONNECTED.value
     }
     pi.update_platform(platform_id, platform_info)
@@ -2,6 +2,7 @@
 
 import re
 import random
+import itertools
 from datetime import datetime, timedelta
 
 from log.logger import logger
@@ -18,6 +19,7 @@ from error import (
     ErrorMsg
 )
 from return_tools import (
+    json_dump,
     return_error,
     return_success
 )
@@ -28,13 +30,38 @@ from constants import (
 
     PlatformVMwareToolsStatus,
     PlatformVmOperationType,
-    PlatformVmStatus
+    PlatformVmStatus,
+
+    VM_FIELD_PROPERTY_MAPPING,
+    VM_REQUIRED_FIELDS,
+    VM_STREAM_PAGE_SIZE
 )
 
 import context
 ctx = context.instance()
 
 
+def parse_vm_fields(fields, sort_key):
+    """解析需要返回的虚拟机字段，未指定时返回None，包含非法字段时抛出ValueError
+    fields可以是逗号分隔的字符串或列表，搜索和排序依赖的字段会被自动加入
+    """
+    if not fields:
+        return None
+    if isinstance(fields, basestring):
+        fields = fields.split(",")
+
+    field_set = set(field.strip() for field in fields if field.strip())
+    invalid_fields = field_set - set(VM_FIELD_PROPERTY_MAPPING)
+    if invalid_fields:
+        raise ValueError("invalid fields: {fields}"
+                         "".format(fields=",".join(sorted(invalid_fields))))
+
+    field_set.update(VM_REQUIRED_FIELDS)
+    if sort_key in VM_FIELD_PROPERTY_MAPPING:
+        field_set.add(sort_key)
+    return field_set
+
+
 def handle_describe_vm_local(kwargs):
     logger.debug('handle describe vm local start, {}'.format(kwargs))
     platform_id = kwargs.get("platform_id")
@@ -43,6 +70,16 @@ def handle_describe_vm_local(kwargs):
     search_word = kwargs.get("search_word")
     sort_key = kwargs.get("sort_key") or "name"
     reverse = bool(kwargs.get("reverse"))
+    try:
+        fields = parse_vm_fields(kwargs.get("fields"), sort_key)
+    except ValueError as e:
+        logger.error("describe vm with invalid fields, reason: {reason}"
+                     "".format(reason=e))
+        return return_error(kwargs,
+                            Error(
+                                ErrorCode.ERROR_VMWARE_VSPHERE_VM_INVALID_FIELDS.value,
+                                ErrorMsg.ERROR_VMWARE_VSPHERE_VM_INVALID_FIELDS.value),
+                            dump=False)
 
     # if search_word and is_contains_chinese(search_word):
     #     search_word = search_word.encode("utf-8")
@@ -62,12 +99,13 @@ def handle_describe_vm_local(kwargs):
         host=platform["platform_host"],
         port=platform["platform_port"],
         username=platform["platform_user"],
-        encrypt_password=platform["platform_password"]
+        encrypt_password=platform["platform_password"],
+        platform_capability=platform.get("platform_capability")
     )
 
     vs = VMwareVSphere(account)
     try:
-        raw_vm_list = vs.list_vm()
+        raw_vm_list = vs.list_vm(fields=fields)
     except (Exception, SystemExit) as e:
         if not vs.is_connected():
             logger.exception("connect to VMware vSphere platform failed, "
@@ -115,6 +153,105 @@ def handle_describe_vm_local(kwargs):
     return return_success(kwargs, data, dump=False)
 
 
+def handle_describe_vm_stream_local(kwargs):
+    """流式获取虚拟机列表
+    虚拟机按页从平台获取，每获取到一台即输出一行JSON，最后一行为汇总信息；
+    支持搜索和offset、limit，不支持排序，虚拟机按平台返回的顺序输出。
+    出错时返回错误信息字典，否则返回逐行输出的生成器。
+    """
+    logger.debug('handle describe vm stream local start, {}'.format(kwargs))
+    platform_id = kwargs.get("platform_id")
+    offset = kwargs.get("offset") or 0
+    limit = kwargs.get("limit")
+    search_word = kwargs.get("search_word")
+    try:
+        fields = parse_vm_fields(kwargs.get("fields"), None)
+    except ValueError as e:
+        logger.error("describe vm with invalid fields, reason: {reason}"
+                     "".format(reason=e))
+        return return_error(kwargs,
+                            Error(
+                                ErrorCode.ERROR_VMWARE_VSPHERE_VM_INVALID_FIELDS.value,
+                                ErrorMsg.ERROR_VMWARE_VSPHERE_VM_INVALID_FIELDS.value),
+                            dump=False)
+
+    pi = VMwareManagerPGInterface()
+    platform = pi.query_platform(platform_id=platform_id)
+    if not platform:
+        logger.error("platform do not exists, platform id: {platform_id}"
+                     "".format(platform_id=platform_id))
+        return return_error(kwargs,
+                            Error(
+                                ErrorCode.ERROR_VMWARE_VSPHERE_PLATFORM_NOT_EXISTS.value,
+                                ErrorMsg.ERROR_VMWARE_VSPHERE_PLATFORM_NOT_EXISTS.value),
+                            dump=False)
+
+    account = dict(
+        host=platform["platform_host"],
+        port=platform["platform_port"],
+        username=platform["platform_user"],
+        encrypt_password=platform["platform_password"],
+        platform_capability=platform.get("platform_capability")
+    )
+
+    # 先取到第一台虚拟机，连接失败等错误仍以普通的错误响应返回
+    vs = VMwareVSphere(account)
+    vm_iter = vs.iter_vm(fields=fields, page_size=VM_STREAM_PAGE_SIZE)
+    try:
+        first_vms = list(itertools.islice(vm_iter, 1))
+    except (Exception, SystemExit) as e:
+        if not vs.is_connected():
+            logger.exception("connect to VMware vSphere platform failed, "
+                             "platform host: {host}, platform username: {username}"
+                             "".format(host=account["host"],
+                                       username=account["username"]))
+            return return_error(kwargs,
+                                Error(
+                                    ErrorCode.ERROR_VMWARE_VSPHERE_PLATFORM_CAN_NOT_CONNECT.value,
+                                    ErrorMsg.ERROR_VMWARE_VSPHERE_PLATFORM_CAN_NOT_CONNECT.value),
+                                dump=False)
+        logger.error("list vm failed, platform id: {platform_id}, reason: {e}"
+                     "".format(platform_id=platform_id, e=str(e)))
+        return return_error(kwargs,
+                            Error(
+                                ErrorCode.ERROR_VMWARE_VSPHERE_VM_LIST_VM_ERROR.value,
+                                ErrorMsg.ERROR_VMWARE_VSPHERE_VM_LIST_VM_ERROR.value),
+                            dump=False)
+
+    def generate():
+        count = 0
+        matched = 0
+        try:
+            for vm_info in itertools.chain(first_vms, vm_iter):
+                if search_word:
+                    match_len = re.findall(r'%s.*' % search_word, vm_info["name"])
+                    if len(match_len) == 0:
+                        continue
+                matched += 1
+                if matched <= offset:
+                    continue
+                if limit and count >= limit:
+                    break
+                count += 1
+                yield json_dump(vm_info) + "\n"
+        except (Exception, SystemExit) as e:
+            logger.exception("stream vm failed, platform id: {platform_id}, "
+                             "reason: {e}".format(platform_id=platform_id, e=e))
+            yield json_dump(return_error(
+                kwargs,
+                Error(ErrorCode.ERROR_VMWARE_VSPHERE_VM_LIST_VM_ERROR.value,
+                      ErrorMsg.ERROR_VMWARE_VSPHERE_VM_LIST_VM_ERROR.value),
+                dump=False)) + "\n"
+            return
+        finally:
+            vm_iter.close()
+
+        yield json_dump(return_success(kwargs, dict(count=count),
+                                       dump=False)) + "\n"
+
+    return generate()
+
+
 def handle_detail_vm_local(kwargs):
     logger.debug('handle detail vm local start, {}'.format(kwargs))
 
@@ -136,7 +273,8 @@ def handle_detail_vm_local(kwargs):
         host=platform["platform_host"],
         port=platform["platform_port"],
         username=platform["platform_user"],
-        encrypt_password=platform["platform_password"]
+        encrypt_password=platform["platform_password"],
+        platform_capability=platform.get("platform_capability")
     )
 
     vs = VMwareVSphere(account)
@@ -205,14 +343,37 @@ def handle_monitor_vm_local(kwargs):
         host=platform["platform_host"],
         port=platform["platform_port"],
         username=platform["platform_user"],
-        encrypt_password=platform["platform_password"]
+        encrypt_password=platform["platform_password"],
+        platform_capability=platform.get("platform_capability")
     )
     logger.info("monitor api get account: [%s]" % account)
     vs = VMwareVSphere(account)
 
-    # 获取虚拟机对象
+    # 获取couter - metric 映射关系
+    def get_counterid_metric_dict():
+        counter_id_dict = vs.vi.get_counter_dict()
+        return {counter_id_dict.get(METRIC_COUNTER_MAPPING.get(metric)): metric
+                for metric in metrics}
+
+    # 获取对应metric监控数据，缓存的虚拟机对象失效时重新查找后重试
+    def query_vm_perf(vm_obj):
+        if vm_obj is None:
+            return False, None
+        logger.info("monitor api get vm obj success [%s]" % vm_obj.name)
+        nowtime = datetime.now()
+        return True, vs.vi.build_query(
+            start_time=nowtime - timedelta(minutes=80),
+            end_time=nowtime - timedelta(minutes=1),
+            counterIds=list(counterid_metric_dict.keys()),
+            instance="",
+            entity=vm_obj,
+        )
+
     try:
-        vm_obj = vs.vi.get_vm_by_uuid(vm_uuid=vm_uuid)
+        counterid_metric_dict = get_counterid_metric_dict()
+        logger.info("monitor api get counterid_metric_dict [%s]"
+                    % counterid_metric_dict)
+        vm_exists, result = vs.vi.call_with_vm_by_uuid(vm_uuid, query_vm_perf)
     except (Exception, SystemExit) as e:
         if not vs.is_connected():
             logger.exception(
@@ -234,27 +395,17 @@ def handle_monitor_vm_local(kwargs):
                                 ErrorCode.ERROR_VMWARE_VSPHERE_VM_GET_VM_ERROR.value,
                                 ErrorMsg.ERROR_VMWARE_VSPHERE_VM_GET_VM_ERROR.value),
                             dump=False)
-    logger.info("monitor api get vm obj success [%s]" % vm_obj.name)
 
-    # 获取couter - metric 映射关系
-    counter_id_dict = vs.vi.get_counter_dict()
-    counterid_metric_dict = {
-        counter_id_dict.get(METRIC_COUNTER_MAPPING.get(metric)): metric for
-        metric in metrics}
-    logger.info(
-        "monitor api get counterid_metric_dict [%s]" % counterid_metric_dict)
-
-    # 获取对应metric监控数据
-    nowtime = datetime.now()
-    start_time = nowtime - timedelta(minutes=80)
-    end_time = nowtime - timedelta(minutes=1)
-    result = vs.vi.BuildQuery(
-        start_time=start_time,
-        end_time=end_time,
-        counterIds=list(counterid_metric_dict.keys()),
-        instance="",
-        entity=vm_obj,
-    )
+    if not vm_exists:
+        logger.error(
+            "vm do not exists, platform id: {platform_id}, vm id: {vm_id}"
+            "".format(platform_id=platform_id, vm_id=vm_uuid))
+        return return_error(kwargs,
+                            Error(
+                                ErrorCode.ERROR_VMWARE_VSPHERE_VM_VM_NOT_EXISTS.value,
+                                ErrorMsg.ERROR_VMWARE_VSPHERE_VM_VM_NOT_EXISTS.value),
+                            dump=False)
+
     result_data = {"data": [], "ret_code": 0, "total_count": 0}
     if result:
         value = result[0].value
@@ -307,7 +458,8 @@ def handle_operate_vm_local(kwargs):
         host=platform["platform_host"],
         port=platform["platform_port"],
         username=platform["platform_user"],
-        encrypt_password=platform["platform_password"]
+        encrypt_password=platform["platform_password"],
+        platform_capability=platform.get("platform_capability")
     )
     vs = VMwareVSphere(account)
 
@@ -399,7 +551,8 @@ def handle_update_vm_local(kwargs):
         host=platform["platform_host"],
         port=platform["platform_port"],
         username=platform["platform_user"],
-        encrypt_password=platform["platform_password"]
+        encrypt_password=platform["platform_password"],
+        platform_capability=platform.get("platform_capability")
     )
     vs = VMwareVSphere(account)
     try:
@@ -452,7 +605,8 @@ def handle_detail_vm_ticket_local(kwargs):
         host=platform["platform_host"],
         port=platform["platform_port"],
         username=platform["platform_user"],
-        encrypt_password=platform["platform_password"]
+        encrypt_password=platform["platform_password"],
+        platform_capability=platform.get("platform_capability")
     )
 
     vs = VMwareVSphere(account)
@@ -1,14 +1,41 @@
+import threading
+import time
+
 from log.logger import logger
 
 import context
 from constants import (
     API_DURATION,
     MC_KEY_MAP,
+    ACCESS_LIMITER_MEMCACHED,
+    ACCESS_LIMITER_LEASED,
+    ACCESS_LIMITER_LOCAL,
+    ACCESS_LIMITER_DEFAULT,
+    ACCESS_LIMIT_LEASE_SIZE,
+    ACCESS_LIMIT_LEASE_DIVISOR,
+    ACCESS_LIMIT_LEASE_TIME,
+    ACCESS_LIMIT_PRUNE_INTERVAL,
 )
 from resource_control.iaas.interface import (
     get_account_quota,
 )
 
+# The memcached counter holds the access count left during a period, it
+# is created with add when missing and then decremented, a request is
+# decided by the value decr returns. Its key and value are the same as
+# those written by earlier versions, so workers of both versions count
+# together. Periods are aligned to multiples of the duration, so every
+# process knows when the current one ends.
+
+
+def _get_quota(user_id, api_type):
+    """ return (access count allowed, period) of user """
+    # check user self api quota, do not shared with root user
+    quotas = get_account_quota(user_id)
+    if quotas is None:
+        return None, None
+    return quotas[api_type], quotas[API_DURATION[api_type]]
+
 
 def get_access_count(user_id, api_type):
     """ get access count left during a period """
@@ -20,43 +47,277 @@ def get_access_count(user_id, api_type):
     return ret
 
 
-def set_access_count(user_id, api_type, count, expires):
-    """ set access count """
+def add_access_count(user_id, api_type, count, expires):
+    """ set access count if it is missing, never resets a running one """
+    ctx = context.instance()
+    return ctx.mcm.add(MC_KEY_MAP[api_type], user_id, count, expires)
+
+
+def decr_access_count(user_id, api_type, count=1):
+    """ decr access count left """
     ctx = context.instance()
-    ret = ctx.mcm.set(MC_KEY_MAP[api_type], user_id, count, expires)
+    ret = ctx.mcm.decr(MC_KEY_MAP[api_type], user_id, count)
     if ret is None:
-        logger.error("set api access count for user [%s:%s] failed"
+        logger.error("decr api access count for user [%s:%s] failed"
                      % (user_id, api_type))
     return ret
 
 
-def decr_access_count(user_id, api_type):
-    """ decr access count left """
+def incr_access_count(user_id, api_type, count):
+    """ give back access count not used """
     ctx = context.instance()
-    ret = ctx.mcm.decr(MC_KEY_MAP[api_type], user_id)
+    ret = ctx.mcm.incr(MC_KEY_MAP[api_type], user_id, count)
     if ret is None:
-        logger.error("incr api access count for user [%s:%s] failed"
+        logger.debug("incr api access count for user [%s:%s] missed"
                      % (user_id, api_type))
     return ret
 
 
-def check_api_access_count(user_id, api_type):
-    """ check api access count """
-    cnt = get_access_count(user_id, api_type)
-    if cnt is None:
-        # check user self api quota, do not shared with root user
-        quotas = get_account_quota(user_id)
-        if quotas is None:
+def _period_end(duration, now):
+    """ end time of the period now is in """
+    return (int(now) // duration + 1) * duration
+
+
+def _init_access_count(user_id, api_type, now):
+    """ create the counter of current period with the quota if missing
+    @return: (quota, end time of period),
+             (None, None) if quota can not be got
+    """
+    quota, duration = _get_quota(user_id, api_type)
+    if quota is None:
+        return None, None
+
+    period_end = _period_end(duration, now)
+    add_access_count(user_id, api_type, quota,
+                     max(1, int(period_end - now)))
+    return quota, period_end
+
+
+class AccessLimiter(object):
+    """ base class of api access limiters """
+    name = None
+
+    def check(self, user_id, api_type):
+        """
+        @return: True if allowed, False if access too frequently,
+                 None if quota can not be got
+        """
+        raise NotImplementedError()
+
+
+class MemcachedAccessLimiter(AccessLimiter):
+    """ count every request in memcached
+
+    decr stops at 0, so a result of 0 can not tell the request that took
+    the last count from those that came after it, all of them are
+    refused and at most quota - 1 requests pass in a period.
+    """
+    name = ACCESS_LIMITER_MEMCACHED
+
+    def check(self, user_id, api_type):
+        quota, _ = _init_access_count(user_id, api_type, time.time())
+        if quota is None:
+            return None
+
+        cnt = decr_access_count(user_id, api_type)
+        if cnt is None:
+            # memcached unavailable, do not block requests
+            return True
+        if cnt <= 0:
+            logger.warn("access too frequently [%d] for user [%s], "
+                        "ignore request" % (cnt, user_id))
+            return False
+        return True
+
+
+class LocalAccessLimiter(AccessLimiter):
+    """ count requests in process only, limits are per process """
+    name = ACCESS_LIMITER_LOCAL
+
+    def __init__(self, prune_interval=ACCESS_LIMIT_PRUNE_INTERVAL):
+        self.prune_interval = prune_interval
+        self._windows = dict()  # (user_id, api_type) -> [窗口结束时间, 已用次数]
+        self._lock = threading.Lock()
+        self._next_prune = 0
+
+    def _prune(self, now):
+        """ drop ended windows, self._lock must be held """
+        self._next_prune = now + self.prune_interval
+        for key, window in list(self._windows.items()):
+            if now >= window[0]:
+                del self._windows[key]
+
+    def check(self, user_id, api_type):
+        quota, duration = _get_quota(user_id, api_type)
+        if quota is None:
             return None
 
-        cnt = quotas[api_type]
-        set_access_count(user_id, api_type, cnt,
-                         quotas[API_DURATION[api_type]])
+        now = time.time()
+        with self._lock:
+            if now >= self._next_prune:
+                self._prune(now)
+            window = self._windows.get((user_id, api_type))
+            if window is None or now >= window[0]:
+                window = [now + duration, 0]
+                self._windows[(user_id, api_type)] = window
+            window[1] += 1
+            used = window[1]
+
+        if used > quota:
+            logger.warn("access too frequently [%d/%d] for user [%s], "
+                        "ignore request" % (used, quota, user_id))
+            return False
+        return True
 
-    if cnt <= 0:
-        logger.warn("access too frequently [%d] for user [%s], ignore request"
-                    % (cnt, user_id))
-        return False
 
-    decr_access_count(user_id, api_type)
-    return True
+class _Lease(object):
+    """ access count leased from memcached by this process """
+    __slots__ = ("tokens", "expires_at", "period_end", "dropped", "lock")
+
+    def __init__(self):
+        self.tokens = 0
+        self.expires_at = 0
+        self.period_end = 0
+        self.dropped = False
+        self.lock = threading.Lock()
+
+
+class LeasedAccessLimiter(AccessLimiter):
+    """ local token buckets filled by leasing counts from memcached
+
+    each lease takes a batch of access counts with one decr, requests
+    are then allowed locally until the batch is used up or the lease
+    expires; counts left in expired leases are given back with incr,
+    so the limit stays global while most requests skip memcached.
+    a decr that reaches 0 grants nothing, since the counts it took can
+    not be known, the last counts of a period may go unused.
+    a lease never outlives the period it was taken in, counts left at
+    the end of a period are dropped since the counter has been reset.
+    """
+    name = ACCESS_LIMITER_LEASED
+
+    def __init__(self, lease_size=ACCESS_LIMIT_LEASE_SIZE,
+                 lease_divisor=ACCESS_LIMIT_LEASE_DIVISOR,
+                 lease_time=ACCESS_LIMIT_LEASE_TIME):
+        self.lease_size = lease_size
+        self.lease_divisor = lease_divisor
+        self.lease_time = lease_time
+        self._leases = dict()  # (user_id, api_type) -> _Lease
+        self._lock = threading.Lock()
+        self._next_reconcile = 0
+
+    def _get_lease(self, key):
+        with self._lock:
+            lease = self._leases.get(key)
+            if lease is None:
+                lease = self._leases[key] = _Lease()
+            return lease
+
+    def _release(self, user_id, api_type, lease, now):
+        """ give back counts left in lease, lease.lock must be held
+
+        lease.tokens only holds counts decr actually took and that are
+        not used yet, so the counter never goes above the quota
+        """
+        if lease.tokens > 0 and now < lease.period_end:
+            incr_access_count(user_id, api_type, lease.tokens)
+        lease.tokens = 0
+
+    def _acquire(self, user_id, api_type, lease, now):
+        """ lease a new batch, lease.lock must be held """
+        quota, period_end = _init_access_count(user_id, api_type, now)
+        if quota is None:
+            return None
+
+        # small quotas are not taken by one process at once
+        size = max(1, min(self.lease_size, quota // self.lease_divisor))
+        left = decr_access_count(user_id, api_type, size)
+        if left is None:
+            return None
+        if left <= 0:
+            # decr stops at 0, how many counts it took is unknown, so
+            # none are granted and none will be given back
+            lease.tokens = 0
+            return 0
+
+        # the counter did not reach 0, exactly size counts were taken
+        lease.tokens = size
+        lease.period_end = period_end
+        lease.expires_at = min(now + self.lease_time, period_end)
+        return size
+
+    def reconcile(self, now=None):
+        """ give back counts of expired leases and drop idle ones """
+        now = now or time.time()
+        with self._lock:
+            self._next_reconcile = now + self.lease_time
+            expired = [(key, lease) for key, lease in self._leases.items()
+                       if now >= lease.expires_at]
+            for key, _ in expired:
+                del self._leases[key]
+
+        for (user_id, api_type), lease in expired:
+            with lease.lock:
+                lease.dropped = True
+                self._release(user_id, api_type, lease, now)
+
+    def check(self, user_id, api_type):
+        now = time.time()
+        if now >= self._next_reconcile:
+            self.reconcile(now)
+
+        lease = self._get_lease((user_id, api_type))
+        lease.lock.acquire()
+        while lease.dropped:
+            # dropped by reconcile after it was got
+            lease.lock.release()
+            lease = self._get_lease((user_id, api_type))
+            lease.lock.acquire()
+        try:
+            if now >= lease.expires_at:
+                self._release(user_id, api_type, lease, now)
+            if lease.tokens <= 0:
+                granted = self._acquire(user_id, api_type, lease, now)
+                if granted is None:
+                    return None
+                if granted <= 0:
+                    logger.warn("access too frequently for user [%s], "
+                                "ignore request" % user_id)
+                    return False
+            lease.tokens -= 1
+        finally:
+            lease.lock.release()
+        return True
+
+
+ACCESS_LIMITERS = dict((limiter.name, limiter) for limiter in
+                       (MemcachedAccessLimiter,
+                        LeasedAccessLimiter,
+                        LocalAccessLimiter))
+
+g_access_limiter = None
+
+
+def set_access_limiter(name=ACCESS_LIMITER_DEFAULT):
+    """ select the api access limiter by name """
+    global g_access_limiter
+    limiter_class = ACCESS_LIMITERS.get(name)
+    if limiter_class is None:
+        logger.error("unknown access limiter [%s], use [%s]"
+                     % (name, ACCESS_LIMITER_DEFAULT))
+        limiter_class = ACCESS_LIMITERS[ACCESS_LIMITER_DEFAULT]
+    g_access_limiter = limiter_class()
+    logger.info("api access limiter: %s" % g_access_limiter.name)
+    return g_access_limiter
+
+
+def get_access_limiter():
+    """ get process wide api access limiter """
+    if g_access_limiter is None:
+        return set_access_limiter()
+    return g_access_limiter
+
+
+def check_api_access_count(user_id, api_type):
+    """ check api access count """
+    return get_access_limiter().check(user_id, api_type)
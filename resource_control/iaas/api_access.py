@@ -1,7 +1,9 @@
 from api.error import Error
 import api.error_code as ErrorCodes
 import api.error_msg as ErrorMsg
+from api.constants import CHANNEL_INTERNAL
 from log.logger import logger
+from utils.misc import is_str
 
 import context
 from resource_control.iaas.interface import (
@@ -159,7 +161,11 @@ def check_api_access_control(action, sender, channel):
 
 
 class APIAccessControl(object):
-    """ each user role will have a corresponding api access list """
+    """ each user role will have a corresponding api access list
+
+    the access list is flattened once into an (action, channel) -> roles
+    table, so a permitted request costs a single hash lookup
+    """
 
     def __init__(self, sender, channel):
         """
@@ -168,13 +174,12 @@ class APIAccessControl(object):
         self.sender = sender
         self.role = sender['role']
         self.channel = channel
-        self.API_ACL = dict()
         # error message
         self.error = Error(ErrorCodes.PERMISSION_DENIED)
 
-        from handlers.api_acl.common import get_api_acl_map
+        from handlers.api_acl.common import get_api_acl_table
 
-        self.API_ACL.update(get_api_acl_map())
+        self.acl_table, self.actions = get_api_acl_table()
 
     def get_error(self):
         """ return the information describing the error occurred
@@ -188,15 +193,20 @@ class APIAccessControl(object):
 
     def check_access(self, action):
         """ check api access """
+        try:
+            roles = self.acl_table.get((action, self.channel))
+        except TypeError:
+            # unhashable action, reported by the checks below
+            roles = None
+        if roles is not None and self.role in roles:
+            return True
+
         if action is None:
             logger.debug("api_acl 0")
             logger.error("action can not be None")
             self.set_error(ErrorCodes.INVALID_REQUEST_FORMAT,
                            ErrorMsg.ERR_MSG_MISSING_PARAMETER, "action")
             return False
-        from utils.misc import (
-            is_str
-        )
         if not is_str(action):
             logger.debug("api_acl 1")
             logger.error("illegal action [%s] of sender [%s]" % (
@@ -204,32 +214,28 @@ class APIAccessControl(object):
             self.set_error(ErrorMsg.ERR_MSG_PARAMETER_SHOULD_BE_STR, "action")
             return None
 
-        if action not in self.API_ACL:
+        if action not in self.actions:
             logger.error("check_access action: %s" % action)
             logger.error("can not handle this action [%s] for sender [%s]" % (
                 action, self.sender))
             self.set_error(ErrorCodes.PERMISSION_DENIED,
                            ErrorMsg.ERR_MSG_CAN_NOT_HANDLE_REQUEST)
             return False
-        from api.constants import CHANNEL_INTERNAL
         if self.channel == CHANNEL_INTERNAL:
             logger.debug("api_acl 3")
             return True
 
-        if self.channel not in self.API_ACL[action]:
+        if roles is None:
             logger.debug("api_acl 4")
             logger.error("can not handle action [%s] through channel [%s] for sender [%s]" % (
                 action, self.channel, self.sender))
             self.set_error(ErrorCodes.PERMISSION_DENIED,
                            ErrorMsg.ERR_MSG_CAN_NOT_HANDLE_REQUEST)
             return False
-        if self.role not in self.API_ACL[action][self.channel]:
-            logger.debug("api_acl 5")
-            logger.error("can not handle action [%s] for role [%s], sender [%s]" % (
-                action, self.role, self.sender))
-            self.set_error(ErrorCodes.PERMISSION_DENIED,
-                           ErrorMsg.ERR_MSG_CAN_NOT_HANDLE_REQUEST)
-            return False
-
-        return True
 
+        logger.debug("api_acl 5")
+        logger.error("can not handle action [%s] for role [%s], sender [%s]" % (
+            action, self.role, self.sender))
+        self.set_error(ErrorCodes.PERMISSION_DENIED,
+                       ErrorMsg.ERR_MSG_CAN_NOT_HANDLE_REQUEST)
+        return False
@@ -1,12 +1,12 @@
+import random
+import threading
+import time
 
 from qingcloud.iaas import APIConnection
 from log.logger import logger
 
 import context as context
-from common.misc import (
-    get_cache,
-    set_cache
-)
+from common.misc import load_cache, load_cache_multi
 from constants import (
     ACTION_DESCRIBE_USERS,
     ACTION_DESCRIBE_SUB_USERS,
@@ -26,10 +26,35 @@ from constants import (
     MC_KEY_PREFIX_ACCOUNT_USER_LOCK,
     MC_KEY_PREFIX_ACCOUNT_USER_ZONE,
     MC_KEY_PREFIX_ZONES,
+
+    IAAS_CLIENT_MAX_CONNECTIONS,
+    IAAS_CLIENT_RETRIES,
+    IAAS_CLIENT_RETRY_BACKOFF,
 )
 
 
+g_host_slots = dict()
+g_host_slots_lock = threading.Lock()
+
+
+def _get_host_slots(host, port, max_connections):
+    """同一主机的所有客户端共用一个并发上限"""
+    key = (host, port)
+    with g_host_slots_lock:
+        if key not in g_host_slots:
+            g_host_slots[key] = threading.BoundedSemaphore(max_connections)
+        return g_host_slots[key]
+
+
 class IaasClient:
+    """ IaaS接口客户端
+
+    APIConnection内部的连接池会复用keep-alive连接，客户端应在进程内共享；
+    对同一主机的并发请求数受max_connections限制，因此建立的TCP连接数
+    也不会超过该值。请求出现异常时按带随机抖动的指数退避重试，这里只
+    发送查询类请求，重试是安全的。
+    """
+
     def __init__(self, conf):
         self.iaas_client = APIConnection(conf.get('qy_access_key_id'),
                                          conf.get('qy_secret_access_key'),
@@ -37,86 +62,91 @@ class IaasClient:
                                          host=conf.get('host'),
                                          port=conf.get('port'),
                                          protocol=conf.get('protocol'))
+        self.retries = conf.get('retries', IAAS_CLIENT_RETRIES)
+        self.retry_backoff = conf.get('retry_backoff',
+                                      IAAS_CLIENT_RETRY_BACKOFF)
+        self.slots = _get_host_slots(
+            conf.get('host'), conf.get('port'),
+            conf.get('max_connections', IAAS_CLIENT_MAX_CONNECTIONS))
 
     def send_request(self, action, req, url='/iaas/', verb='GET'):
-        try:
-            return self.iaas_client.send_request(action, req,
-                                                 url=url, verb=verb)
-        except Exception as e:
-            logger.error("send iaas request failed, req=[%s] Exception[%s]"
-                         % (req, e))
-            # if request timeout, None will be returned
-            return None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                # full jitter，避免大量请求在同一时刻重试
+                time.sleep(random.uniform(
+                    0, self.retry_backoff * (2 ** (attempt - 1))))
+            try:
+                with self.slots:
+                    resp = self.iaas_client.send_request(action, req,
+                                                         url=url, verb=verb)
+            except Exception as e:
+                logger.warn("send iaas request failed, attempt [%s], "
+                            "req=[%s] Exception[%s]" % (attempt + 1, req, e))
+                continue
+            # APIConnection returns None when the request times out
+            if resp is not None:
+                return resp
+
+        logger.error("send iaas request failed after [%s] attempts, "
+                     "action=[%s] req=[%s]"
+                     % (self.retries + 1, action, req))
+        # if request timeout, None will be returned
+        return None
 
 
-def get_user(user_id, refresh=False):
-    if not user_id:
-        logger.error("invalid user_id [%s]" % user_id)
-        return None
+g_iaas_client = None
+g_iaas_client_lock = threading.Lock()
 
-    if not refresh:
-        ret = get_cache(MC_KEY_PREFIX_ACCOUNT_USER_INFO, user_id)
-        if ret:
-            logger.debug("get user [%s] from cache successfully", user_id)
-            return ret
 
-    req = {
-        'users': [user_id],
-    }
-    action = ACTION_DESCRIBE_USERS
+def get_iaas_client():
+    """ get process wide iaas client, created on first use """
+    global g_iaas_client
+    if g_iaas_client is None:
+        with g_iaas_client_lock:
+            if g_iaas_client is None:
+                ctx = context.instance()
+                g_iaas_client = IaasClient(ctx.iaas_client_conf)
+    return g_iaas_client
 
-    ret = None
-    ctx = context.instance()
-    iaas_client = IaasClient(ctx.iaas_client_conf)
-    resp = iaas_client.send_request(action, req)
+
+def _describe(action, req, set_key):
+    """请求IaaS接口，返回结果集，请求失败时返回None"""
+    resp = get_iaas_client().send_request(action, req)
     if not isinstance(resp, dict) or resp.get('ret_code') != 0:
         logger.error("get data from iaas failed, action=[%s] resp[%s]"
                      % (action, resp))
-        return ret
-
-    data_set = resp.get('user_set', [])
-    if not data_set:
-        return ret
+        return None
+    return resp.get(set_key, [])
 
-    _user = data_set[0]
 
-    set_cache(MC_KEY_PREFIX_ACCOUNT_USER_INFO, user_id, _user)
+def _user_entry(user_id):
+    def loader():
+        data_set = _describe(ACTION_DESCRIBE_USERS,
+                             {'users': [user_id]}, 'user_set')
+        return data_set[0] if data_set else None
 
-    return _user
+    return MC_KEY_PREFIX_ACCOUNT_USER_INFO, user_id, loader
 
 
-def get_sub_users(user_id, refresh=True):
+def get_user(user_id, refresh=False):
     if not user_id:
         logger.error("invalid user_id [%s]" % user_id)
         return None
 
-    if not refresh:
-        ret = get_cache(MC_KEY_PREFIX_ACCOUNT_SUB_USER_INFO, user_id)
-        if ret:
-            logger.debug("get [%s] sub user from cache successfully", user_id)
-            return ret
+    return load_cache(*_user_entry(user_id), refresh=refresh)
 
-    req = {
-        'owner': user_id,
-        'status': 'active',
-    }
-    action = ACTION_DESCRIBE_SUB_USERS
 
-    ret = None
-    ctx = context.instance()
-    iaas_client = IaasClient(ctx.iaas_client_conf)
-    resp = iaas_client.send_request(action, req)
-    if not isinstance(resp, dict) or resp.get('ret_code') != 0:
-        logger.error("get data from iaas failed, action=[%s] resp[%s]"
-                     % (action, resp))
-        return ret
+def get_sub_users(user_id, refresh=False):
+    if not user_id:
+        logger.error("invalid user_id [%s]" % user_id)
+        return None
 
-    user_set = resp.get('user_set', [])
-    if not user_set:
-        return []
+    def loader():
+        return _describe(ACTION_DESCRIBE_SUB_USERS,
+                         {'owner': user_id, 'status': 'active'}, 'user_set')
 
-    set_cache(MC_KEY_PREFIX_ACCOUNT_SUB_USER_INFO, user_id, user_set)
-    return user_set
+    return load_cache(MC_KEY_PREFIX_ACCOUNT_SUB_USER_INFO, user_id, loader,
+                      refresh=refresh)
 
 
 def get_access_key(access_key_id, refresh=False):
@@ -124,72 +154,48 @@ def get_access_key(access_key_id, refresh=False):
         logger.error("invalid access_key [%s]", access_key_id)
         return None
 
-    if not refresh:
-        ret = get_cache(MC_KEY_PREFIX_ACCOUNT_ACCESS_KEY, access_key_id)
-        if ret:
-            logger.debug("get access_key [%s] from cache successfully"
-                         % access_key_id)
-            return ret
-
-    req = {
-        'access_keys': [access_key_id],
-    }
-    action = ACTION_DESCRIBE_ACCESS_KEYS
-
-    ret = None
-    ctx = context.instance()
-    iaas_client = IaasClient(ctx.iaas_client_conf)
-    resp = iaas_client.send_request(action, req)
-    if not isinstance(resp, dict) or resp.get('ret_code') != 0:
-        logger.error("get data from iaas failed, action=[%s] resp[%s]"
-                     % (action, resp))
-        return ret
+    def loader():
+        data_set = _describe(ACTION_DESCRIBE_ACCESS_KEYS,
+                             {'access_keys': [access_key_id]},
+                             'access_key_set')
+        return data_set[0] if data_set else None
 
-    data_set = resp.get('access_key_set', [])
-    if not data_set:
-        return ret
+    return load_cache(MC_KEY_PREFIX_ACCOUNT_ACCESS_KEY, access_key_id, loader,
+                      refresh=refresh)
 
-    _access_key = data_set[0]
 
-    set_cache(MC_KEY_PREFIX_ACCOUNT_ACCESS_KEY, access_key_id, _access_key)
+def _account_quota_entry(user_id):
+    def loader():
+        data_set = _describe(ACTION_DESCRIBE_ACCOUNT_QUOTAS,
+                             {'users': [user_id]}, 'account_quota_set')
+        return data_set[0] if data_set else None
 
-    return _access_key
+    return MC_KEY_PREFIX_ACCOUNT_QUOTA, user_id, loader
 
 
 def get_account_quota(user_id, refresh=False):
-    if not refresh:
-        ret = get_cache(MC_KEY_PREFIX_ACCOUNT_QUOTA, user_id)
-        if ret:
-            logger.debug("get account quota [%s] from cache successfully"
-                         % user_id)
-            return ret
-
-    req = {
-        'users': [user_id],
-    }
-    action = ACTION_DESCRIBE_ACCOUNT_QUOTAS
-
-    ret = None
-    ctx = context.instance()
-    iaas_client = IaasClient(ctx.iaas_client_conf)
-    resp = iaas_client.send_request(action, req)
-    if not isinstance(resp, dict) or resp.get('ret_code') != 0:
-        logger.error("get data from iaas failed, action=[%s] resp[%s]"
-                     % (action, resp))
-        return ret
+    return load_cache(*_account_quota_entry(user_id), refresh=refresh)
 
-    data_set = resp.get('account_quota_set', [])
-    if not data_set:
-        return ret
 
-    _quota = data_set[0]
+# User lock
+def _user_lock_entry(user_id, lock_type, api_action=None):
+    _key = "%s.%s" % (user_id, lock_type)
+    if api_action:
+        _key = "%s.%s.%s" % (user_id, lock_type, api_action)
 
-    set_cache(MC_KEY_PREFIX_ACCOUNT_QUOTA, user_id, _quota)
+    def loader():
+        data_set = _describe(ACTION_DESCRIBE_USER_LOCKS,
+                             {'users': [user_id]}, 'user_lock_set')
+        if data_set is None:
+            return None
+        if not data_set or not data_set[0] or \
+                str(data_set[0]['status']) == 'unlock':
+            return "unlocked"
+        return "locked"
 
-    return _quota
+    return MC_KEY_PREFIX_ACCOUNT_USER_LOCK, _key, loader
 
 
-# User lock
 def check_user_lock(user_id, lock_type, api_action=None, refresh=False):
     """
         NOTE:
@@ -197,90 +203,57 @@ def check_user_lock(user_id, lock_type, api_action=None, refresh=False):
             we simply set user lock cache here without `api_action`.
             So do NOT pass `api_action` in internal request either.
     """
+    return load_cache(*_user_lock_entry(user_id, lock_type, api_action),
+                      refresh=refresh)
 
-    _key = "%s.%s" % (user_id, lock_type)
-    if api_action:
-        _key = "%s.%s.%s" % (user_id, lock_type, api_action)
-    if not refresh:
-        ret = get_cache(MC_KEY_PREFIX_ACCOUNT_USER_LOCK, _key)
-        if ret is not None:
-            logger.debug("get user_lock [%s] from cache successfully, "
-                         "ret: [%s]" % (_key, ret))
-            return ret
-
-    req = {
-        'users': [user_id],
-    }
-    action = ACTION_DESCRIBE_USER_LOCKS
 
-    ret = None
-    ctx = context.instance()
-    iaas_client = IaasClient(ctx.iaas_client_conf)
-    resp = iaas_client.send_request(action, req)
-    if not isinstance(resp, dict) or resp.get('ret_code') != 0:
-        logger.error("get data from iaas failed, action=[%s] resp[%s]"
-                     % (action, resp))
-        return ret
-    else:
-        logger.debug("get user lock from iaas suc, req=[%s] resp[%s]"
-                     % (req, resp))
+def load_auth_context(user_id, lock_type=None, api_action=None,
+                      with_quota=False):
+    """ 一次批量读取认证所需的用户信息、用户锁及配额
 
-    data_set = resp.get('user_lock_set', [])
-    if not data_set or not data_set[0] or \
-            str(data_set[0]['status']) == 'unlock':
-        user_lock_status = "unlocked"
-    else:
-        user_lock_status = "locked"
+    结果写入本地缓存，随后的get_user、check_user_lock、get_account_quota
+    直接命中本地缓存，不再逐个访问memcached
+    :return: dict，包含user、user_lock、quota，未请求的项为None
+    """
+    if not user_id:
+        logger.error("invalid user_id [%s]" % user_id)
+        return None
 
-    set_cache(MC_KEY_PREFIX_ACCOUNT_USER_LOCK, _key, user_lock_status)
+    names = ["user"]
+    entries = [_user_entry(user_id)]
+    if lock_type and api_action:
+        names.append("user_lock")
+        entries.append(_user_lock_entry(user_id, lock_type, api_action))
+    if with_quota:
+        names.append("quota")
+        entries.append(_account_quota_entry(user_id))
 
-    return user_lock_status
+    auth_context = dict(user=None, user_lock=None, quota=None)
+    auth_context.update(zip(names, load_cache_multi(entries)))
+    return auth_context
 
 
 def get_user_default_zone(user_id, region_id, refresh=True):
     # get default zone for zone in a region
 
-    # get from cache
-    if not refresh:
-        user_zones = get_cache(MC_KEY_PREFIX_ACCOUNT_USER_ZONE, user_id)
-        if user_zones:
-            zone_info = user_zones.get(region_id, None)
-            if zone_info:
-                return zone_info['default_zone']
-            # for region_id, zone_info in user_zones.items():
-            #     zone_region = zone_info['default_in_region']
-            #     if zone_region == region_id:
-            #         return zone_id
-
-    req = {
-        'users': [user_id],
-    }
-    action = ACTION_DESCRIBE_DEFAULT_ZONES
-
-    ret = None
-    ctx = context.instance()
-    iaas_client = IaasClient(ctx.iaas_client_conf)
-    resp = iaas_client.send_request(action, req)
-    if not isinstance(resp, dict) or resp.get('ret_code') != 0:
-        logger.error("get data from iaas failed, action=[%s] resp[%s]"
-                     % (action, resp))
-        return ret
-
-    data_set = resp.get('default_zone_set', [])
-    if not data_set:
-        return ret
-
-    _user_zones = {}
-    default_zone = None
-    for zone_info in data_set:
-        rid = zone_info['region']['region_id']
-        _user_zones[rid] = zone_info
-        if region_id == rid:
-            default_zone = zone_info['default_zone']
-
-    set_cache(MC_KEY_PREFIX_ACCOUNT_USER_ZONE, user_id, _user_zones)
-
-    return default_zone
+    def loader():
+        data_set = _describe(ACTION_DESCRIBE_DEFAULT_ZONES,
+                             {'users': [user_id]}, 'default_zone_set')
+        if not data_set:
+            return None
+        _user_zones = {}
+        for zone_info in data_set:
+            _user_zones[zone_info['region']['region_id']] = zone_info
+        return _user_zones
+
+    user_zones = load_cache(MC_KEY_PREFIX_ACCOUNT_USER_ZONE, user_id, loader,
+                            refresh=refresh)
+    if user_zones and region_id not in user_zones and not refresh:
+        user_zones = load_cache(MC_KEY_PREFIX_ACCOUNT_USER_ZONE, user_id,
+                                loader, refresh=True)
+    if not user_zones or region_id not in user_zones:
+        return None
+    return user_zones[region_id]['default_zone']
 
 
 def get_all_zones(refresh=False):
@@ -290,39 +263,19 @@ def get_all_zones(refresh=False):
     :return:
     """
 
-    # get from cache
-    if not refresh:
-        all_zones = get_cache(MC_KEY_PREFIX_ZONES, 'all')
-        if all_zones:
-            return all_zones
-
-    req = {
-    }
-    action = ACTION_DESCRIBE_ZONES
-
-    ret = None
-    ctx = context.instance()
-    iaas_client = IaasClient(ctx.iaas_client_conf)
-    resp = iaas_client.send_request(action, req)
-    if not isinstance(resp, dict) or resp.get('ret_code') != 0:
-        logger.error("get data from iaas failed, action=[%s] resp[%s]"
-                     % (action, resp))
-        return ret
-
-    data_set = resp.get('zone_set', [])
-    if not data_set:
-        logger.error("get all zone %s fail from iaas" % data_set)
-        return ret
-
-    all_zones = {}
-    logger.debug("get all zone %s suc from iaas" % data_set)
-    for zone_info in data_set:
-        zone_id = zone_info['zone_id']
-        all_zones[zone_id] = zone_info
+    def loader():
+        data_set = _describe(ACTION_DESCRIBE_ZONES, {}, 'zone_set')
+        if not data_set:
+            logger.error("get all zone %s fail from iaas" % data_set)
+            return None
 
-    set_cache(MC_KEY_PREFIX_ZONES, 'all', all_zones)
+        logger.debug("get all zone %s suc from iaas" % data_set)
+        all_zones = {}
+        for zone_info in data_set:
+            all_zones[zone_info['zone_id']] = zone_info
+        return all_zones
 
-    return all_zones
+    return load_cache(MC_KEY_PREFIX_ZONES, 'all', loader, refresh=refresh)
 
 
 def describe_login_account_users(user_ids):
@@ -342,9 +295,7 @@ def describe_login_account_users(user_ids):
     action = ACTION_DESCRIBE_LOGIN_ACCOUNT_USERS
 
     ret = None
-    ctx = context.instance()
-    iaas_client = IaasClient(ctx.iaas_client_conf)
-    rsp = iaas_client.send_request(action, req)
+    rsp = get_iaas_client().send_request(action, req)
     if not isinstance(rsp, dict) or rsp.get('ret_code') != 0:
         logger.error("get data from iaas failed, action=[%s] rsp[%s]"
                      % (action, rsp))
@@ -370,9 +321,7 @@ def describe_login_accounts(login_accounts):
     action = ACTION_DESCRIBE_LOGIN_ACCOUNTS
 
     ret = None
-    ctx = context.instance()
-    iaas_client = IaasClient(ctx.iaas_client_conf)
-    rsp = iaas_client.send_request(action, req)
+    rsp = get_iaas_client().send_request(action, req)
     if not isinstance(rsp, dict) or rsp.get('ret_code') != 0:
         logger.error("get data from iaas failed, action=[%s] rsp[%s]"
                      % (action, rsp))
@@ -397,9 +346,7 @@ def describe_login_servers(login_servers):
     action = ACTION_DESCRIBE_LOGIN_SERVERS
 
     ret = None
-    ctx = context.instance()
-    iaas_client = IaasClient(ctx.iaas_client_conf)
-    rsp = iaas_client.send_request(action, req)
+    rsp = get_iaas_client().send_request(action, req)
     if not isinstance(rsp, dict) or rsp.get('ret_code') != 0:
         logger.error("get data from iaas failed, action=[%s] rsp[%s]"
                      % (action, rsp))
@@ -1,3 +1,7 @@
+import random
+import threading
+import time
+
 from log.logger import logger
 from utils.thread_local import (
     get_request_zone,
@@ -6,41 +10,158 @@ from utils.thread_local import (
 
 import context
 from resource_control.iaas.interface import get_all_zones
+from constants import (
+    ZONE_REFRESH_INTERVAL,
+    ZONE_REFRESH_JITTER,
+    ZONE_REFRESH_RETRY_INTERVAL,
+)
 
-g_region_zones = None
 
+class ZoneSnapshot(object):
+    """ zones and regions loaded at one time, never changed once built """
+    __slots__ = ("zones", "region_zones", "loaded_at")
 
-def get_region_zones():
-    """
-    return dict, key is region id, value are zone_ids.
-    :return:
-    """
+    def __init__(self, zones, loaded_at):
+        region_zones = {}
+        for zone in zones.values():
+            region_zones.setdefault(zone['region_id'], []).append(zone)
+        self.zones = zones
+        self.region_zones = region_zones
+        self.loaded_at = loaded_at
 
-    global g_region_zones
-    if g_region_zones:
-        return g_region_zones
 
-    zones = get_all_zones()  # type: dict
+class ZoneTopology(object):
+    """ refreshable snapshot of the zone/region topology
 
-    if not zones:
-        logger.error("get zones failed")
-        return None
-    logger.debug("get zones %s" % zones)
+    a background thread reloads the topology with a jittered interval
+    and swaps in a new snapshot, lookups always read the current one.
+    a stale snapshot keeps being served while a refresh runs, and a
+    failed refresh keeps the last snapshot and is retried soon, so a
+    lookup never waits for IaaS.
+    """
 
-    g_region_zones = {}
+    def __init__(self, interval=ZONE_REFRESH_INTERVAL,
+                 jitter=ZONE_REFRESH_JITTER,
+                 retry_interval=ZONE_REFRESH_RETRY_INTERVAL):
+        self.interval = interval
+        self.jitter = jitter
+        self.retry_interval = retry_interval
+
+        self._snapshot = None
+        self._next_refresh = 0
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """ load the topology once, then keep it fresh in background """
+        if self._thread:
+            return
+
+        self._refresh_once()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._refresh_loop,
+                                        name="zone-topology-refresher")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(self.retry_interval)
+        self._thread = None
+
+    def _next_delay(self):
+        spread = self.interval * self.jitter
+        return self.interval + random.uniform(-spread, spread)
+
+    def refresh(self):
+        """ reload the topology from IaaS and swap in a new snapshot
+        @return: True if succeeded
+        """
+        zones = get_all_zones(refresh=True)
+        now = time.time()
+        if not zones:
+            logger.error("refresh zones failed, retry in %ss"
+                         % self.retry_interval)
+            self._next_refresh = now + self.retry_interval
+            return False
+
+        logger.debug("refresh zones %s" % zones)
+        self._snapshot = ZoneSnapshot(zones, now)
+        self._next_refresh = now + self._next_delay()
+        return True
 
-    for zone_id, zone in zones.items():
-        region_id = zone['region_id']
-        if region_id not in g_region_zones:
-            g_region_zones[region_id] = []
-        g_region_zones[region_id].append(zone)
+    def _begin_refresh(self):
+        """ return False if another refresh is running """
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+            return True
+
+    def _refresh_once(self):
+        """ refresh unless another refresh is running """
+        if self._begin_refresh():
+            self._run_refresh()
+
+    def _run_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            self._next_refresh = time.time() + self.retry_interval
+            logger.exception("refresh zones failed, reason: %s" % e)
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _refresh_loop(self):
+        while not self._stop_event.is_set():
+            delay = max(self._next_refresh - time.time(), 1)
+            if self._stop_event.wait(delay):
+                break
+            if time.time() >= self._next_refresh:
+                self._refresh_once()
+
+    def get(self):
+        """ return the current snapshot, None before the first load
+
+        a missing or stale snapshot triggers a refresh in background
+        """
+        snapshot = self._snapshot
+        if time.time() >= self._next_refresh and self._begin_refresh():
+            thread = threading.Thread(target=self._run_refresh,
+                                      name="zone-topology-revalidate")
+            thread.daemon = True
+            thread.start()
+        return snapshot
+
+
+g_zone_topology = ZoneTopology()
+
+
+def get_zone_topology():
+    """ get process wide zone topology """
+    global g_zone_topology
+    return g_zone_topology
 
-    return g_region_zones
 
+def get_region_zones():
+    """
+    return dict, key is region id, value are zone_ids.
+    :return:
+    """
+    snapshot = get_zone_topology().get()
+    if snapshot is None:
+        logger.error("get zones failed")
+        return None
+    return snapshot.region_zones
 
-def is_region_id(zone_id):
 
-    region_zones = get_region_zones()
+def is_region_id(zone_id, region_zones=None):
+    if region_zones is None:
+        region_zones = get_region_zones()
     if zone_id and region_zones and zone_id in region_zones:
         return True
 
@@ -55,7 +176,7 @@ def get_zones(region_id):
     """
     region_zones = get_region_zones()
 
-    if region_id not in region_zones:
+    if not region_zones or region_id not in region_zones:
         return None
     return region_zones[region_id]
 
@@ -66,8 +187,10 @@ def dispatch_region_request(req, sender):
     ctx = context.instance()
     # convert region id to zone id when needed
     if 'zone' in req:
+        # one snapshot for the whole dispatch
+        region_zones = get_region_zones()
         request_zone = get_request_zone()
-        if request_zone and not is_region_id(req['zone']):
+        if request_zone and not is_region_id(req['zone'], region_zones):
             # already dispatched
             req['request_zone'] = request_zone
             return request_zone
@@ -76,7 +199,7 @@ def dispatch_region_request(req, sender):
         request_zone = zone_id
         req['request_zone'] = request_zone
 
-        if is_region_id(zone_id):
+        if is_region_id(zone_id, region_zones):
             if ctx.region_default_zone:
                 req['zone'] = ctx.region_default_zone[zone_id]
             logger.debug("dispatch region [%s] request to zone [%s] with "
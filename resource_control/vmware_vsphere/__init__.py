@@ -14,9 +14,13 @@ from resource_control.vmware_vsphere.interface import VMwareVSphereInterface
 class VMwareVSphere(object):
     """ VMware vSphere类 """
 
-    def __init__(self, account):
+    def __init__(self, account, disconnect_at_exit=True):
         self.account = account
-        self.vi = VMwareVSphereInterface(account)
+        self.vi = VMwareVSphereInterface(account, disconnect_at_exit)
+
+    def disconnect(self):
+        """断开与平台的会话"""
+        self.vi.disconnect()
 
     def is_connected(self):
         """检查和VMware vSphere平台的连通性
@@ -43,81 +47,100 @@ class VMwareVSphere(object):
         # 检测是否联通
         return self.vi.check_connected()
 
-    def detail_root_folder(self):
+    def detail_root_folder(self, offset=0, limit=None):
         root_folder = self.vi.root_folder
-        data = self._loop_child_entity(root_folder)
-        return data
+        return self._layout_child_entities(root_folder, offset=offset,
+                                           limit=limit)
 
-    def detail_folder(self, folder_moid, datacenter_moid):
+    def detail_folder(self, folder_moid, datacenter_moid, offset=0,
+                      limit=None):
         folder_obj = self.vi.get_folder(folder_moid, datacenter_moid)
-        data = self._loop_child_entity(folder_obj, datacenter_moid)
-        return data
+        return self._layout_child_entities(folder_obj, datacenter_moid,
+                                           offset=offset, limit=limit)
+
+    def _layout_child_entities(self, folder_obj, datacenter_moid=None,
+                               offset=0, limit=None):
+        """组装目录子项信息，返回(当前页的子项列表, 子项总数)"""
+        children, props_dict, count = self.vi.collect_child_entities(
+            folder_obj, offset=offset, limit=limit)
 
-    @staticmethod
-    def _loop_child_entity(folder_obj, datacenter_moid=None):
         data = []
-        for mo_obj in folder_obj.childEntity:
+        for mo_obj in children:
+            prop = props_dict.get(mo_obj._moId, dict())
             mo_dict = {
-                "name": mo_obj.name,
+                "name": prop["name"] if "name" in prop else mo_obj.name,
                 "moid": mo_obj._moId,
                 "datacenter_id": datacenter_moid
-                # "path": self.vi.parse_obj_path(mo_obj.parent, "")
             }
             if isinstance(mo_obj, vim.VirtualMachine):
                 mo_dict["type"] = "vm"
-                mo_dict["uuid"] = mo_obj.summary.config.uuid
+                mo_dict["uuid"] = prop.get("summary.config.uuid")
             if isinstance(mo_obj, vim.Datacenter):
+                vm_folder_moid = prop["vmFolder"]._moId
                 mo_dict["type"] = "datacenter"
-                mo_dict["vm_folder_moid"] = mo_obj.vmFolder._moId
-                mo_dict["vm_folder_name"] = mo_obj.vmFolder.name
+                mo_dict["vm_folder_moid"] = vm_folder_moid
+                mo_dict["vm_folder_name"] = props_dict.get(
+                    vm_folder_moid, dict()).get("name")
             if isinstance(mo_obj, vim.Folder):
                 mo_dict["type"] = "folder"
-                mo_dict["has_child"] = bool(mo_obj.childEntity)
+                mo_dict["has_child"] = bool(prop.get("childEntity"))
             data.append(mo_dict)
-        return data
+        return data, count
 
     def list_datacenter(self):
+        props = self.vi.collect_datacenter_topology()
+        return self._layout_datacenters(props)
+
+    def detail_datacenter(self, dc_moid):
+        props = self.vi.collect_datacenter_topology(dc_moid)
+        dc_list = self._layout_datacenters(props)
+        return dc_list[0] if dc_list else None
+
+    @staticmethod
+    def _layout_datacenters(props):
+        """根据一次属性收集的结果组装数据中心、集群和主机的拓扑"""
+        props_dict = dict()
+        for prop in props:
+            props_dict[prop["obj"]._moId] = prop
+
         dc_list = list()
-        for dc_obj in self.vi.datacenters:
-            dc_info = self._layout_datacenter(dc_obj=dc_obj)
+        for prop in props:
+            if not isinstance(prop["obj"], vim.Datacenter):
+                continue
+
+            vm_folder = props_dict.get(prop["vmFolder"]._moId, dict())
+            host_folder = props_dict.get(prop["hostFolder"]._moId, dict())
+
+            dc_info = dict()
+            dc_info["name"] = prop["name"]
+            dc_info["moid"] = prop["obj"]._moId
+            dc_info["vm_folder_name"] = vm_folder.get("name")
+            dc_info["vm_folder_moid"] = prop["vmFolder"]._moId
+            dc_info["host_folder_name"] = host_folder.get("name")
+            dc_info["host_folder_moid"] = prop["hostFolder"]._moId
+
+            cluster_list = []
+            for child in host_folder.get("childEntity", []):
+                if isinstance(child, vim.ClusterComputeResource):
+                    cluster = props_dict.get(child._moId, dict())
+                    cluster_dict = dict()
+                    cluster_dict["name"] = cluster.get("name")
+                    cluster_dict["moid"] = child._moId
+
+                    host_list = []
+                    for host in cluster.get("host", []):
+                        host_dict = dict()
+                        host_dict["name"] = props_dict.get(
+                            host._moId, dict()).get("name")
+                        host_dict["moid"] = host._moId
+                        host_list.append(host_dict)
+                    cluster_dict["host_list"] = host_list
+                    cluster_list.append(cluster_dict)
+
+            dc_info["cluster_list"] = cluster_list
             dc_list.append(dc_info)
         return dc_list
 
-    def detail_datacenter(self, dc_moid):
-        return self._layout_datacenter(dc_moid=dc_moid)
-
-    def _layout_datacenter(self, dc_moid=None, dc_obj=None):
-        assert dc_moid or dc_obj
-        if not dc_obj:
-            dc_obj = self.vi.get_datacenter_by_moid(dc_moid)
-
-        dc_info = dict()
-        dc_info["name"] = dc_obj.name
-        dc_info["moid"] = dc_obj._moId
-        dc_info["vm_folder_name"] = dc_obj.vmFolder.name
-        dc_info["vm_folder_moid"] = dc_obj.vmFolder._moId
-        dc_info["host_folder_name"] = dc_obj.hostFolder.name
-        dc_info["host_folder_moid"] = dc_obj.hostFolder._moId
-
-        cluster_list = []
-        for child in dc_obj.hostFolder.childEntity:
-            if isinstance(child, vim.ClusterComputeResource):
-                cluster_dict = dict()
-                cluster_dict["name"] = child.name
-                cluster_dict["moid"] = child._moId
-
-                host_list = []
-                for host in child.host:
-                    host_dict = dict()
-                    host_dict["name"] = host.name
-                    host_dict["moid"] = host._moId
-                    host_list.append(host_dict)
-                cluster_dict["host_list"] = host_list
-                cluster_list.append(cluster_dict)
-
-        dc_info["cluster_list"] = cluster_list
-        return dc_info
-
     def list_cluster(self, cluster_name=None):
         result = list()
 
@@ -144,9 +167,11 @@ class VMwareVSphere(object):
         """展示平台中某一个集群里的虚拟机"""
 
         vms_data = list()
+        host_names = self.vi.get_host_names()
         for vm_data in self.vi.get_cluster_vms(cluster_name):
             try:
-                vms_data.append(self.vi.layout_dict_vm_data(vm_data))
+                vms_data.append(self.vi.layout_dict_vm_data(
+                    vm_data, host_names=host_names))
             except Exception as e:
                 uuid = vm_data.get("summary.config.uuid")
                 logger.exception("layout data from vm data failed, uuid: "
@@ -156,8 +181,17 @@ class VMwareVSphere(object):
 
         return vms_data
 
-    def list_vm(self, vm_properties=None):
-        """展示平台中的所有的虚拟机"""
+    def list_vm(self, vm_properties=None, fields=None):
+        """展示平台中的所有的虚拟机
+        指定fields时只获取并返回其中的字段
+        """
+        return list(self.iter_vm(vm_properties, fields))
+
+    def iter_vm(self, vm_properties=None, fields=None, page_size=None):
+        """逐个返回平台中的虚拟机，按页从平台获取，适用于大批量的导出"""
+
+        if vm_properties is None and fields:
+            vm_properties = self.vi.build_vm_properties(fields)
 
         if vm_properties is None:
             vm_properties = [
@@ -174,32 +208,35 @@ class VMwareVSphere(object):
                 "config.hardware.memoryMB",
                 "config.annotation"
             ]
-            version = self.vi.version
-            if "6.7" in version:
-                vm_properties.append("config.createDate")
-            if "7.0" in version:
-                vm_properties.append("config.createDate")
-            if "8.0" in version:
+            if self.vi.supports_property("config.createDate"):
                 vm_properties.append("config.createDate")
 
-        vms_list = list()
-        for vm_data in self.vi.get_vms_properties(vm_properties):
+        # 主机名称一次获取，不再每个虚拟机单独获取
+        host_names = None
+        if "summary.runtime.host" in vm_properties:
+            host_names = self.vi.get_host_names()
+
+        for vm_data in self.vi.iter_vms_properties(vm_properties, page_size):
             try:
-                vms_list.append(self.vi.layout_dict_vm_data(vm_data))
+                vm_info = self.vi.layout_dict_vm_data(vm_data, fields,
+                                                      host_names)
             except Exception as e:
                 uuid = vm_data.get("summary.config.uuid")
                 logger.exception("layout data from vm data failed, uuid: "
                                  "{uuid}, reason: {reason}"
                                  "".format(uuid=uuid, reason=e))
                 continue
-        return vms_list
+            if vm_info:
+                yield vm_info
 
     def get_vm(self, vm_name=None, vm_uuid=None):
         if vm_name:
             vm_obj = self.vi.get_vm_by_name(vm_name)
-        else:
-            vm_obj = self.vi.get_vm_by_uuid(vm_uuid)
+            return self._layout_vm(vm_obj)
+
+        return self.vi.call_with_vm_by_uuid(vm_uuid, self._layout_vm)
 
+    def _layout_vm(self, vm_obj):
         if not vm_obj:
             return vm_obj
 
@@ -215,8 +252,8 @@ class VMwareVSphere(object):
         return vm_ticket
 
     def get_vm_power_status(self, vm_uuid):
-        vm_obj = self.vi.get_vm_by_uuid(vm_uuid)
-        return vm_obj.summary.runtime.powerState
+        return self.vi.call_with_vm_by_uuid(
+            vm_uuid, lambda vm_obj: vm_obj.summary.runtime.powerState)
 
     def update_vm(self, vm_uuid, vm_info):
         return self.vi.update_vm_by_uuid(vm_uuid, vm_info)
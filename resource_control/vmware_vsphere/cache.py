@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+
+"""功能：VMware vSphere平台对象的进程内缓存"""
+
+import threading
+import time
+
+from pyVmomi import vim, vmodl
+
+from uutils.lru import LRUCache
+from uutils.singleflight import SingleFlight
+from tools import pchelper
+
+# MO ID存在性校验结果的缓存时间，单位秒
+MOREF_CACHE_TTL = 600
+MOREF_CACHE_SIZE = 10000
+
+# 名称索引的有效期及未命中时重建索引的最小间隔，单位秒
+NAME_INDEX_TTL = 300
+NAME_INDEX_REBUILD_INTERVAL = 30
+
+# 虚拟机UUID到MO ID缓存的容量及有效期，单位秒
+UUID_CACHE_SIZE = 20000
+UUID_CACHE_TTL = 3600
+# 查询虚拟机移除、注册事件以清除映射的最小间隔，单位秒
+UUID_CACHE_EVENT_INTERVAL = 30
+UUID_CACHE_EVENT_TYPES = ["VmRemovedEvent", "VmRegisteredEvent"]
+
+# 平台能力描述的缓存时间，单位秒，后台刷新会提前覆盖
+CAPABILITY_CACHE_TTL = 3600
+CAPABILITY_CACHE_SIZE = 1000
+
+
+class MoRefResolver(object):
+    """ 根据类型和MO ID直接构造托管对象
+
+    构造出的对象只需一次属性获取即可确认其存在，校验结果按平台缓存，
+    命中缓存时不再产生任何SOAP调用。
+    """
+
+    def __init__(self, max_size=MOREF_CACHE_SIZE, ttl=MOREF_CACHE_TTL):
+        self._cache = LRUCache(max_size, ttl)
+
+    def resolve(self, vi, vim_type, moid):
+        """返回vim_type类型、MO ID为moid的托管对象，不存在时返回None"""
+        if not moid:
+            return None
+
+        key = (vi.platform_key, vim_type._wsdlName, moid)
+        mo_obj = vim_type(moid, vi.si._stub)
+        if self._cache.get(key):
+            return mo_obj
+
+        object_spec = vmodl.query.PropertyCollector.ObjectSpec(obj=mo_obj)
+        property_spec = vmodl.query.PropertyCollector.PropertySpec(
+            type=vim_type, pathSet=["name"])
+        try:
+            pchelper.retrieve_properties(vi.si, [object_spec], [property_spec])
+        except vmodl.fault.ManagedObjectNotFound:
+            self._cache.delete(key)
+            return None
+
+        self._cache.set(key, True)
+        return mo_obj
+
+    def invalidate(self, vi, vim_type, moid):
+        self._cache.delete((vi.platform_key, vim_type._wsdlName, moid))
+
+
+class NameIndex(object):
+    """ 按平台维护的名称到MO ID的索引
+
+    索引通过一次属性收集构建，命中后只需获取该对象的名称加以确认；
+    本服务内的重命名通过update同步到索引，在vCenter中直接重命名或删除的
+    对象在确认时发现，同步该对象后重建索引。索引过期或查找未命中时
+    同样重建，未命中引起的重建受最小间隔限制，并发的重建只执行一次。
+    """
+
+    def __init__(self, ttl=NAME_INDEX_TTL,
+                 rebuild_interval=NAME_INDEX_REBUILD_INTERVAL):
+        self.ttl = ttl
+        self.rebuild_interval = rebuild_interval
+        self._indexes = dict()  # (platform_key, type) -> (构建时间, 名称映射)
+        self._lock = threading.Lock()
+        self._single_flight = SingleFlight()
+
+    def _build(self, vi, vim_type):
+        view_ref = pchelper.get_container_view(vi.si, [vim_type])
+        try:
+            props = pchelper.collect_properties(vi.si,
+                                                view_ref=view_ref,
+                                                obj_type=vim_type,
+                                                path_set=["name"],
+                                                include_mors=True)
+        finally:
+            view_ref.Destroy()
+
+        names = dict()
+        for prop in props:
+            # 同名对象保留第一个，与逐个遍历查找的行为一致
+            names.setdefault(prop["name"], prop["obj"]._moId)
+
+        key = (vi.platform_key, vim_type._wsdlName)
+        with self._lock:
+            self._indexes[key] = (time.time(), names)
+        return names
+
+    def _rebuild(self, vi, vim_type):
+        key = (vi.platform_key, vim_type._wsdlName)
+        return self._single_flight.do(key, lambda: self._build(vi, vim_type))
+
+    @staticmethod
+    def _get_name(vi, mo_obj):
+        """获取托管对象当前的名称，对象已不存在时返回None"""
+        object_spec = vmodl.query.PropertyCollector.ObjectSpec(obj=mo_obj)
+        property_spec = vmodl.query.PropertyCollector.PropertySpec(
+            type=type(mo_obj), pathSet=["name"])
+        try:
+            props = pchelper.retrieve_properties(vi.si, [object_spec],
+                                                 [property_spec])
+        except vmodl.fault.ManagedObjectNotFound:
+            return None
+        return props[0].get("name") if props else None
+
+    def lookup(self, vi, vim_type, name):
+        """返回名称为name的托管对象，不存在时返回None"""
+        key = (vi.platform_key, vim_type._wsdlName)
+        with self._lock:
+            built_at, names = self._indexes.get(key, (0, None))
+
+        now = time.time()
+        if names is None or now - built_at > self.ttl:
+            names = self._rebuild(vi, vim_type)
+        elif name not in names and now - built_at > self.rebuild_interval:
+            names = self._rebuild(vi, vim_type)
+
+        moid = names.get(name)
+        if not moid:
+            return None
+        mo_obj = vim_type(moid, vi.si._stub)
+        current_name = self._get_name(vi, mo_obj)
+        if current_name == name:
+            return mo_obj
+
+        # 对象已在vCenter中被重命名或删除，新建的索引无需再确认
+        self.update(vi, vim_type, moid, current_name)
+        moid = self._rebuild(vi, vim_type).get(name)
+        if not moid:
+            return None
+        return vim_type(moid, vi.si._stub)
+
+    def update(self, vi, vim_type, moid, name):
+        """同步单个对象的名称变化"""
+        key = (vi.platform_key, vim_type._wsdlName)
+        with self._lock:
+            if key not in self._indexes:
+                return
+            _, names = self._indexes[key]
+            for old_name, old_moid in list(names.items()):
+                if old_moid == moid:
+                    del names[old_name]
+            if name:
+                names.setdefault(name, moid)
+
+    def invalidate(self, vi, vim_type):
+        with self._lock:
+            self._indexes.pop((vi.platform_key, vim_type._wsdlName), None)
+
+
+class UuidCache(object):
+    """ 按平台缓存虚拟机UUID到MO ID的映射
+
+    命中时直接构造虚拟机对象，不再调用searchIndex.FindByUuid；
+    查找前按平台查询上次之后的虚拟机移除、注册事件，清除涉及的映射，
+    查询受最小间隔限制，被移除或重新注册的虚拟机最多在这段时间内
+    仍使用旧的MO ID；出现ManagedObjectNotFound时由调用方调用invalidate
+    并重新查找；其余映射在过期后重新查找。
+    """
+
+    def __init__(self, max_size=UUID_CACHE_SIZE, ttl=UUID_CACHE_TTL,
+                 event_interval=UUID_CACHE_EVENT_INTERVAL):
+        self.event_interval = event_interval
+        self._cache = LRUCache(max_size, ttl)
+        self._uuids = LRUCache(max_size, ttl)   # (平台, MO ID) -> UUID
+        self._events = dict()   # 平台 -> (下次查询时间, 已处理到的事件时间)
+        self._lock = threading.Lock()
+
+    def _query_events(self, vi, since):
+        """返回since之后的虚拟机移除、注册事件"""
+        filter_spec = vim.event.EventFilterSpec(
+            eventTypeId=UUID_CACHE_EVENT_TYPES,
+            time=vim.event.EventFilterSpec.ByTime(beginTime=since))
+        return vi.content.eventManager.QueryEvents(filter_spec) or []
+
+    def _get_uuid(self, vi, vm_obj):
+        """获取虚拟机的UUID，虚拟机已不存在时返回None"""
+        object_spec = vmodl.query.PropertyCollector.ObjectSpec(obj=vm_obj)
+        property_spec = vmodl.query.PropertyCollector.PropertySpec(
+            type=vim.VirtualMachine, pathSet=["config.uuid"])
+        try:
+            props = pchelper.retrieve_properties(vi.si, [object_spec],
+                                                 [property_spec])
+        except vmodl.fault.ManagedObjectNotFound:
+            return None
+        return props[0].get("config.uuid") if props else None
+
+    def _sync_events(self, vi):
+        """按最小间隔处理平台的虚拟机移除、注册事件"""
+        now = time.time()
+        with self._lock:
+            next_time, since = self._events.get(vi.platform_key, (0, None))
+            if now < next_time:
+                return
+            self._events[vi.platform_key] = (now + self.event_interval, since)
+
+        if since is None:
+            # 第一次查找，此前没有缓存任何映射，从平台的当前时间开始
+            since = vi.si.CurrentTime()
+        else:
+            try:
+                events = self._query_events(vi, since)
+            except vmodl.MethodFault:
+                # 无法查询事件时保留已处理到的时间，下次再查询
+                events = []
+            for event in events:
+                since = max(since, event.createdTime)
+                if not event.vm or not event.vm.vm:
+                    continue
+                if isinstance(event, vim.event.VmRegisteredEvent):
+                    # 重新注册的虚拟机使用新的MO ID，按UUID清除旧的映射
+                    vm_uuid = self._get_uuid(vi, event.vm.vm)
+                else:
+                    vm_uuid = self._uuids.get(
+                        (vi.platform_key, event.vm.vm._moId))
+                if vm_uuid:
+                    self.invalidate(vi, vm_uuid)
+
+        with self._lock:
+            next_time, _ = self._events[vi.platform_key]
+            self._events[vi.platform_key] = (next_time, since)
+
+    def find(self, vi, vm_uuid):
+        """返回UUID为vm_uuid的虚拟机对象，不存在时返回None"""
+        self._sync_events(vi)
+
+        key = (vi.platform_key, vm_uuid)
+        moid = self._cache.get(key)
+        if moid:
+            return vim.VirtualMachine(moid, vi.si._stub)
+
+        vm_obj = vi.content.searchIndex.FindByUuid(None, vm_uuid, True)
+        if vm_obj is not None:
+            self._cache.set(key, vm_obj._moId)
+            self._uuids.set((vi.platform_key, vm_obj._moId), vm_uuid)
+        return vm_obj
+
+    def invalidate(self, vi, vm_uuid):
+        key = (vi.platform_key, vm_uuid)
+        moid = self._cache.get(key)
+        if moid:
+            self._uuids.delete((vi.platform_key, moid))
+        self._cache.delete(key)
+
+
+class CapabilityCache(object):
+    """ 按平台缓存版本及能力描述
+
+    能力描述在会话建立时探测一次，之后所有的属性列表构造都直接读取，
+    不再每次访问content.about。
+    """
+
+    def __init__(self, max_size=CAPABILITY_CACHE_SIZE,
+                 ttl=CAPABILITY_CACHE_TTL):
+        self._cache = LRUCache(max_size, ttl)
+
+    def get(self, vi):
+        return self._cache.get(vi.platform_key)
+
+    def set(self, vi, capability):
+        self._cache.set(vi.platform_key, capability)
+
+    def invalidate(self, vi):
+        self._cache.delete(vi.platform_key)
+
+
+g_moref_resolver = MoRefResolver()
+g_name_index = NameIndex()
+g_uuid_cache = UuidCache()
+g_capability_cache = CapabilityCache()
+
+
+def get_moref_resolver():
+    """ get process wide MoRef resolver """
+    global g_moref_resolver
+    return g_moref_resolver
+
+
+def get_name_index():
+    """ get process wide name index """
+    global g_name_index
+    return g_name_index
+
+
+def get_uuid_cache():
+    """ get process wide vm uuid cache """
+    global g_uuid_cache
+    return g_uuid_cache
+
+
+def get_capability_cache():
+    """ get process wide platform capability cache """
+    global g_capability_cache
+    return g_capability_cache
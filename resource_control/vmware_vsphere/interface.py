@@ -5,8 +5,16 @@ import time
 
 from enum import Enum
 
-from tools import service_instance, pchelper, tasks
-from pyVmomi import vim
+from tools import service_instance, serviceutil, pchelper, tasks
+from pyVmomi import vim, vmodl
+
+from constants import VM_FIELD_PROPERTY_MAPPING
+from cache import (
+    get_moref_resolver,
+    get_name_index,
+    get_uuid_cache,
+    get_capability_cache
+)
 
 
 class PlatformVmOperationType(Enum):
@@ -18,6 +26,22 @@ class PlatformVmOperationType(Enum):
     SHUTDOWN = "shutdown"       # 关闭操作系统
 
 
+# 需要特定API版本才能获取的属性及其最低版本
+VERSIONED_PROPERTIES = {
+    "config.createDate": (6, 7),
+}
+
+
+def parse_api_version(api_version):
+    """将"6.7.3"形式的API版本解析为整数元组，便于比较"""
+    version = list()
+    for part in (api_version or "").split("."):
+        if not part.isdigit():
+            break
+        version.append(int(part))
+    return tuple(version)
+
+
 # 忽略ssl
 ssl._create_default_https_context = ssl._create_unverified_context
 
@@ -25,18 +49,37 @@ ssl._create_default_https_context = ssl._create_unverified_context
 class VMwareVSphereInterface(object):
     """ VMware vSphere接口类 """
 
-    def __init__(self, account):
+    def __init__(self, account, disconnect_at_exit=True):
         self.account = account
         self.account["timeout"] = 200
+        # 为False时会话不在进程退出时断开，由调用方调用disconnect
+        self.disconnect_at_exit = disconnect_at_exit
         self._si = None
         self._content = None
+        self._capability = None
+
+    @property
+    def platform_key(self):
+        """平台的唯一标识，用于区分各平台的缓存"""
+        return "{host}:{port}:{username}".format(
+            host=self.account["host"],
+            port=self.account["port"],
+            username=self.account["username"])
 
     @property
     def si(self):
         if self._si is None:
-            self._si = service_instance.connect(self.account)
+            self._si = service_instance.connect(self.account,
+                                                self.disconnect_at_exit)
         return self._si
 
+    def disconnect(self):
+        """断开与平台的会话，未建立会话时不做任何事"""
+        if self._si is None:
+            return
+        si, self._si, self._content = self._si, None, None
+        service_instance.disconnect(si)
+
     @property
     def content(self):
         if self._content is None:
@@ -45,7 +88,50 @@ class VMwareVSphereInterface(object):
 
     @property
     def version(self):
-        return self.content.about.version
+        return self.capability["version"]
+
+    @property
+    def capability(self):
+        """平台的版本及能力描述
+        依次读取进程内缓存、随平台持久化的描述，都没有时才探测平台
+        """
+        if self._capability is not None:
+            return self._capability
+
+        capability = get_capability_cache().get(self)
+        if capability is None:
+            persisted = self.account.get("platform_capability")
+            if isinstance(persisted, dict) and persisted.get("api_version"):
+                capability = persisted
+                get_capability_cache().set(self, capability)
+            else:
+                capability = self.probe_capability()
+        self._capability = capability
+        return capability
+
+    def probe_capability(self):
+        """从content.about探测平台的版本及能力描述并刷新缓存"""
+        about = self.content.about
+        api_version = parse_api_version(about.apiVersion)
+        capability = dict(
+            api_version=about.apiVersion,
+            version=about.version,
+            build=about.build,
+            full_name=about.fullName,
+            properties=sorted(
+                vm_property
+                for vm_property, min_version in VERSIONED_PROPERTIES.items()
+                if api_version >= min_version)
+        )
+        get_capability_cache().set(self, capability)
+        self._capability = capability
+        return capability
+
+    def supports_property(self, vm_property):
+        """平台是否支持获取该属性"""
+        if vm_property not in VERSIONED_PROPERTIES:
+            return True
+        return vm_property in self.capability["properties"]
 
     @property
     def root_folder(self):
@@ -79,6 +165,38 @@ class VMwareVSphereInterface(object):
             path_set=vm_properties or self._init_vm_properties(),
             include_mors=True)
 
+    def get_host_names(self):
+        """一次属性收集获取平台中所有主机的名称，返回MO ID到名称的映射"""
+        view_ref = pchelper.get_container_view(self.si, [vim.HostSystem])
+        try:
+            props = pchelper.collect_properties(self.si,
+                                                view_ref=view_ref,
+                                                obj_type=vim.HostSystem,
+                                                path_set=["name"],
+                                                include_mors=True)
+        finally:
+            view_ref.Destroy()
+        return dict((prop["obj"]._moId, prop["name"]) for prop in props)
+
+    def iter_vms_properties(self, vm_properties=None, page_size=None):
+        """按页获取平台中所有虚拟机的属性，逐个返回，内存中只保留一页"""
+        view_ref = self.get_vms_view()
+        traversal_spec = vmodl.query.PropertyCollector.TraversalSpec(
+            name="traverseEntities", path="view", skip=False,
+            type=view_ref.__class__)
+        obj_spec = vmodl.query.PropertyCollector.ObjectSpec(
+            obj=view_ref, skip=True, selectSet=[traversal_spec])
+        property_spec = vmodl.query.PropertyCollector.PropertySpec(
+            type=vim.VirtualMachine,
+            pathSet=vm_properties or self._init_vm_properties())
+        try:
+            for vm_data in pchelper.iter_properties(self.si, [obj_spec],
+                                                    [property_spec],
+                                                    max_objects=page_size):
+                yield vm_data
+        finally:
+            view_ref.Destroy()
+
     def check_connected(self):
         """检测和VMware vSphere平台是否联通"""
         try:
@@ -96,45 +214,140 @@ class VMwareVSphereInterface(object):
         return True
 
     def get_folder(self, folder_moid=None, datacenter_moid=None):
-        vm_folder_obj = None
-        if datacenter_moid:
-            for datacenter_obj in self.datacenters:
-                if datacenter_obj._moId == datacenter_moid:
-                    vm_folder_obj = datacenter_obj
-                    break
-
-        folder_dict = pchelper.get_all_obj(self.content, [vim.Folder], vm_folder_obj)
-        for folder_obj in folder_dict.keys():
-            if folder_obj._moId == folder_moid:
-                return folder_obj
+        """通过MO ID获取单个目录对象
+        MO ID在平台内唯一，datacenter_moid仅为兼容旧的调用方式而保留
+        """
+        return get_moref_resolver().resolve(self, vim.Folder, folder_moid)
+
+    def collect_child_entities(self, folder_obj, offset=0, limit=None):
+        """批量获取目录子项及展示所需的属性
+        先取目录的子项列表并在服务端分页，再用一次属性收集获取当前页所有
+        子项的属性，返回(当前页子项, MO ID到属性的映射, 子项总数)
+        """
+        object_spec = vmodl.query.PropertyCollector.ObjectSpec
+        property_spec = vmodl.query.PropertyCollector.PropertySpec
+        traversal_spec = vmodl.query.PropertyCollector.TraversalSpec
+
+        folder_props = pchelper.retrieve_properties(
+            self.si,
+            [object_spec(obj=folder_obj, skip=False)],
+            [property_spec(type=vim.Folder, pathSet=["childEntity"])])
+        children = folder_props[0].get("childEntity", []) \
+            if folder_props else []
+        count = len(children)
+
+        if limit:
+            children = children[offset:offset + limit]
+        elif offset:
+            children = children[offset:]
+        if not children:
+            return [], dict(), count
+
+        # 数据中心需要额外获取其虚拟机目录的名称
+        dc_to_vmf = traversal_spec(name="dcToVmf", type=vim.Datacenter,
+                                   path="vmFolder", skip=False)
+        obj_specs = [object_spec(obj=child, skip=False, selectSet=[dc_to_vmf])
+                     for child in children]
+        prop_specs = [
+            property_spec(type=vim.Folder,
+                          pathSet=["name", "childEntity"]),
+            property_spec(type=vim.Datacenter,
+                          pathSet=["name", "vmFolder"]),
+            property_spec(type=vim.VirtualMachine,
+                          pathSet=["name", "summary.config.uuid"]),
+            property_spec(type=vim.VirtualApp, pathSet=["name"]),
+            property_spec(type=vim.ComputeResource, pathSet=["name"]),
+            property_spec(type=vim.Network, pathSet=["name"]),
+            property_spec(type=vim.Datastore, pathSet=["name"]),
+        ]
+
+        props_dict = dict()
+        for prop in pchelper.retrieve_properties(self.si, obj_specs,
+                                                 prop_specs):
+            props_dict[prop["obj"]._moId] = prop
+        return children, props_dict, count
+
+    def collect_datacenter_topology(self, dc_moid=None):
+        """一次属性收集获取数据中心、集群和主机的名称及MO ID
+        不指定dc_moid时从根目录开始遍历所有的数据中心
+        """
+        if dc_moid:
+            start_obj = vim.Datacenter(dc_moid, self.si._stub)
+        else:
+            start_obj = self.root_folder
+
+        obj_spec = vmodl.query.PropertyCollector.ObjectSpec(
+            obj=start_obj,
+            skip=False,
+            selectSet=serviceutil.build_datacenter_traversal())
+
+        property_spec = vmodl.query.PropertyCollector.PropertySpec
+        prop_specs = [
+            property_spec(type=vim.Datacenter,
+                          pathSet=["name", "vmFolder", "hostFolder"]),
+            property_spec(type=vim.Folder,
+                          pathSet=["name", "childEntity"]),
+            property_spec(type=vim.ClusterComputeResource,
+                          pathSet=["name", "host"]),
+            property_spec(type=vim.HostSystem,
+                          pathSet=["name"]),
+        ]
+        return pchelper.retrieve_properties(self.si, [obj_spec], prop_specs)
 
     def get_datacenter_by_moid(self, dc_moid):
         """通过MO ID获取单个数据中心对象"""
-        for dc_obj in self.datacenters:
-            if dc_obj._moId == dc_moid:
-                return dc_obj
+        return get_moref_resolver().resolve(self, vim.Datacenter, dc_moid)
 
     def get_cluster_by_name(self, cluster_name):
         """通过名称获取单个集群对象"""
-        return pchelper.get_obj(self.content, [vim.ClusterComputeResource],
-                                cluster_name)
+        return self._get_obj_by_name(vim.ClusterComputeResource, cluster_name)
 
     def get_vm_by_name(self, vm_name):
         """通过名称获取单个虚拟机对象"""
-        return pchelper.get_obj(self.content, [vim.VirtualMachine], vm_name)
+        return self._get_obj_by_name(vim.VirtualMachine, vm_name)
+
+    def _get_obj_by_name(self, vim_type, name):
+        """通过名称获取托管对象，名称中包含"/"时按清单路径查找
+        找不到时抛出异常，与pchelper.get_obj的行为一致
+        """
+        if "/" in name:
+            obj = self.content.searchIndex.FindByInventoryPath(name)
+            if not isinstance(obj, vim_type):
+                obj = None
+        else:
+            obj = get_name_index().lookup(self, vim_type, name)
+
+        if not obj:
+            raise RuntimeError("Managed Object " + name + " not found.")
+        return obj
 
     def get_vm_by_uuid(self, vm_uuid):
         """通过UUID获取单个虚拟机对象"""
-        return self.content.searchIndex.FindByUuid(None, vm_uuid, True)
+        return get_uuid_cache().find(self, vm_uuid)
+
+    def call_with_vm_by_uuid(self, vm_uuid, func):
+        """以UUID对应的虚拟机对象调用func
+        缓存的虚拟机对象已失效时，清除缓存、重新查找后再重试一次
+        """
+        vm_obj = self.get_vm_by_uuid(vm_uuid)
+        try:
+            return func(vm_obj)
+        except vmodl.fault.ManagedObjectNotFound:
+            get_uuid_cache().invalidate(self, vm_uuid)
+            vm_obj = self.get_vm_by_uuid(vm_uuid)
+            return func(vm_obj)
 
     def get_vm_ticket_by_uuid(self, vm_uuid):
         """通过UUID获取单个虚拟机的票据信息"""
-        vm_obj = self.content.searchIndex.FindByUuid(None, vm_uuid, True)
-        return vm_obj.AcquireTicket('webmks')
+        return self.call_with_vm_by_uuid(
+            vm_uuid, lambda vm_obj: vm_obj.AcquireTicket('webmks'))
 
     def update_vm_by_uuid(self, vm_uuid, vm_info):
         """通过UUID修改单个虚拟机对象"""
-        vm_obj = self.content.searchIndex.FindByUuid(None, vm_uuid, True)
+        return self.call_with_vm_by_uuid(
+            vm_uuid, lambda vm_obj: self._update_vm(vm_obj, vm_info))
+
+    def _update_vm(self, vm_obj, vm_info):
         vm_note = vm_info.get("vm_note")
         vm_name = vm_info.get("vm_name")
         spec = vim.vm.ConfigSpec()
@@ -143,12 +356,17 @@ class VMwareVSphereInterface(object):
             spec.name = vm_name
         task = vm_obj.ReconfigVM_Task(spec)
         tasks.wait_for_tasks(self.si, [task])
+        if vm_name:
+            get_name_index().update(self, vim.VirtualMachine, vm_obj._moId,
+                                    vm_name)
         return None
 
     def operate_vm_by_uuid(self, vm_uuid, operation):
         """通过UUID操作单个虚拟机对象"""
-        vm_obj = self.content.searchIndex.FindByUuid(None, vm_uuid, True)
+        return self.call_with_vm_by_uuid(
+            vm_uuid, lambda vm_obj: self._operate_vm(vm_obj, operation))
 
+    def _operate_vm(self, vm_obj, operation):
         if operation == PlatformVmOperationType.POWEROFF.value:
             # vm_obj.PowerOff()
             task = vm_obj.PowerOffVM_Task()
@@ -206,57 +424,134 @@ class VMwareVSphereInterface(object):
             "config.hardware.memoryMB",
             "config.hardware.device"
         ]
-        version = self.version
-        if "6.7" in version:
-            vm_properties.append("config.createDate")
-        if "7.0" in version:
-            vm_properties.append("config.createDate")
-        if "8.0" in version:
+        if self.supports_property("config.createDate"):
             vm_properties.append("config.createDate")
         return vm_properties
 
-    def layout_dict_vm_data(self, vm_data):
+    def build_vm_properties(self, fields):
+        """根据需要返回的字段生成需要获取的属性列表"""
+        vm_properties = list()
+        for field in fields:
+            for vm_property in VM_FIELD_PROPERTY_MAPPING[field]:
+                if not self.supports_property(vm_property):
+                    continue
+                if vm_property not in vm_properties:
+                    vm_properties.append(vm_property)
+        return vm_properties
+
+    def collect_vm_detail(self, vm_obj):
+        """一次属性收集获取虚拟机及其存储、网络、主机、集群、所属目录的详情属性
+        返回MO ID到属性的映射
+        """
+        vm_properties = [
+            "parent",
+            "datastore",
+            "network",
+            "guest.net",
+            "guest.toolsStatus",
+            "summary.config.uuid",
+            "summary.config.template",
+            "summary.config.name",
+            "summary.config.guestId",
+            "summary.config.guestFullName",
+            "summary.runtime.powerState",
+            "summary.runtime.host",
+            "config.annotation",
+            "config.hardware.numCPU",
+            "config.hardware.memoryMB",
+            "config.hardware.device"
+        ]
+        if self.supports_property("config.createDate"):
+            vm_properties.append("config.createDate")
+
+        obj_spec = vmodl.query.PropertyCollector.ObjectSpec(
+            obj=vm_obj,
+            skip=False,
+            selectSet=serviceutil.build_vm_detail_traversal())
+
+        property_spec = vmodl.query.PropertyCollector.PropertySpec
+        prop_specs = [
+            property_spec(type=vim.VirtualMachine,
+                          pathSet=vm_properties),
+            property_spec(type=vim.Datastore,
+                          pathSet=["name", "summary.type", "summary.capacity",
+                                   "summary.freeSpace"]),
+            property_spec(type=vim.Network,
+                          pathSet=["name"]),
+            property_spec(type=vim.Folder,
+                          pathSet=["name", "parent"]),
+            property_spec(type=vim.HostSystem,
+                          pathSet=["name", "parent"]),
+            property_spec(type=vim.ComputeResource,
+                          pathSet=["name"]),
+        ]
+
+        props_dict = dict()
+        for prop in pchelper.retrieve_properties(self.si, [obj_spec],
+                                                 prop_specs):
+            props_dict[prop["obj"]._moId] = prop
+        return props_dict
+
+    def layout_dict_vm_data(self, vm_data, fields=None, host_names=None):
+        """根据收集到的属性生成虚拟机信息，指定fields时只生成其中的字段
+        批量生成时传入get_host_names的结果，主机名称不再逐个虚拟机获取
+        """
         vm_obj = vm_data["obj"]
 
         # todo: 着力于优化此项目，提升速度
         if isinstance(vm_obj, vim.VirtualApp):
             return
 
+        def need(field):
+            return fields is None or field in fields
+
         layout_data = dict()
 
         # 基本信息
-        layout_data["uuid"] = vm_data["summary.config.uuid"]
-        layout_data["is_template"] = vm_data["summary.config.template"]  # bool
-        layout_data["name"] = vm_data["summary.config.name"]
-        layout_data["status"] = vm_data["summary.runtime.powerState"]
-        layout_data["vmware_tools_status"] = vm_data["guest.toolsStatus"]
-        if vm_data.get("config.annotation"):
-            layout_data["note"] = vm_data["config.annotation"]
-        else:
-            layout_data["note"] = ""
-
-        if vm_data.get("config.createDate"):
-            layout_data["create_time"] = vm_data["config.createDate"].strftime("%Y-%m-%dT%H:%M:%SZ")
-        else:
-            layout_data["create_time"] = ""
+        if need("uuid"):
+            layout_data["uuid"] = vm_data["summary.config.uuid"]
+        if need("is_template"):
+            layout_data["is_template"] = vm_data["summary.config.template"]  # bool
+        if need("name"):
+            layout_data["name"] = vm_data["summary.config.name"]
+        if need("status"):
+            layout_data["status"] = vm_data["summary.runtime.powerState"]
+        if need("vmware_tools_status"):
+            layout_data["vmware_tools_status"] = vm_data["guest.toolsStatus"]
+        if need("note"):
+            if vm_data.get("config.annotation"):
+                layout_data["note"] = vm_data["config.annotation"]
+            else:
+                layout_data["note"] = ""
+
+        if need("create_time"):
+            if vm_data.get("config.createDate"):
+                layout_data["create_time"] = vm_data["config.createDate"].strftime("%Y-%m-%dT%H:%M:%SZ")
+            else:
+                layout_data["create_time"] = ""
 
         # 所属目录
-        layout_data["folder"] = self.parse_obj_path(vm_data["parent"], "")
+        if need("folder"):
+            layout_data["folder"] = self.parse_obj_path(vm_data["parent"], "")
 
         # 操作系统
-        layout_data["os_type"] = self.parse_vm_type(
-            vm_data["summary.config.guestId"])
-        layout_data["os_name"] = vm_data["summary.config.guestFullName"]
+        if need("os_type"):
+            layout_data["os_type"] = self.parse_vm_type(
+                vm_data["summary.config.guestId"])
+        if need("os_name"):
+            layout_data["os_name"] = vm_data["summary.config.guestFullName"]
 
         # CPU、内存、网卡
-        layout_data["cpu"] = vm_data["config.hardware.numCPU"]
-        layout_data["memory"] = vm_data["config.hardware.memoryMB"]
+        if need("cpu"):
+            layout_data["cpu"] = vm_data["config.hardware.numCPU"]
+        if need("memory"):
+            layout_data["memory"] = vm_data["config.hardware.memoryMB"]
 
-        # TODO: vm_obj.guest.ipAddress是否可以改为vm_data["guest.ipAddress"]
-        layout_data["nic"] = [{"ip": vm_obj.guest.ipAddress or ""}]
+        if need("nic"):
+            layout_data["nic"] = [{"ip": vm_data.get("guest.ipAddress") or ""}]
 
         # 磁盘
-        if vm_data.get("config.hardware.device"):
+        if need("disk") and vm_data.get("config.hardware.device"):
             disk_list = list()
             for device in vm_data["config.hardware.device"]:
                 if isinstance(device, vim.vm.device.VirtualDisk):
@@ -272,8 +567,13 @@ class VMwareVSphereInterface(object):
             layout_data["disk"] = disk_list
 
         # 主机
-        if vm_data.get("summary.runtime.host"):
-            layout_data["host"] = vm_data["summary.runtime.host"].name
+        if need("host") and vm_data.get("summary.runtime.host"):
+            host_obj = vm_data["summary.runtime.host"]
+            host_name = (host_names or {}).get(host_obj._moId)
+            if host_name is None:
+                # 未传入主机名称，或主机在获取名称之后才加入
+                host_name = host_obj.name
+            layout_data["host"] = host_name
 
         return layout_data
 
@@ -281,35 +581,39 @@ class VMwareVSphereInterface(object):
         if isinstance(vm_obj, vim.VirtualApp):
             return
 
+        props_dict = self.collect_vm_detail(vm_obj)
+        vm_data = props_dict[vm_obj._moId]
+
         layout_data = dict()
 
         # 基本信息
-        layout_data["uuid"] = vm_obj.summary.config.uuid
-        layout_data["is_template"] = vm_obj.summary.config.template  # bool
-        layout_data["name"] = vm_obj.summary.config.name
-        layout_data["status"] = vm_obj.summary.runtime.powerState
-        layout_data["note"] = vm_obj.config.annotation or ""
-        layout_data["vmware_tools_status"] = vm_obj.guest.toolsStatus
-        try:
-            create_time = vm_obj.config.createDate.strftime("%Y-%m-%dT%H:%M:%SZ")
-        except Exception:
+        layout_data["uuid"] = vm_data["summary.config.uuid"]
+        layout_data["is_template"] = vm_data["summary.config.template"]  # bool
+        layout_data["name"] = vm_data["summary.config.name"]
+        layout_data["status"] = vm_data["summary.runtime.powerState"]
+        layout_data["note"] = vm_data.get("config.annotation") or ""
+        layout_data["vmware_tools_status"] = vm_data.get("guest.toolsStatus")
+        if vm_data.get("config.createDate"):
+            create_time = vm_data["config.createDate"].strftime("%Y-%m-%dT%H:%M:%SZ")
+        else:
             create_time = ""
         layout_data["create_time"] = create_time
 
         # 所属目录
-        layout_data["folder"] = self.parse_obj_path(vm_obj.parent, "")
+        layout_data["folder"] = self.parse_props_path(
+            props_dict, vm_data.get("parent"))
 
         # 操作系统
-        layout_data["os_type"] = self.parse_vm_type(vm_obj.summary.config.guestId)
-        layout_data["os_name"] = vm_obj.summary.config.guestFullName
+        layout_data["os_type"] = self.parse_vm_type(vm_data["summary.config.guestId"])
+        layout_data["os_name"] = vm_data["summary.config.guestFullName"]
 
         # CPU、内存
-        layout_data["cpu"] = vm_obj.config.hardware.numCPU
-        layout_data["memory"] = vm_obj.config.hardware.memoryMB
+        layout_data["cpu"] = vm_data["config.hardware.numCPU"]
+        layout_data["memory"] = vm_data["config.hardware.memoryMB"]
 
         # 磁盘、网卡
         total_nic_dict = dict()
-        for nic in vm_obj.guest.net:
+        for nic in vm_data.get("guest.net") or []:
             # todo: 目前感觉必须安装了Vmware Tools才有值，否则为空，待后续继续验证
             key = nic.deviceConfigId
             ip_list = list()
@@ -320,7 +624,7 @@ class VMwareVSphereInterface(object):
 
         disk_list = list()
         nic_list = list()
-        for device in vm_obj.config.hardware.device:
+        for device in vm_data["config.hardware.device"]:
             # 磁盘
             if isinstance(device, vim.vm.device.VirtualDisk):
                 temp_disk_dict = dict()
@@ -349,34 +653,44 @@ class VMwareVSphereInterface(object):
 
         # 存储
         datastore_list = []
-        for datastore_obj in vm_obj.datastore:
+        for datastore_obj in vm_data.get("datastore") or []:
+            datastore_data = props_dict.get(datastore_obj._moId)
+            if not datastore_data:
+                continue
             datastore_info = dict()
-            datastore_info["name"] = datastore_obj.name
-            datastore_info["type"] = datastore_obj.summary.type
+            datastore_info["name"] = datastore_data["name"]
+            datastore_info["type"] = datastore_data["summary.type"]
 
             # 总大小(由Byte转为TB)
-            t_size = datastore_obj.summary.capacity
+            t_size = datastore_data["summary.capacity"]
             datastore_info["total_size"] = round(t_size / float(1024 * 1024 * 1024 * 1024), 2)
 
             # 可用大小(由Byte转为TB)
-            f_size = datastore_obj.summary.freeSpace
+            f_size = datastore_data["summary.freeSpace"]
             datastore_info["free_size"] = round(f_size / float(1024 * 1024 * 1024 * 1024), 2)
             datastore_list.append(datastore_info)
         layout_data["datastore"] = datastore_list
 
         # 网络
         network_list = []
-        for network_obj in vm_obj.network:
+        for network_obj in vm_data.get("network") or []:
+            network_data = props_dict.get(network_obj._moId)
+            if not network_data:
+                continue
             network_info = dict()
-            network_info["name"] = network_obj.name
+            network_info["name"] = network_data["name"]
             network_list.append(network_info)
         layout_data["network"] = network_list
 
-        # 主机
-        layout_data["host"] = vm_obj.summary.runtime.host.name
-
-        # 集群
-        layout_data["cluster"] = vm_obj.summary.runtime.host.parent.name
+        # 主机、集群，与虚拟机在同一次属性收集中获取
+        host_obj = vm_data.get("summary.runtime.host")
+        host_data = props_dict.get(host_obj._moId, {}) \
+            if host_obj is not None else {}
+        cluster_obj = host_data.get("parent")
+        cluster_data = props_dict.get(cluster_obj._moId, {}) \
+            if cluster_obj is not None else {}
+        layout_data["host"] = host_data.get("name")
+        layout_data["cluster"] = cluster_data.get("name")
         return layout_data
 
     @staticmethod
@@ -427,6 +741,18 @@ class VMwareVSphereInterface(object):
 
         return tmp_path
 
+    @staticmethod
+    def parse_props_path(props_dict, parent_obj):
+        """根据已收集的目录属性解析虚拟机的路径，与parse_obj_path的结果一致"""
+        path = ""
+        while parent_obj is not None:
+            folder_data = props_dict.get(parent_obj._moId)
+            if not folder_data or folder_data["name"] == "vm":
+                break
+            path = folder_data["name"] + "/" + path
+            parent_obj = folder_data.get("parent")
+        return path
+
     def build_query(
         self,
         start_time,
@@ -76,6 +76,78 @@ def collect_properties(si, view_ref, obj_type, path_set=None,
     return data
 
 
+def retrieve_properties(si, obj_specs, prop_specs, max_objects=None):
+    """
+    Retrieve properties with RetrievePropertiesEx, following the
+    continuation token until all results have been returned.
+
+    Args:
+        si          (ServiceInstance): ServiceInstance connection
+        obj_specs              (list): List of ObjectSpec, the starting
+                                       points of inventory navigation
+        prop_specs             (list): List of PropertySpec, the properties
+                                       to retrieve for each managed object
+        max_objects             (int): Page size hint for the server
+
+    Returns:
+        A list of properties for the managed objects, each item includes
+        the managed object ref as 'obj'
+
+    """
+    return list(iter_properties(si, obj_specs, prop_specs, max_objects))
+
+
+def iter_properties(si, obj_specs, prop_specs, max_objects=None):
+    """
+    Same as retrieve_properties, but yields the properties of each managed
+    object as the pages arrive, so only one page is held in memory.
+
+    The next page is only requested once the current one has been
+    consumed. If the caller stops early the pending retrieval is
+    cancelled on the server.
+
+    Args:
+        si          (ServiceInstance): ServiceInstance connection
+        obj_specs              (list): List of ObjectSpec, the starting
+                                       points of inventory navigation
+        prop_specs             (list): List of PropertySpec, the properties
+                                       to retrieve for each managed object
+        max_objects             (int): Page size hint for the server
+
+    Returns:
+        A generator of properties for the managed objects, each item
+        includes the managed object ref as 'obj'
+
+    """
+    collector = si.content.propertyCollector
+
+    filter_spec = pyVmomi.vmodl.query.PropertyCollector.FilterSpec()
+    filter_spec.objectSet = obj_specs
+    filter_spec.propSet = prop_specs
+
+    options = pyVmomi.vmodl.query.PropertyCollector.RetrieveOptions()
+    if max_objects:
+        options.maxObjects = max_objects
+
+    result = collector.RetrievePropertiesEx([filter_spec], options)
+    try:
+        while result:
+            for obj in result.objects:
+                properties = {}
+                for prop in obj.propSet:
+                    properties[prop.name] = prop.val
+                properties['obj'] = obj.obj
+                yield properties
+
+            if not result.token:
+                break
+            result = collector.ContinueRetrievePropertiesEx(result.token)
+        result = None
+    finally:
+        if result is not None and result.token:
+            collector.CancelRetrievePropertiesEx(result.token)
+
+
 def get_container_view(si, obj_type, container=None):
     """
     Get a vSphere Container View reference to all objects of type 'obj_type'
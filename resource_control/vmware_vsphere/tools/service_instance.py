@@ -7,11 +7,14 @@ import atexit
 from pyVim.connect import SmartConnect, Disconnect
 
 
-def connect(args):
+def connect(args, disconnect_at_exit=True):
     """
     Determine the most preferred API version supported by the specified server,
     then connect to the specified server using that API version, login and return
     the service instance object.
+
+    Pass disconnect_at_exit=False for short lived connections, they must be
+    closed with disconnect() by the caller.
     """
 
     service_instance = None
@@ -25,11 +28,19 @@ def connect(args):
                                         connectionPoolTimeout=args.get("timeout"))
 
         # doing this means you don't need to remember to disconnect your script/objects
-        atexit.register(Disconnect, service_instance)
+        if disconnect_at_exit:
+            atexit.register(Disconnect, service_instance)
     except IOError as io_error:
         print(io_error)
 
     if not service_instance:
         raise SystemExit("Unable to connect to host with supplied credentials.")
 
-    return service_instance
\ No newline at end of file
+    return service_instance
+
+
+def disconnect(service_instance):
+    """
+    Logout and close the session of the service instance object.
+    """
+    Disconnect(service_instance)
\ No newline at end of file
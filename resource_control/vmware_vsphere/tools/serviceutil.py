@@ -125,4 +125,106 @@ def build_full_traversal():
     return full_traversal
 
 
+def build_datacenter_traversal():
+    """
+    Builds a traversal spec that reaches every datacenter below the root
+    folder, its vm and host folders, the compute resources directly under
+    the host folder and the hosts of each compute resource.
+
+    Nested folders are only followed on the way down to the datacenters,
+    so a single property collection returns exactly the objects needed to
+    lay out the datacenter topology.
+    """
+
+    traversal_spec = vmodl.query.PropertyCollector.TraversalSpec
+    selection_spec = vmodl.query.PropertyCollector.SelectionSpec
+
+    # Traversal through host branch
+    cr_to_h = traversal_spec(name='crToH', type=vim.ComputeResource, path='host', skip=False)
+
+    # Direct children of the host folder, nested folders are not followed
+    hf_to_cr = traversal_spec(name='hfToCr', type=vim.Folder, path='childEntity', skip=False)
+    hf_to_cr.selectSet.extend(
+        (
+            cr_to_h,
+        )
+    )
+
+    # Traversal through hostFolder branch
+    dc_to_hf = traversal_spec(name='dcToHf', type=vim.Datacenter, path='hostFolder', skip=False)
+    dc_to_hf.selectSet.extend(
+        (
+            hf_to_cr,
+        )
+    )
+
+    # Traversal through vmFolder, only the folder itself is needed
+    dc_to_vmf = traversal_spec(name='dcToVmf', type=vim.Datacenter, path='vmFolder', skip=False)
+
+    # Recurse through the folders until the datacenters are reached
+    visit_folders = traversal_spec(
+        name='visitFolders', type=vim.Folder, path='childEntity', skip=False)
+    visit_folders.selectSet.extend(
+        (
+            selection_spec(name='visitFolders'),
+            selection_spec(name='dcToHf'),
+            selection_spec(name='dcToVmf'),
+        )
+    )
+
+    datacenter_traversal = selection_spec.Array(
+        (visit_folders, dc_to_hf, dc_to_vmf,))
+
+    return datacenter_traversal
+
+
+def build_vm_detail_traversal():
+    """
+    Builds a traversal spec that starts at a virtual machine and reaches its
+    datastores, its networks, its host with the cluster above it and the
+    chain of folders above it.
+
+    Folders are followed upwards through their parent until the datacenter
+    is reached, so the folder path of the virtual machine can be laid out
+    without any further calls.
+    """
+
+    traversal_spec = vmodl.query.PropertyCollector.TraversalSpec
+    selection_spec = vmodl.query.PropertyCollector.SelectionSpec
+
+    # Traversal through the datastores and networks of the virtual machine
+    vm_to_ds = traversal_spec(name='vmToDs', type=vim.VirtualMachine, path='datastore', skip=False)
+    vm_to_net = traversal_spec(name='vmToNet', type=vim.VirtualMachine, path='network', skip=False)
+
+    # Traversal through the current host and its compute resource or cluster
+    host_to_parent = traversal_spec(name='hostToParent', type=vim.HostSystem, path='parent', skip=False)
+    vm_to_host = traversal_spec(name='vmToHost', type=vim.VirtualMachine, path='runtime.host', skip=False)
+    vm_to_host.selectSet.extend(
+        (
+            host_to_parent,
+        )
+    )
+
+    # Recurse through the parent folders, stops at the datacenter
+    folder_to_parent = traversal_spec(
+        name='folderToParent', type=vim.Folder, path='parent', skip=False)
+    folder_to_parent.selectSet.extend(
+        (
+            selection_spec(name='folderToParent'),
+        )
+    )
+
+    vm_to_parent = traversal_spec(name='vmToParent', type=vim.VirtualMachine, path='parent', skip=False)
+    vm_to_parent.selectSet.extend(
+        (
+            folder_to_parent,
+        )
+    )
+
+    vm_detail_traversal = selection_spec.Array(
+        (vm_to_ds, vm_to_net, vm_to_host, vm_to_parent,))
+
+    return vm_detail_traversal
+
+
 # vim: set ts=4 sw=4 expandtab filetype=python:
@@ -1,7 +1,12 @@
 # -*- coding: utf-8 -*-
 
-from utils.json import json_dump
 from api import error_msg
+from connexion.jsonifier import get_json_backend
+
+
+def json_dump(data):
+    """通过已选择的JSON后端序列化响应，各后端的输出相同"""
+    return get_json_backend().dumps(data)
 
 
 def return_error(req, error, dump=True, **kwargs):
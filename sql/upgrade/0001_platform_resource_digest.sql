@@ -0,0 +1,7 @@
+-- 平台表升级脚本，schema版本1
+-- 拓扑快照按摘要比较是否变化，变化时递增版本号
+-- 执行后将ws_server配置项platform_schema_version设为1
+
+ALTER TABLE vmware_manager_platform
+    ADD COLUMN IF NOT EXISTS platform_resource_digest VARCHAR(32),
+    ADD COLUMN IF NOT EXISTS platform_resource_version INTEGER NOT NULL DEFAULT 0;
@@ -0,0 +1,6 @@
+-- 平台表升级脚本，schema版本2
+-- 随平台持久化版本及能力描述(JSON)，由后台刷新及添加、修改平台时写入
+-- 执行后将ws_server配置项platform_schema_version设为2
+
+ALTER TABLE vmware_manager_platform
+    ADD COLUMN IF NOT EXISTS platform_capability TEXT;
@@ -9,6 +9,13 @@ import uuid
 from Crypto.Cipher import AES
 
 
+def to_bool(value):
+    """将配置或请求参数中的"true"、"false"、"1"、"0"等转换为布尔值"""
+    if isinstance(value, basestring):
+        return value.strip().lower() in ("true", "yes", "on", "1")
+    return bool(value)
+
+
 def chunked(it, n):
     """手动分页"""
     marker = object()
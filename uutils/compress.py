@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+"""功能：按Accept-Encoding协商压缩HTTP响应"""
+
+import zlib
+
+import flask
+
+from log.logger import logger
+
+from uutils.lru import LRUCache
+from constants import (
+    COMPRESS_MIN_SIZE,
+    COMPRESS_LEVEL
+)
+
+# 按ETag缓存的压缩结果数量
+COMPRESS_CACHE_SIZE = 256
+
+COMPRESS_MIMETYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "text/html",
+    "text/css",
+    "text/plain",
+)
+
+
+def _gzip(data, level):
+    # wbits为31时输出gzip格式
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _deflate(data, level):
+    return zlib.compress(data, level)
+
+
+def _load_encoders():
+    """返回可用的编码方式，按服务端的偏好排列"""
+    encoders = list()
+    try:
+        import brotli
+        encoders.append(
+            ("br", lambda data, level: brotli.compress(data, quality=min(level, 11))))
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        encoders.append(
+            ("zstd", lambda data, level: zstandard.ZstdCompressor(level=level).compress(data)))
+    except ImportError:
+        pass
+    encoders.append(("gzip", _gzip))
+    encoders.append(("deflate", _deflate))
+    return encoders
+
+
+class ResponseCompressor(object):
+    """ 响应压缩
+
+    对足够大的文本类响应按客户端的Accept-Encoding选择编码方式压缩；
+    带ETag的响应按(ETag, 编码方式)缓存压缩结果，内容未变化的轮询请求
+    不再重复压缩。压缩后的ETag改为弱校验，以便If-None-Match仍可命中。
+    """
+
+    def __init__(self, app=None, min_size=COMPRESS_MIN_SIZE,
+                 level=COMPRESS_LEVEL, cache_size=COMPRESS_CACHE_SIZE):
+        self.min_size = min_size
+        self.level = level
+        self.encoders = _load_encoders()
+        self._cache = LRUCache(cache_size)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.after_request(self.after_request)
+        logger.info("response compression enabled, encodings: {encodings}"
+                    "".format(encodings=",".join(
+                        name for name, _ in self.encoders)))
+
+    def negotiate(self, accept_encodings):
+        """按客户端给出的权重选择编码方式，权重相同时取服务端偏好的"""
+        best_name, best_encoder, best_quality = None, None, 0
+        for name, encoder in self.encoders:
+            quality = accept_encodings.quality(name)
+            if quality > best_quality:
+                best_name, best_encoder, best_quality = name, encoder, quality
+        return best_name, best_encoder
+
+    def after_request(self, response):
+        if response.direct_passthrough or response.is_streamed:
+            return response
+        if response.status_code < 200 or response.status_code >= 300 \
+                or response.status_code == 204:
+            return response
+        if "Content-Encoding" in response.headers:
+            return response
+        if response.mimetype not in COMPRESS_MIMETYPES:
+            return response
+
+        response.vary.add("Accept-Encoding")
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        name, encoder = self.negotiate(flask.request.accept_encodings)
+        if not name:
+            return response
+
+        etag, _ = response.get_etag()
+        key = (etag, name) if etag else None
+        body = self._cache.get(key) if key else None
+        if body is None:
+            body = encoder(data, self.level)
+            if key:
+                self._cache.set(key, body)
+
+        response.set_data(body)
+        response.headers["Content-Encoding"] = name
+        if etag:
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+"""功能：进程内通用的LRU缓存"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    """ 线程安全、带过期时间的LRU缓存 """
+
+    def __init__(self, max_size, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, None)
+            if item is None:
+                return default
+            value, expire_at = item
+            if expire_at is not None and expire_at < time.time():
+                return default
+            # 重新插入以标记为最近使用
+            self._data[key] = item
+            return value
+
+    def set(self, key, value, ttl=None):
+        """ttl不为空时覆盖缓存默认的过期时间"""
+        ttl = ttl or self.ttl
+        expire_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (value, expire_at)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
@@ -3,6 +3,7 @@
 """功能：API接口层面的SQL操作"""
 
 import json
+import hashlib
 from copy import deepcopy
 
 from db.constants import DB_VMWARE_MANAGER
@@ -12,9 +13,78 @@ from utils.global_conf import get_pg
 from utils.misc import get_current_time
 from db.data_types import SearchWordType
 
+import context
+
 MIN_CONNECT = 0
 MAX_CONNECT = 100
 
+# 平台表中除拓扑快照外的列，列表类查询默认只取这些列
+PLATFORM_BASE_COLUMNS = [
+    "platform_id",
+    "user_id",
+    "platform_name",
+    "platform_desc",
+    "platform_host",
+    "platform_port",
+    "platform_user",
+    "platform_password",
+    "platform_status",
+    "platform_version",
+    "manage_time",
+    "is_deleted",
+    "record_create_time",
+    "record_update_time",
+]
+
+# 平台表升级脚本(sql/upgrade)新增的列，按版本号排列；
+# 配置项platform_schema_version不小于该版本时才读写这些列
+PLATFORM_SCHEMA_COLUMNS = [
+    (1, ["platform_resource_digest", "platform_resource_version"]),
+    (2, ["platform_capability"]),
+]
+
+
+def get_platform_columns(with_resource=False):
+    """当前数据库中平台表可读取的列，with_resource为True时包含拓扑快照"""
+    schema_version = context.instance().platform_schema_version or 0
+    columns = list(PLATFORM_BASE_COLUMNS)
+    for version, schema_columns in PLATFORM_SCHEMA_COLUMNS:
+        if version <= schema_version:
+            columns.extend(schema_columns)
+    if with_resource:
+        columns.append("platform_resource")
+    return columns
+
+
+def has_platform_column(column):
+    return column in get_platform_columns(with_resource=True)
+
+
+def strip_platform_columns(columns):
+    """去掉数据库尚未升级而不存在的列"""
+    schema_version = context.instance().platform_schema_version or 0
+    for version, schema_columns in PLATFORM_SCHEMA_COLUMNS:
+        if version > schema_version:
+            for column in schema_columns:
+                columns.pop(column, None)
+    return columns
+
+
+def dump_platform_resource(platform_resource):
+    """序列化平台拓扑快照，返回(json字符串, 摘要)"""
+    resource_json = json.dumps(platform_resource, sort_keys=True)
+    return resource_json, hashlib.md5(resource_json).hexdigest()
+
+
+def load_platform_resource(platform):
+    if isinstance(platform.get("platform_resource"), basestring):
+        platform["platform_resource"] = json.loads(
+            platform["platform_resource"])
+    if isinstance(platform.get("platform_capability"), basestring):
+        platform["platform_capability"] = json.loads(
+            platform["platform_capability"])
+    return platform
+
 
 class PGInterface(object):
     def __init__(self, db, min_connect, max_connect):
@@ -40,18 +110,26 @@ class VMwareManagerPGInterface(PGInterface):
     def create_platform(self, columns):
         columns_copy = deepcopy(columns)
         if isinstance(columns_copy["platform_resource"], list):
-            columns_copy["platform_resource"] = json.dumps(
+            resource_json, resource_digest = dump_platform_resource(
                 columns_copy["platform_resource"])
+            columns_copy["platform_resource"] = resource_json
+            columns_copy["platform_resource_digest"] = resource_digest
+            columns_copy["platform_resource_version"] = 1
+        if isinstance(columns_copy.get("platform_capability"), dict):
+            columns_copy["platform_capability"] = json.dumps(
+                columns_copy["platform_capability"], sort_keys=True)
         columns_copy["record_create_time"] = get_current_time()
         columns_copy["record_update_time"] = get_current_time()
-        self.client_delegator.base_insert(table=self.pg_table_platform,
-                                          columns=columns_copy)
+        self.client_delegator.base_insert(
+            table=self.pg_table_platform,
+            columns=strip_platform_columns(columns_copy))
 
     def list_platform(self, user_id=None, platform_user=None,
                       platform_host=None, platform_name=None,
                       is_deleted=False, search_word=None,
                       limit=None, offset=None,
-                      sort_key=None, reverse=None):
+                      sort_key=None, reverse=None, with_resource=False):
+        """列举平台，with_resource为False时不读取拓扑快照列"""
         condition = dict()
         condition["is_deleted"] = is_deleted
         if user_id:
@@ -67,6 +145,7 @@ class VMwareManagerPGInterface(PGInterface):
         platforms = self.client_delegator.base_get(
             table=self.pg_table_platform,
             condition=condition,
+            columns=get_platform_columns(with_resource),
             limit=limit,
             offset=offset,
             sort_key=sort_key,
@@ -78,26 +157,24 @@ class VMwareManagerPGInterface(PGInterface):
             return None
 
         for platform in platforms:
-            if isinstance(platform["platform_resource"], str):
-                platform["platform_resource"] = json.loads(
-                    platform["platform_resource"])
+            load_platform_resource(platform)
         return platforms
 
-    def query_platform(self, platform_id, is_deleted=False):
+    def query_platform(self, platform_id, is_deleted=False,
+                       with_resource=False):
+        """查询单个平台，with_resource为False时不读取拓扑快照列"""
         condition = dict(platform_id=platform_id.strip(), is_deleted=is_deleted)
         platforms = self.client_delegator.base_get(
             table=self.pg_table_platform,
             condition=condition,
+            columns=get_platform_columns(with_resource),
             limit=self.max_query_count)
         if not platforms:
             log_msg = "VMware vSphere platform not exists, platform id: " \
                       "{platform_id}".format(platform_id=platform_id)
             logger.info(log_msg)
             return None
-        platform = platforms[0]
-        if isinstance(platform["platform_resource"], str):
-            platform["platform_resource"] = json.loads(
-                platform["platform_resource"])
+        platform = load_platform_resource(platforms[0])
         if "is_deleted" in platform:
             del platform["is_deleted"]
         return platform
@@ -105,14 +182,62 @@ class VMwareManagerPGInterface(PGInterface):
     def update_platform(self, platform_id, platform_info):
         platform_info_copy = deepcopy(platform_info)
         platform_info_copy["record_update_time"] = get_current_time()
-        if isinstance(platform_info_copy["platform_resource"], list):
-            platform_info_copy["platform_resource"] = json.dumps(
-                platform_info_copy["platform_resource"])
+        current = dict()
+        if isinstance(platform_info_copy.get("platform_resource"), list) \
+                and has_platform_column("platform_resource_digest"):
+            platforms = self.client_delegator.base_get(
+                table=self.pg_table_platform,
+                condition=dict(platform_id=platform_id),
+                columns=["platform_resource_digest",
+                         "platform_resource_version"])
+            current = platforms[0] if platforms else dict()
+        self._dump_platform_columns(platform_info_copy, current)
+        strip_platform_columns(platform_info_copy)
         self.client_delegator.base_update(
             table=self.pg_table_platform,
             condition=dict(platform_id=platform_id),
             columns=platform_info_copy)
 
+    @staticmethod
+    def _dump_platform_columns(platform_info, current):
+        """序列化待写入的列，current为平台当前的记录
+        拓扑快照未变化时不再写入，变化时递增版本号
+        """
+        if isinstance(platform_info.get("platform_resource"), list):
+            resource_json, resource_digest = dump_platform_resource(
+                platform_info["platform_resource"])
+            if current.get("platform_resource_digest") == resource_digest:
+                del platform_info["platform_resource"]
+            else:
+                platform_info["platform_resource"] = resource_json
+                platform_info["platform_resource_digest"] = resource_digest
+                platform_info["platform_resource_version"] = \
+                    (current.get("platform_resource_version") or 0) + 1
+        if isinstance(platform_info.get("platform_capability"), dict):
+            platform_info["platform_capability"] = json.dumps(
+                platform_info["platform_capability"], sort_keys=True)
+
+    def update_platforms(self, platform_infos):
+        """在一个事务中批量更新平台信息
+
+        platform_infos为platform_id到(读取到的平台记录, 待更新列)的映射，
+        只有record_update_time仍与读取时相同的平台才会更新，
+        读取之后被其他请求修改过的平台保持不变，避免旧的数据覆盖新的修改
+        """
+        update_time = get_current_time()
+        with self.client_delegator.transaction() as client:
+            for platform_id, (current, platform_info) in platform_infos.items():
+                columns = deepcopy(platform_info)
+                columns["record_update_time"] = update_time
+                self._dump_platform_columns(columns, current)
+                strip_platform_columns(columns)
+                client.base_update(
+                    table=self.pg_table_platform,
+                    condition=dict(platform_id=platform_id,
+                                   record_update_time=current[
+                                       "record_update_time"]),
+                    columns=columns)
+
     def delete_platform(self, platform_id=None, user_id=None):
         condition = dict()
         if platform_id:
@@ -123,6 +248,26 @@ class VMwareManagerPGInterface(PGInterface):
             table=self.pg_table_platform,
             condition=condition)
 
+    def get_platform_update_time(self, user_id=None, search_word=None,
+                                 is_deleted=False):
+        """返回平台记录最后的更新时间，没有平台时返回None"""
+        condition = dict()
+        if user_id:
+            condition["user_id"] = user_id
+        if search_word:
+            condition["search_word"] = SearchWordType(search_word)
+        condition["is_deleted"] = is_deleted
+        platforms = self.client_delegator.base_get(
+            table=self.pg_table_platform,
+            condition=condition,
+            columns=["record_update_time"],
+            limit=1,
+            sort_key="record_update_time",
+            reverse=True)
+        if not platforms:
+            return None
+        return platforms[0]["record_update_time"]
+
     def get_platform_count(self, user_id=None, search_word=None, is_deleted=False):
         condition = dict()
         if user_id:
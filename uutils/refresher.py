@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+
+"""功能：后台定时刷新VMware vSphere平台的状态、版本和资源信息"""
+
+import errno
+import fcntl
+import os
+import random
+import threading
+import time
+
+from six.moves import queue
+
+from log.logger import logger
+
+from resource_control.vmware_vsphere import VMwareVSphere
+from uutils.pg import (
+    VMwareManagerPGInterface,
+    dump_platform_resource,
+    has_platform_column
+)
+from constants import (
+    PlatformStatus,
+    PLATFORM_REFRESH_INTERVAL,
+    PLATFORM_REFRESH_JITTER,
+    PLATFORM_REFRESH_CONCURRENCY,
+    PLATFORM_REFRESH_TICK,
+    PLATFORM_REFRESH_LOCK_FILE
+)
+
+
+class ProcessLock(object):
+    """ 基于flock的进程间互斥锁
+
+    持有锁的进程退出后由系统释放，其他进程之后即可获取
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+        self._pid = None
+
+    def acquire(self):
+        """非阻塞地获取锁，已持有时直接返回True"""
+        # fork出的子进程共享父进程的文件描述符，不算持有锁
+        if self._fd is not None and self._pid == os.getpid():
+            return True
+
+        dirname = os.path.dirname(self.path)
+        if dirname and not os.path.isdir(dirname):
+            os.makedirs(dirname, 0o700)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except (IOError, OSError) as e:
+            os.close(fd)
+            if e.errno in (errno.EAGAIN, errno.EACCES):
+                return False
+            raise
+        self._fd = fd
+        self._pid = os.getpid()
+        return True
+
+    def release(self):
+        if self._fd is None or self._pid != os.getpid():
+            return
+        fd, self._fd = self._fd, None
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+class PlatformRefresher(object):
+    """ 平台状态刷新器
+
+    调度线程按带抖动的间隔挑选到期的平台，交给固定数量的工作线程去探测，
+    探测结果先缓存在内存中，每个调度周期统一写回数据库一次。
+    DescribePlatform因此只需要读库，而库中的数据也能保持准确。
+
+    每个工作进程都会启动刷新器，只有持有文件锁的进程调度探测，
+    其余进程每个调度周期尝试获取一次，持有锁的进程退出后由其中一个接替。
+    """
+
+    def __init__(self, interval=PLATFORM_REFRESH_INTERVAL,
+                 jitter=PLATFORM_REFRESH_JITTER,
+                 concurrency=PLATFORM_REFRESH_CONCURRENCY,
+                 tick=PLATFORM_REFRESH_TICK,
+                 lock_file=PLATFORM_REFRESH_LOCK_FILE):
+        self.interval = interval
+        self.jitter = jitter
+        self.concurrency = max(int(concurrency), 1)
+        self.tick = tick
+        self._process_lock = ProcessLock(lock_file)
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._threads = []
+
+        self._next_run = dict()     # platform_id -> 下一次刷新的时间戳
+        self._inflight = set()      # 正在刷新的platform_id
+        self._pending = dict()      # platform_id -> (探测前读取的记录, 待写回的列)
+
+    def start(self):
+        if self._threads:
+            return
+
+        self._stop_event.clear()
+        scheduler = threading.Thread(target=self._schedule_loop,
+                                     name="platform-refresher-scheduler")
+        self._threads.append(scheduler)
+        for index in range(self.concurrency):
+            worker = threading.Thread(target=self._worker_loop,
+                                      name="platform-refresher-%d" % index)
+            self._threads.append(worker)
+
+        for thread in self._threads:
+            thread.daemon = True
+            thread.start()
+        logger.info("platform refresher started, interval: {interval}, "
+                    "concurrency: {concurrency}"
+                    "".format(interval=self.interval,
+                              concurrency=self.concurrency))
+
+    def stop(self):
+        self._stop_event.set()
+        for _ in range(self.concurrency):
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(self.tick)
+        self._threads = []
+        self._flush()
+        self._process_lock.release()
+
+    def _next_delay(self):
+        """下一次刷新的间隔，叠加随机抖动以避免所有平台同时刷新"""
+        spread = self.interval * self.jitter
+        return self.interval + random.uniform(-spread, spread)
+
+    def _acquire_process_lock(self):
+        try:
+            if not self._process_lock.acquire():
+                return False
+        except (IOError, OSError) as e:
+            logger.error("acquire platform refresher lock [{path}] failed, "
+                         "reason: {reason}"
+                         "".format(path=self._process_lock.path, reason=e))
+            return False
+        return True
+
+    def _schedule_loop(self):
+        locked = False
+        while not self._stop_event.is_set():
+            try:
+                if not self._acquire_process_lock():
+                    self._stop_event.wait(self.tick)
+                    continue
+                if not locked:
+                    locked = True
+                    logger.info("platform refresher of process {pid} takes "
+                                "over refreshing".format(pid=os.getpid()))
+                self._schedule()
+                self._flush()
+            except Exception as e:
+                logger.exception("schedule platform refresh failed, reason: "
+                                 "{reason}".format(reason=e))
+            self._stop_event.wait(self.tick)
+
+    def _schedule(self):
+        # 数据库未升级、没有摘要列时读取整个拓扑快照比较
+        pi = VMwareManagerPGInterface()
+        platforms = pi.list_platform(with_resource=not has_platform_column(
+            "platform_resource_digest")) or []
+
+        now = time.time()
+        platform_ids = set()
+        with self._lock:
+            for platform in platforms:
+                platform_id = platform["platform_id"]
+                platform_ids.add(platform_id)
+
+                # 新发现的平台在一个周期内随机分布首次刷新的时间
+                if platform_id not in self._next_run:
+                    self._next_run[platform_id] = \
+                        now + random.uniform(0, self.interval)
+
+                if platform_id in self._inflight:
+                    continue
+                if self._next_run[platform_id] > now:
+                    continue
+
+                self._inflight.add(platform_id)
+                self._queue.put(platform)
+
+            # 清理已删除的平台
+            for platform_id in list(self._next_run.keys()):
+                if platform_id not in platform_ids:
+                    del self._next_run[platform_id]
+
+    def _worker_loop(self):
+        while True:
+            platform = self._queue.get()
+            if platform is None:
+                break
+
+            platform_id = platform["platform_id"]
+            try:
+                changes = self.refresh_platform(platform)
+            except Exception as e:
+                changes = None
+                logger.exception("refresh platform failed, platform id: "
+                                 "{platform_id}, reason: {reason}"
+                                 "".format(platform_id=platform_id, reason=e))
+
+            with self._lock:
+                if changes:
+                    self._pending[platform_id] = (platform, changes)
+                self._inflight.discard(platform_id)
+                self._next_run[platform_id] = time.time() + self._next_delay()
+
+    @staticmethod
+    def refresh_platform(platform):
+        """探测单个平台，返回需要写回数据库的列，无变化时返回空字典"""
+        account = dict(
+            host=platform["platform_host"],
+            port=platform["platform_port"],
+            username=platform["platform_user"],
+            encrypt_password=platform["platform_password"],
+            platform_capability=platform.get("platform_capability")
+        )
+
+        platform_info = dict()
+        # 每次探测使用独立的会话，探测结束后断开
+        vs = VMwareVSphere(account, disconnect_at_exit=False)
+        try:
+            platform_capability = vs.vi.probe_capability()
+            platform_resource = vs.list_datacenter()
+        except (Exception, SystemExit) as e:
+            logger.error("connect to VMware vSphere platform failed, platform "
+                         "id: {platform_id}, host: {host}, reason: {reason}"
+                         "".format(platform_id=platform["platform_id"],
+                                   host=account["host"], reason=e))
+            platform_info["platform_status"] = \
+                PlatformStatus.UNCONNECTED.value
+        else:
+            platform_info["platform_status"] = PlatformStatus.CONNECTED.value
+            platform_info["platform_version"] = platform_capability["version"]
+            if has_platform_column("platform_capability"):
+                platform_info["platform_capability"] = platform_capability
+            platform_info["platform_resource"] = platform_resource
+        finally:
+            PlatformRefresher._disconnect(vs, platform["platform_id"])
+
+        # 拓扑快照通过摘要比较，避免读取整列数据
+        changes = dict()
+        for key, value in platform_info.items():
+            if key == "platform_resource" and \
+                    "platform_resource" not in platform:
+                _, resource_digest = dump_platform_resource(value)
+                if platform.get("platform_resource_digest") != resource_digest:
+                    changes[key] = value
+            elif platform.get(key) != value:
+                changes[key] = value
+        return changes
+
+    @staticmethod
+    def _disconnect(vs, platform_id):
+        try:
+            vs.disconnect()
+        except Exception as e:
+            logger.warn("disconnect from VMware vSphere platform failed, "
+                        "platform id: {platform_id}, reason: {reason}"
+                        "".format(platform_id=platform_id, reason=e))
+
+    def _flush(self):
+        """将本周期内收集到的变化批量写回数据库"""
+        with self._lock:
+            pending, self._pending = self._pending, dict()
+        if not pending:
+            return
+
+        pi = VMwareManagerPGInterface()
+        try:
+            pi.update_platforms(pending)
+        except Exception as e:
+            # 未写回的平台在下一次探测后重新写回
+            logger.exception("persist {count} platforms failed, reason: "
+                             "{reason}".format(count=len(pending), reason=e))
+            return
+        logger.info("platform refresher persisted {count} platforms"
+                    "".format(count=len(pending)))
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+"""功能：统计服务启动各阶段的耗时，并行执行互不依赖的启动步骤"""
+
+import contextlib
+import cProfile
+import pstats
+import threading
+import time
+
+from log.logger import logger
+
+
+class StartupProfiler(object):
+    """ 启动耗时统计
+
+    未开启时各阶段照常执行，只是不记录耗时；开启时启动结束后按耗时
+    输出各阶段，指定profile_file时主线程的函数级统计一并写入该文件，
+    可用pstats或snakeviz查看。
+    """
+
+    def __init__(self, enabled=False, profile_file=None):
+        self.enabled = enabled
+        self.profile_file = profile_file
+        self._stages = []   # (阶段名称, 耗时)
+        self._lock = threading.Lock()
+        self._profile = None
+        self._started_at = None
+
+    def start(self):
+        if not self.enabled:
+            return
+        self._started_at = time.time()
+        if self.profile_file:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+
+        started_at = time.time()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._stages.append((name, time.time() - started_at))
+
+    def finish(self):
+        if not self.enabled:
+            return
+
+        if self._profile is not None:
+            self._profile.disable()
+            try:
+                pstats.Stats(self._profile).dump_stats(self.profile_file)
+            except Exception as e:
+                logger.error("dump startup profile to {path} failed, "
+                             "reason: {reason}".format(path=self.profile_file,
+                                                       reason=e))
+            self._profile = None
+
+        logger.info("startup finished in {cost:.3f}s".format(
+            cost=time.time() - self._started_at))
+        for name, cost in sorted(self._stages, key=lambda s: -s[1]):
+            logger.info("startup stage {name}: {cost:.3f}s".format(
+                name=name, cost=cost))
+
+
+def run_parallel(tasks, profiler=None):
+    """ 在各自的线程中执行tasks并等待全部结束
+
+    :param tasks: (名称, 无参函数)列表
+    :return: dict，名称到函数返回值，抛出异常的任务为None
+    """
+    results = dict()
+
+    def run(name, func):
+        try:
+            if profiler is not None:
+                with profiler.stage(name):
+                    results[name] = func()
+            else:
+                results[name] = func()
+        except Exception as e:
+            logger.exception("startup task {name} failed, reason: {reason}"
+                             "".format(name=name, reason=e))
+            results[name] = None
+
+    threads = [threading.Thread(target=run, args=(name, func),
+                                name="startup-%s" % name)
+               for name, func in tasks]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
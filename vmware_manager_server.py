@@ -23,8 +23,15 @@ from zk.dlocator import DLocator
 import context
 import connexion
 from connexion.apps.flask_app import FlaskJSONEncoder
+from connexion.jsonifier import set_json_backend
 from constants import PITRIX_CONF_HOME
 from comm.base_client import BaseClient
+from uutils.refresher import PlatformRefresher
+from uutils.compress import ResponseCompressor
+from handlers.api_acl.common import get_api_acl_table
+from resource_control.iaas.access_limit import set_access_limiter
+from resource_control.iaas.zone import get_zone_topology
+from uutils.startup import StartupProfiler, run_parallel
 
 
 class WebService(object):
@@ -41,41 +48,106 @@ class WebService(object):
         # initialize context
         ctx = context.instance()
         ctx.conf_file = conf_file
+        # 配置在启动时一次性解析，之后按需在后台检查文件变化
+        ctx.load_server_conf()
+        ctx.start_conf_reloader()
+
+        profiler = StartupProfiler(ctx.profile_startup,
+                                   ctx.profile_startup_file)
+        profiler.start()
 
         # domain name
         ctx.domain_name = get_cb_conf().conf.get("domain_name")
 
-        # connect to postgresql db
+        # PostgreSQL、ZooKeeper、memcached互不依赖，并行连接
+        results = run_parallel([("postgresql", WebService._connect_pg),
+                                ("zookeeper", WebService._connect_zk),
+                                ("memcached", WebService._connect_mc)],
+                               profiler)
+        if not all(results.values()):
+            exit_program(-1)
+
+        # shared base client
+        ctx.client = BaseClient(use_sock_pool=True)
+
+        # zone/region拓扑在后台刷新，请求中只读取内存中的快照
+        with profiler.stage("zone_topology"):
+            get_zone_topology().start()
+
+        # refresh platform status in background, every worker starts the
+        # refresher but only the one holding the lock file probes platforms
+        if ctx.enable_platform_refresher:
+            ctx.platform_refresher = PlatformRefresher(
+                interval=ctx.platform_refresh_interval,
+                concurrency=ctx.platform_refresh_concurrency,
+                lock_file=ctx.platform_refresh_lock_file)
+            ctx.platform_refresher.start()
+
+        # 启动时展开API访问控制表
+        with profiler.stage("api_acl"):
+            get_api_acl_table()
+
+        # api访问次数限制的实现方式
+        if ctx.check_access_limit:
+            set_access_limiter(ctx.access_limiter)
+
+        # orjson、ujson可用时用于响应的序列化，否则使用标准库
+        set_json_backend(ctx.json_backend)
+
+        # 解析后的API描述按内容摘要缓存，处理函数可推迟到第一次请求时构建
+        with profiler.stage("add_api"):
+            self.connexion_app = connexion.App(__name__,
+                                               specification_dir='./spec/')
+            self.connexion_app.app.json_encoder = FlaskJSONEncoder
+            self.connexion_app.add_api(
+                'swagger.yaml',
+                arguments={'title': 'Swagger Petstore'},
+                options={'spec_cache_dir': ctx.spec_cache_dir,
+                         'lazy_operations': ctx.lazy_api_loading})
+        CORS(self.connexion_app.app)
+
+        # 按Accept-Encoding压缩响应
+        if ctx.enable_compression:
+            ResponseCompressor(self.connexion_app.app,
+                               min_size=ctx.compress_min_size,
+                               level=ctx.compress_level)
+
+        profiler.finish()
+
+    @staticmethod
+    def _connect_pg():
+        """ connect to postgresql db """
+        ctx = context.instance()
         ctx.pg = get_pg(DB_VMWARE_MANAGER, maxconn=50)
         if ctx.pg is None:
             logger.error("connect to PostgreSQL failed: can't connect")
-            exit_program(-1)
+            return False
         ctx.pgm = PGModel(ctx.pg)
+        return True
 
-        # connect to zookeeper
+    @staticmethod
+    def _connect_zk():
+        """ connect to zookeeper """
+        ctx = context.instance()
         ctx.locator = DLocator()
         ctx.zk = get_zk(WebService._zk_connect_cb,
                         WebService._zk_disconnect_cb)
         if 0 != connect_zk(ctx.zk):
             logger.error("connect to zookeeper failed: can't connect")
-            exit_program(-1)
+            return False
         set_global_locator(ctx.locator)
+        return True
 
-        # connect to memcached
+    @staticmethod
+    def _connect_mc():
+        """ connect to memcached """
+        ctx = context.instance()
         ctx.mcclient = get_mc()
         if not ctx.mcclient:
             logger.error("connect to memcached failed: can't connect")
-            exit_program(-1)
+            return False
         ctx.mcm = MCModel(ctx.mcclient)
-
-        # shared base client
-        ctx.client = BaseClient(use_sock_pool=True)
-        self.connexion_app = connexion.App(__name__,
-                                           specification_dir='./spec/')
-        self.connexion_app.app.json_encoder = FlaskJSONEncoder
-        self.connexion_app.add_api('swagger.yaml',
-                                   arguments={'title': 'Swagger Petstore'})
-        CORS(self.connexion_app.app)
+        return True
 
     @staticmethod
     def _zk_disconnect_cb():